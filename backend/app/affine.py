@@ -0,0 +1,79 @@
+from typing import Any
+
+import numpy as np
+
+from app.classes import AffineStep, FusedAffineNodeData, RotateImageNodeData
+from app.processors.node_map import NODE_AFFINE_FUNCTIONS
+
+
+def compose(
+    data: FusedAffineNodeData, size: tuple[int, int]
+) -> tuple[np.ndarray, tuple[int, int], bool]:
+    """
+    The 2x3 matrix taking input pixels to output pixels for the whole chain,
+    the output (width, height), and whether any step shows area outside its
+    input (which is then filled black, like cv.warpAffine does by default).
+    """
+    matrix = np.eye(3)
+    fills = False
+    for step in data.steps:
+        step_matrix, size, step_fills = NODE_AFFINE_FUNCTIONS[step.type](
+            step.data, size
+        )
+        matrix = np.vstack([step_matrix, [0.0, 0.0, 1.0]]) @ matrix
+        fills = fills or step_fills
+    return matrix[:2], size, fills
+
+
+def rotations(steps: list[AffineStep]) -> int:
+    """Rotate steps in a chain, each crops what it turns out of its frame."""
+    return sum(isinstance(step.data, RotateImageNodeData) for step in steps)
+
+
+def _flip_code(matrix: np.ndarray, size: tuple[int, int]) -> int | None:
+    """
+    cv.flip code when the chain only mirrors the image (2 for no change at
+    all), None when pixels actually have to be resampled.
+    """
+    width, height = size
+    for code, (sx, sy) in ((2, (1, 1)), (1, (-1, 1)), (0, (1, -1)), (-1, (-1, -1))):
+        mirror = np.array(
+            [
+                [sx, 0, 0 if sx > 0 else width - 1],
+                [0, sy, 0 if sy > 0 else height - 1],
+            ]
+        )
+        if np.allclose(matrix, mirror, atol=1e-9):
+            return code
+    return None
+
+
+def warp_affine_node(data: FusedAffineNodeData, inputs: list[Any]) -> np.ndarray:
+    """
+    Runs a fused chain of geometric nodes: one cv.warpAffine, so the image is
+    allocated and interpolated once instead of once per node. Chains that
+    only mirror the image are done exactly with cv.flip. Otherwise the output
+    matches the separate nodes up to interpolation rounding (the optimizer
+    never fuses two rotations, see _Plan.fuse_affine).
+    """
+    import cv2 as cv  # Only VISION nodes are fused
+
+    if not inputs or inputs[0] is None:
+        raise ValueError(f"Input image is missing for {data.label}.")
+    image = inputs[0]
+    height, width = image.shape[:2]
+
+    matrix, size, fills = compose(data, (width, height))
+    print(f"  -> {len(data.steps)} geometric steps as one warp, output {size}")
+
+    if size == (width, height):
+        code = _flip_code(matrix, size)
+        if code == 2:
+            return image
+        if code is not None:
+            return cv.flip(image, code)
+
+    # Only rotations uncover area outside the image, which they fill black.
+    # Otherwise edge pixels are replicated, as cv.resize does.
+    border = cv.BORDER_CONSTANT if fills else cv.BORDER_REPLICATE
+    return cv.warpAffine(image, matrix, size, flags=cv.INTER_LINEAR, borderMode=border)
@@ -0,0 +1,165 @@
+import glob
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.images import DECODE_CACHE
+
+# Threads decoding and processing the images of a batch at once. OpenCV
+# releases the GIL, so the items of a batch overlap well on threads.
+BATCH_WORKERS = int(os.environ.get("NEUROCIRCUIT_BATCH_WORKERS", "0")) or (
+    os.cpu_count() or 1
+)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def is_batch_source(file_path: str) -> bool:
+    """Whether a loadImage path names several images (a directory or a glob)."""
+    return os.path.isdir(file_path) or glob.has_magic(file_path)
+
+
+@dataclass
+class BatchReport:
+    """What a sink did with every image of a batch."""
+
+    images: int = 0
+    failed: dict[str, str] = field(default_factory=dict)  # path -> error
+    seconds: float = 0.0
+    outputs: list[str] = field(default_factory=list)
+    # path -> output, for inputs whose output name another input already had
+    renamed: dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "images": self.images,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 3),
+            "imagesPerSec": round(self.images / self.seconds, 2)
+            if self.seconds > 0
+            else 0.0,
+            "outputs": self.outputs,
+            "renamed": self.renamed,
+        }
+
+
+class ImageBatch:
+    """
+    The images matched by a directory or glob, plus the per-image steps
+    applied to them.
+
+    Like ChunkedFrame it is only a recipe: the file list is resolved and every
+    image decoded when a sink runs it, so a batch of thousands of images never
+    sits in memory at once and always sees the files currently on disk. Steps
+    must be picklable (see row_wise_step) so the recipe can cross to worker
+    processes. With max_dim > 0 (preview runs) images are scaled down to fit
+    it as they are decoded.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        steps: tuple[Callable[[np.ndarray], np.ndarray], ...] = (),
+        max_dim: int = 0,
+    ):
+        self.source = source
+        self.steps = steps
+        self.max_dim = max_dim
+
+    def __repr__(self) -> str:
+        return f"ImageBatch({self.source!r}, steps={len(self.steps)})"
+
+    def paths(self) -> list[str]:
+        if os.path.isdir(self.source):
+            candidates = [str(path) for path in Path(self.source).iterdir()]
+        else:
+            candidates = glob.glob(self.source, recursive=True)
+        return sorted(
+            path
+            for path in candidates
+            if os.path.isfile(path) and Path(path).suffix.lower() in IMAGE_EXTENSIONS
+        )
+
+    def relative_path(self, path: str) -> Path:
+        """
+        A matched path relative to the batch's directory (for a glob, the
+        part of it before the first wildcard).
+        """
+        if os.path.isdir(self.source):
+            root = self.source
+        else:
+            parts = Path(self.source).parts
+            fixed = next(i for i, part in enumerate(parts) if glob.has_magic(part))
+            root = os.path.join(*parts[:fixed]) if fixed else "."
+        return Path(os.path.relpath(path, root))
+
+    def map(self, step: Callable[[np.ndarray], np.ndarray]) -> "ImageBatch":
+        return ImageBatch(self.source, (*self.steps, step), self.max_dim)
+
+    def load(self, path: str) -> np.ndarray:
+        """Decodes one image and pushes it through the steps."""
+        import cv2 as cv
+
+        if self.max_dim > 0:
+            # A preview only decodes a few images, later previews reuse them
+            image = DECODE_CACHE.read(path, max_dim=self.max_dim)
+        else:
+            image = cv.imread(path)
+        if image is None:
+            raise OSError(f"Failed to load image: {path}")
+        for step in self.steps:
+            image = step(image)
+        return image
+
+    def first(self) -> np.ndarray | None:
+        """The first image of the batch, processed, e.g. as a preview."""
+        paths = self.paths()
+        return self.load(paths[0]) if paths else None
+
+    def run(
+        self,
+        sink: Callable[[str, np.ndarray], Any],
+        workers: int | None = None,
+        paths: list[str] | None = None,
+    ) -> BatchReport:
+        """
+        Loads, processes and hands every image to sink(path, image) on a
+        thread pool. A failing image is reported, the others carry on.
+        paths defaults to self.paths(), for sinks that need the list first.
+        """
+        paths = self.paths() if paths is None else paths
+        report = BatchReport()
+        started = time.perf_counter()
+
+        import cv2 as cv
+
+        def process(path: str) -> tuple[str, Any, str | None]:
+            try:
+                return path, sink(path, self.load(path)), None
+            except (OSError, ValueError, TypeError, cv.error) as e:
+                return path, None, str(e)
+
+        with ThreadPoolExecutor(
+            max_workers=workers or BATCH_WORKERS, thread_name_prefix="batch"
+        ) as pool:
+            for path, output, error in pool.map(process, paths):
+                if error is not None:
+                    report.failed[path] = error
+                    continue
+                report.images += 1
+                if isinstance(output, str):
+                    report.outputs.append(output)
+
+        report.seconds = time.perf_counter() - started
+        print(
+            f"  -> Batch of {len(paths)} image(s): {report.images} done, "
+            f"{len(report.failed)} failed, "
+            f"{report.to_dict()['imagesPerSec']} images/sec"
+        )
+        return report
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from app.classes import Node
+from app.processors.node_map import PLUGIN_VERSIONS
+
+# Byte budget of the in-process node result cache (0 disables caching)
+RESULT_CACHE_MAX_BYTES = int(
+    os.environ.get("NEUROCIRCUIT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+# File headers (column names, image sizes, ...) kept by file_header
+FILE_HEADER_ENTRIES = 256
+
+T = TypeVar("T")
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Best effort size of a node result, used for the cache byte budget."""
+    nbytes = getattr(value, "nbytes", None)  # ndarray, SharedResult
+    if isinstance(nbytes, int):
+        return nbytes
+
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU mapping bounded by the summed size of its values.
+    Values bigger than the whole budget are never stored.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key: str, value: Any, nbytes: int | None = None) -> bool:
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            return False
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+def _stat_stamp(path: str) -> list[Any]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path, None, None]
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+
+def _file_stamp(data: Any) -> list[Any] | None:
+    """
+    (path, mtime, size) of the file a source node reads, if any. A directory
+    or glob is stamped by every image it matches, so adding, removing or
+    editing one of them changes the key.
+    """
+    # Imported here, app.batch imports this module (through app.images)
+    from app.batch import ImageBatch, is_batch_source
+
+    file_path = getattr(data, "filePath", None)
+    if not file_path:
+        return None
+    if is_batch_source(file_path):
+        return [file_path, [_stat_stamp(p) for p in ImageBatch(file_path).paths()]]
+    return _stat_stamp(file_path)
+
+
+def node_cache_key(
+    node: Node, parent_keys: list[str], plan: dict[str, Any] | None = None
+) -> str:
+    """
+    Content address of a node's result: its type and the version of its
+    plugin, its data, the keys of its parents (in input order), the stamp
+    of any file it reads and the read plan (columns, pushed filters) it was
+    executed with.
+    """
+    parts = [
+        node.type,
+        PLUGIN_VERSIONS.get(node.type),
+        node.data.model_dump(mode="json"),
+        parent_keys,
+        _file_stamp(node.data),
+    ]
+    if plan is not None:
+        parts.append(plan)
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_header(path: str, read: Callable[[str], T]) -> T:
+    """
+    read(path), metadata from a file's header (column names, image size),
+    cached by path, mtime and size: an unchanged header is parsed once,
+    however often it is inspected. The value is shared, never modify it.
+    Raises OSError for a missing file, errors of read() are not cached.
+    """
+    stat = os.stat(path)
+    key = f"{read.__module__}.{read.__qualname__}|{path}|{stat.st_mtime_ns}|{stat.st_size}"
+    hit, value = FILE_HEADERS.get(key)
+    if not hit:
+        value = read(path)
+        FILE_HEADERS.put(key, value, nbytes=1)
+    return value
+
+
+RESULT_CACHE = LRUCache(RESULT_CACHE_MAX_BYTES)
+# Sized in entries rather than bytes (every header counts as 1)
+FILE_HEADERS = LRUCache(FILE_HEADER_ENTRIES)
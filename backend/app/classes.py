@@ -5,6 +5,10 @@ from typing import Literal, Union
 class InputNodeData(BaseModel):
     label: str
     filePath: str = ""
+    # Rows per chunk to stream the file with; 0 streams only very large files
+    chunkSize: int = 0
+    # Arrow-backed columns (pyarrow dtypes), CSV files also use its reader
+    arrow: bool = False
 
 
 class TransformNodeData(BaseModel):
@@ -32,6 +36,13 @@ class FilterNodeData(BaseModel):
     value: str
 
 
+class FusedFilterNodeData(BaseModel):
+    """Consecutive filterRows nodes merged by the optimizer, not sent by the UI."""
+
+    label: str
+    conditions: list[FilterNodeData]
+
+
 class CombineNodeData(BaseModel):
     label: str
     axis: Literal[0, 1] = 0
@@ -50,6 +61,9 @@ class LoadImageNodeData(BaseModel):
 
 class SaveImageNodeData(BaseModel):
     label: str
+    # Where a batch run writes its images, a directory inside temp_uploads
+    # ("batch" by default)
+    outputDir: str = ""
 
 
 class ResizeImageNodeData(BaseModel):
@@ -92,6 +106,18 @@ class RotateImageNodeData(BaseModel):
     rotationDirection: Literal["Clockwise", "Anticlockwise"]
 
 
+class AffineStep(BaseModel):
+    type: str  # flipImage / rotateImage / resizeImage
+    data: FlipImageNodeData | RotateImageNodeData | ResizeImageNodeData
+
+
+class FusedAffineNodeData(BaseModel):
+    """Consecutive geometric image nodes merged by the optimizer, not sent by the UI."""
+
+    label: str
+    steps: list[AffineStep]
+
+
 AnyNodeData = Union[
     InputNodeData,
     TransformNodeData,
@@ -110,6 +136,8 @@ AnyNodeData = Union[
     BlurImageNodeData,
     CannyEdgeNodeData,
     RotateImageNodeData,
+    FusedFilterNodeData,
+    FusedAffineNodeData,
 ]
 
 
@@ -138,9 +166,38 @@ class Edge(BaseModel):
     target: str
 
 
+class PreviewOptions(BaseModel):
+    # Longest side images are loaded at
+    maxDim: int = 512
+    # Rows a table source reads: the first ones, or a uniform sample
+    rows: int = 1000
+    sample: Literal["head", "uniform"] = "head"
+
+
 class GraphPayload(BaseModel):
     nodes: list[Node]
     edges: list[Edge]
+    # Demand-driven runs: only ancestors of these sink/output node ids execute.
+    # prune=True without sinks uses every sink node in the graph.
+    sinks: list[str] | None = None
+    prune: bool = False
+    # Rewrite the DATA_ and geometric VISION_ nodes (fuse filters, fold
+    # selections, fuse flips) before running. Opt-in: rewrites move node types
+    # between ids and drop merged nodes, so exec_order, errors and results
+    # are reported by the rewritten plan's ids (/explain shows that plan).
+    optimize: bool = False
+    # Approximate run on small data: sources read less (see PreviewOptions),
+    # sinks writing files are left out
+    preview: bool = False
+    previewOptions: PreviewOptions = PreviewOptions()
+
+
+class GraphPatch(BaseModel):
+    addNodes: list[Node] = []
+    updateNodes: list[Node] = []
+    removeNodes: list[str] = []
+    addEdges: list[Edge] = []
+    removeEdges: list[str] = []
 
 
 class InspectRequest(BaseModel):
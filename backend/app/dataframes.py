@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Set once enable_copy_on_write() switched the option on in this process
+_COPY_ON_WRITE = False
+
+
+def enable_copy_on_write() -> None:
+    """
+    pandas 3 always uses Copy-on-Write, 2.x needs it switched on. With it a
+    shallow copy shares the column buffers until one side writes to a
+    column, and only that column is copied.
+
+    This is a process-wide pandas option, it changes how every frame of the
+    process behaves, not only ours. It is switched on once, explicitly,
+    when the first DATA_ plugin is loaded (node_map.load_plugin, in the
+    server and in every pool worker), and by writable(), which relies on
+    it, for callers that use plugin functions without loading them.
+    """
+    global _COPY_ON_WRITE
+    if _COPY_ON_WRITE:
+        return
+    import pandas as pd
+
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+    _COPY_ON_WRITE = True
+
+
+def is_owned(owned: list[bool] | None, index: int = 0) -> bool:
+    """Whether the engine handed input `index` over for in-place changes."""
+    return bool(owned) and index < len(owned) and owned[index]  # type: ignore[index]
+
+
+def writable(df: pd.DataFrame, owned: bool) -> pd.DataFrame:
+    """
+    A frame a plugin may modify: the input itself when the plugin owns it,
+    otherwise a Copy-on-Write shallow copy that leaves the parent untouched.
+    """
+    if owned:
+        return df
+    enable_copy_on_write()  # Without it the shallow copy would share writes
+    return df.copy(deep=False)
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow is installed (optional, see the parquetInput node)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def float_dtype_like(dtype: Any) -> str:
+    """float64, or its Arrow counterpart when the original column is Arrow-backed."""
+    pd = sys.modules["pandas"]  # dtype comes from a frame, pandas is loaded
+    return "double[pyarrow]" if isinstance(dtype, pd.ArrowDtype) else "float64"
@@ -0,0 +1,908 @@
+import graphlib
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Literal
+
+from app.affine import warp_affine_node
+from app.batch import BatchReport, ImageBatch
+from app.cache import RESULT_CACHE, LRUCache, node_cache_key
+from app.classes import Edge, FusedAffineNodeData, GraphPayload, Node
+from app.optimizer import Rewrite, optimize
+from app.package_manager import MANIFEST_MAP
+from app.planner import ReadPlan, plan_reads
+from app.processors.node_map import (
+    NODE_INDEGREE,
+    NODE_INFO,
+    NODE_PROCESSING_FUNCTIONS,
+    NODE_STREAMING_FUNCTIONS,
+    discover_plugins,
+)
+from app.results import RESULT_STORE, ImageResult, TableResult, table_result
+from app.schema_types import Schema
+from app.schemas import infer_schemas
+from app.shm import SharedRef, SharedResult, attach_value, export_value, materialize
+from app.streaming import ChunkedFrame, row_wise_step
+
+ExecutorBackend = Literal["thread", "process"]
+
+# Number of nodes allowed to run at the same time. cv2 and most pandas kernels
+# release the GIL, so independent branches overlap well on a thread pool.
+MAX_WORKERS = int(os.environ.get("NEUROCIRCUIT_MAX_WORKERS", "0")) or min(
+    32, (os.cpu_count() or 1) + 4
+)
+
+# "process" runs every node in a warm worker process instead, for plugins that
+# hold the GIL (SimpleImputer, df.query, ...). Images and DataFrame columns are
+# handed between processes through shared memory.
+EXECUTOR_BACKEND: ExecutorBackend = (
+    "process" if os.environ.get("NEUROCIRCUIT_EXECUTOR") == "process" else "thread"
+)
+PROCESS_WORKERS = int(os.environ.get("NEUROCIRCUIT_PROCESS_WORKERS", "0")) or (
+    os.cpu_count() or 1
+)
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+# Worker side: blocks that could not be closed yet because a view was alive
+_lingering_blocks: list[shared_memory.SharedMemory] = []
+
+
+def _init_worker() -> None:
+    """Loads the plugin registry once per worker process."""
+    if not NODE_INFO:
+        discover_plugins()
+
+
+def _close_lingering_blocks() -> None:
+    still_open = []
+    for shm in _lingering_blocks:
+        try:
+            shm.close()
+        except BufferError:
+            still_open.append(shm)
+    _lingering_blocks[:] = still_open
+
+
+def call_plugin(
+    processing_fun: Callable,
+    node: Node,
+    inputs: list[Any],
+    owned: list[bool],
+    plan: dict[str, Any] | None = None,
+) -> Any:
+    """
+    Calls a processing function. Plugins that declare "ownership" in their
+    node_info also get owned=[...]: True for every input nobody else will
+    read afterwards, which the plugin may modify in place instead of copying.
+    Source nodes with a read plan get its keyword arguments (see planner).
+
+    Streamed (ChunkedFrame) inputs go to the plugin's streaming_function, or
+    become a per-chunk step for "rowWise" plugins. Any other plugin gets the
+    chunks concatenated into one DataFrame. Image batches work the same way
+    with "perImage" plugins, but are never loaded into memory all at once.
+    Geometric nodes fused by the optimizer run as one node (see app/affine.py).
+    """
+    info = NODE_INFO.get(node.type, {})
+    if isinstance(node.data, FusedAffineNodeData):
+        processing_fun = warp_affine_node
+    if any(isinstance(value, ImageBatch) for value in inputs):
+        if node.type in NODE_STREAMING_FUNCTIONS:
+            return NODE_STREAMING_FUNCTIONS[node.type](node.data, inputs)
+        if info.get("perImage") and len(inputs) == 1:
+            return inputs[0].map(row_wise_step(processing_fun, node.data))
+        raise TypeError(f"{node.type} cannot process a batch of images.")
+
+    if any(isinstance(value, ChunkedFrame) for value in inputs):
+        if node.type in NODE_STREAMING_FUNCTIONS:
+            return NODE_STREAMING_FUNCTIONS[node.type](node.data, inputs)
+        if info.get("rowWise") and len(inputs) == 1:
+            step = row_wise_step(
+                processing_fun, node.data, info.get("ownership", False)
+            )
+            return inputs[0].map(step)
+        print(f"  -> {node.type} cannot stream, loading every chunk into memory.")
+        owned = [o or isinstance(v, ChunkedFrame) for v, o in zip(inputs, owned)]
+        inputs = [
+            value.to_frame() if isinstance(value, ChunkedFrame) else value
+            for value in inputs
+        ]
+
+    kwargs = dict(plan or {})
+    if info.get("ownership"):
+        kwargs["owned"] = owned
+    return processing_fun(node.data, inputs, **kwargs)
+
+
+def _run_in_worker(
+    node_id: str,
+    node: Node,
+    parent_refs: list[SharedRef],
+    owned: list[bool],
+    plan: dict[str, Any] | None,
+) -> SharedRef:
+    """
+    Executes one node inside a pool process. Parent results are mapped from
+    shared memory without copying, the result is written to a new block.
+    """
+    _close_lingering_blocks()
+
+    processing_fun = NODE_PROCESSING_FUNCTIONS.get(node.type)
+    if not processing_fun:
+        raise RuntimeError("Node is not correctly installed.")
+
+    inputs = []
+    for ref in parent_refs:
+        value, shm = attach_value(ref)
+        inputs.append(value)
+        if shm is not None:
+            _lingering_blocks.append(shm)
+
+    print(f"Executing node: {node_id} ({node.type}) [pid {os.getpid()}]")
+    try:
+        result = call_plugin(processing_fun, node, inputs, owned, plan)
+        if node.type == "display":
+            result = table_result(result)
+        return export_value(result)
+    finally:
+        del inputs
+        _close_lingering_blocks()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """
+    Drops the warm workers, e.g. after plugins were (un)installed, so the next
+    process run starts with a fresh registry.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_dependency_list(
+    nodes: list[Node], edges: list[Edge]
+) -> tuple[dict[str, Node], dict[str, list[str]]]:
+    """
+    Builds the node HASHMAP and the DEPENDENCY LIST (opposite of ADJ. LIST).
+    Parents are kept in edge order so multi-input nodes always receive their
+    inputs in the same order.
+    """
+    nmap = {node.id: node for node in nodes}
+    dep_list: dict[str, list[str]] = {node.id: [] for node in nodes}
+
+    for edg in edges:
+        # going from tgt to source becuase we actually want to generate the dependency list
+        if edg.target in nmap and edg.source in nmap:
+            if edg.source not in dep_list[edg.target]:
+                dep_list[edg.target].append(edg.source)
+        else:
+            print(
+                f"Warning: Skipping edge {edg.id} ({edg.source} -> {edg.target}) due to missing node."
+            )
+
+    return nmap, dep_list
+
+
+def validate_indegrees(
+    nmap: dict[str, Node], dep_list: dict[str, list[str]]
+) -> dict[str, str]:
+    """
+    Checks every node's number of parents against its registered inDegree.
+    Returns {node_id: error_message} for the nodes that failed validation.
+    """
+    errors: dict[str, str] = {}
+
+    for node_id, parents in dep_list.items():
+        node = nmap.get(node_id)
+        if not node:
+            continue  # Skip if node doesn't exist (handled above)
+
+        node_type = node.type
+        expected_indegree = NODE_INDEGREE.get(node_type)
+
+        is_valid = (
+            isinstance(expected_indegree, int) and len(parents) == expected_indegree
+        ) or (
+            isinstance(expected_indegree, list)
+            and expected_indegree[0] <= len(parents) <= expected_indegree[1]
+        )
+
+        # Allow nodes with no processing function (like noteNode) to bypass degree checks if not specified
+        if expected_indegree is None and node_type not in NODE_PROCESSING_FUNCTIONS:
+            is_valid = True
+
+        if not is_valid:
+            error_msg = f"Node '{node.data.label}' ({node_id}) expects {expected_indegree} inputs but has {len(parents)}."
+            print(f"Validation Error: {error_msg}")
+            errors[node_id] = error_msg
+
+    return errors
+
+
+def is_sink(node: Node) -> bool:
+    return bool(NODE_INFO.get(node.type, {}).get("sink"))
+
+
+def demanded_nodes(
+    nmap: dict[str, Node],
+    dep_list: dict[str, list[str]],
+    sinks: list[str] | None = None,
+) -> list[str]:
+    """
+    Walks dep_list backwards from the requested sinks (default: every sink
+    node in the graph) and returns the nodes they depend on, in graph order.
+    """
+    if sinks is None:
+        sinks = [node_id for node_id, node in nmap.items() if is_sink(node)]
+
+    needed: set[str] = set()
+    stack = [node_id for node_id in sinks if node_id in nmap]
+    for node_id in sinks:
+        if node_id not in nmap:
+            print(f"Warning: Requested sink {node_id} is not part of the graph.")
+    while stack:
+        node_id = stack.pop()
+        if node_id in needed:
+            continue
+        needed.add(node_id)
+        stack.extend(dep_list[node_id])
+
+    return [node_id for node_id in dep_list if node_id in needed]
+
+
+class GraphExecution:
+    """
+    Runs a validated graph with a ready-queue scheduler.
+
+    Nodes are handed to a bounded thread pool as soon as all of their parents
+    are finished (graphlib's get_ready()/done() protocol). All bookkeeping
+    (results, skips, errors) happens on the calling thread, only the plugin
+    functions themselves run on the workers. The reported lists are ordered by
+    the static topological order, so the response does not depend on how the
+    workers happened to interleave.
+
+    With a cache, every node gets a content address (see node_cache_key) and
+    unchanged nodes are served from it instead of being submitted.
+
+    `scope` limits the run to a subset of the nodes. Parents outside the scope
+    must already be known through seed() (used by incremental sessions).
+
+    `on_event` receives progress events (node_started / node_finished /
+    node_failed / node_skipped) as they happen. node_started is sent from the
+    worker thread, so the callback has to be thread-safe.
+
+    Intermediate results are reference counted: once the last child of a node
+    is done, its result is dropped, so a long linear pipeline only holds a
+    couple of frames at a time. Sink results are always kept, and
+    retain_results=True keeps everything (sessions reuse old results).
+    The same counts tell a plugin when it is the last reader of an input
+    (see call_plugin), so it can skip its defensive copy.
+    """
+
+    def __init__(
+        self,
+        nmap: dict[str, Node],
+        dep_list: dict[str, list[str]],
+        validation_errors: dict[str, str],
+        max_workers: int | None = None,
+        backend: ExecutorBackend | None = None,
+        cache: LRUCache | None = None,
+        scope: list[str] | None = None,
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+        retain_results: bool = False,
+        read_plans: dict[str, ReadPlan] | None = None,
+        run_id: str | None = None,
+    ):
+        self.nmap = nmap
+        self.dep_list = dep_list
+        self.validation_errors = validation_errors
+        self.max_workers = max_workers or MAX_WORKERS
+        self.backend = backend or EXECUTOR_BACKEND
+        self.cache = cache if cache is not None and cache.max_bytes > 0 else None
+        self.scope = scope
+        self.on_event = on_event
+        self.retain_results = retain_results
+        self.read_plans = read_plans or {}
+        # Display results are kept in RESULT_STORE under this id for paging
+        self.run_id = run_id or RESULT_STORE.new_run_id()
+        self.started_at: dict[str, float] = {}
+        self.consumers: dict[str, int] = {}  # Children still to run, per node
+        self.completed: set[str] = set()  # Nodes that produced a result
+
+        self.cache_keys: dict[str, str] = {}
+        self.cache_status: dict[str, str] = {}  # hit / miss / bypass
+
+        self.results: dict[str, Any] = {}
+        self.display_outputs: dict[str, Any] = {}
+        self.dl_files: dict[str, str] = {}
+        self.batch_reports: dict[str, dict[str, Any]] = {}  # Sinks run on a batch
+        self.skipped: set[str] = set(validation_errors)
+        self.errors: dict[str, str] = {}
+
+    def seed(
+        self,
+        results: dict[str, Any],
+        skipped: set[str],
+        cache_keys: dict[str, str],
+    ) -> None:
+        """Makes results of nodes outside the scope visible to their children."""
+        self.results.update(results)
+        self.skipped.update(skipped)
+        self.cache_keys.update(cache_keys)
+
+    def _emit(self, event: str, node_id: str, **fields: Any) -> None:
+        if self.on_event is not None:
+            self.on_event({"event": event, "nodeId": node_id, **fields})
+
+    def _duration_ms(self, node_id: str) -> float:
+        started = self.started_at.get(node_id)
+        if started is None:
+            return 0.0
+        return round((time.perf_counter() - started) * 1000, 3)
+
+    def _release(self, node_id: str) -> None:
+        if self.retain_results or is_sink(self.nmap[node_id]):
+            return
+        if self.consumers.get(node_id, 0) == 0:
+            self.results.pop(node_id, None)
+
+    def _done(self, ts: graphlib.TopologicalSorter, node_id: str) -> None:
+        """Marks a node as done and frees parents it was the last consumer of."""
+        ts.done(node_id)
+        self._release(node_id)
+        for parent_id in self.dep_list.get(node_id, []):
+            if parent_id in self.consumers:
+                self.consumers[parent_id] -= 1
+                self._release(parent_id)
+
+    def _fail(self, node_id: str, message: str) -> None:
+        self.skipped.add(node_id)
+        self.errors.setdefault(node_id, message)
+        self._emit("node_skipped", node_id, error=self.errors[node_id])
+
+    def _owns(self, parent_id: str) -> bool:
+        """
+        Whether the node about to run is the only remaining reader of a
+        parent's result: the parent has no other pending child, and the value
+        is neither kept (sink, session, cache) nor shared with another result.
+        """
+        if self.retain_results or is_sink(self.nmap[parent_id]):
+            return False
+        if self.consumers.get(parent_id) != 1:
+            return False  # Other children pending, or seeded from outside
+        if self.cache_status.get(parent_id) in ("hit", "miss"):
+            return False
+        value = self.results[parent_id]
+        return not any(
+            other is value
+            for other_id, other in self.results.items()
+            if other_id != parent_id
+        )
+
+    def _prepare(self, node_id: str) -> tuple[Callable, list[Any], list[bool]] | None:
+        """
+        Decides whether a ready node can run. Returns its processing function,
+        parent results and their ownership, or None if the node is skipped/ignored.
+        """
+        if node_id in self.validation_errors:
+            # Skip execution if validation failed earlier
+            self._emit("node_skipped", node_id, error=self.validation_errors[node_id])
+            return None
+
+        node = self.nmap[node_id]
+        processing_fun = NODE_PROCESSING_FUNCTIONS.get(node.type)
+
+        if not processing_fun:
+            if node.type in NODE_INDEGREE or node.type in MANIFEST_MAP:
+                print(
+                    f"Skipping node {node_id} ('{node.data.label}') - processing function missing (likely due to missing dependencies)."
+                )
+                self._fail(node_id, "Node is not correctly installed.")
+            else:
+                print(
+                    f"Ignoring node {node_id} ('{node.data.label}') - no processing function defined."
+                )
+            return None
+
+        parent_results = []
+        for parent_id in self.dep_list.get(node_id, []):
+            if parent_id in self.skipped or parent_id not in self.results:
+                parent_node = self.nmap.get(parent_id)
+                parent_label = (
+                    getattr(getattr(parent_node, "data", None), "label", "Unknown")
+                    if parent_node
+                    else "Unknown"
+                )
+                print(
+                    f"Skipping node {node_id} ('{node.data.label}') because parent node {parent_id} was skipped or missing results."
+                )
+                self._fail(
+                    node_id,
+                    f"Input from skipped parent '{parent_label}' ({parent_id}).",
+                )
+                return None
+            parent_results.append(self.results[parent_id])
+
+        owned = [self._owns(parent_id) for parent_id in self.dep_list.get(node_id, [])]
+        return processing_fun, parent_results, owned
+
+    def _cache_lookup(self, node_id: str) -> tuple[bool, Any]:
+        if self.cache is None:
+            return False, None
+
+        node = self.nmap[node_id]
+        parent_keys = [self.cache_keys.get(pid) for pid in self.dep_list[node_id]]
+        cacheable = NODE_INFO.get(node.type, {}).get("cacheable", True)
+        # Side-effect nodes (e.g. saveImage) and their children always run
+        if not cacheable or None in parent_keys:
+            self.cache_status[node_id] = "bypass"
+            return False, None
+
+        plan = self.read_plans.get(node_id)
+        key = node_cache_key(
+            node,
+            parent_keys,  # type: ignore[arg-type]
+            plan.describe() if plan is not None else None,
+        )
+        self.cache_keys[node_id] = key
+        hit, value = self.cache.get(key)
+        self.cache_status[node_id] = "hit" if hit else "miss"
+        if hit:
+            print(f"Cache hit for node: {node_id} ({node.type})")
+        return hit, value
+
+    def _plan(self, node_id: str) -> dict[str, Any] | None:
+        plan = self.read_plans.get(node_id)
+        return plan.kwargs() if plan is not None else None
+
+    def _run_node(
+        self,
+        node_id: str,
+        processing_fun: Callable,
+        parent_results: list[Any],
+        owned: list[bool],
+    ) -> Any:
+        node = self.nmap[node_id]
+        self.started_at[node_id] = time.perf_counter()
+        self._emit("node_started", node_id, type=node.type)
+        print(f"Executing node: {node_id} ({node.type})")
+        # A shared result is loaded into a private copy, which is always owned
+        owned = [
+            o or isinstance(p, SharedResult) for p, o in zip(parent_results, owned)
+        ]
+        inputs = [materialize(p) for p in parent_results]
+        result = call_plugin(processing_fun, node, inputs, owned, self._plan(node_id))
+        if node.type == "display":
+            # Counting a streamed output is a pass over the file, done here
+            # in the pool rather than in _finish on the scheduler thread
+            result = table_result(result)
+        return result
+
+    def _submit(
+        self,
+        pool: Executor,
+        node_id: str,
+        processing_fun: Callable,
+        parent_results: list[Any],
+        owned: list[bool],
+    ) -> Future:
+        if self.backend == "process":
+            # Cached or thread-computed parents are copied into blocks owned
+            # here, unlinked once the worker is done reading them
+            shared = [
+                p if isinstance(p, SharedResult) else SharedResult(export_value(p))
+                for p in parent_results
+            ]
+            self.started_at[node_id] = time.perf_counter()
+            self._emit("node_started", node_id, type=self.nmap[node_id].type)
+            fut = pool.submit(
+                _run_in_worker,
+                node_id,
+                self.nmap[node_id],
+                [p.ref for p in shared],
+                owned,
+                self._plan(node_id),
+            )
+            fut.add_done_callback(lambda _: shared.clear())
+            return fut
+        return pool.submit(
+            self._run_node, node_id, processing_fun, parent_results, owned
+        )
+
+    def _complete(self, node_id: str, fut: Future) -> None:
+        node = self.nmap[node_id]
+        try:
+            result = fut.result()
+        except Exception as e:
+            # Catch errors during the *execution* of a specific node
+            print(f"Error executing node '{node.data.label}' ({node_id}): {e}")
+            self.errors[node_id] = str(e)
+            self.skipped.add(node_id)
+            self._emit(
+                "node_failed",
+                node_id,
+                error=str(e),
+                durationMs=self._duration_ms(node_id),
+            )
+            if isinstance(e, BrokenProcessPool):
+                shutdown_process_pool()
+            return
+
+        if isinstance(result, SharedRef):
+            result = SharedResult(result)
+        if self.cache is not None and self.cache_status.get(node_id) == "miss":
+            self.cache.put(self.cache_keys[node_id], result)
+        self._finish(node_id, result)
+
+    def _finish(self, node_id: str, result: Any) -> None:
+        node = self.nmap[node_id]
+        table = result if isinstance(result, TableResult) else None
+        self.results[node_id] = table.value if table is not None else result
+        self.completed.add(node_id)
+
+        if node.type in ("display", "displayImage", "saveImage"):
+            result = materialize(result)
+
+        if node.type == "display":
+            # Only the row count, schema and first page go out, the rest
+            # stays in the result store for /results/{run_id}/{node_id}
+            try:
+                table = table or TableResult(result)
+                self.display_outputs[node_id] = table.page_json()
+                RESULT_STORE.put(self.run_id, node_id, table)
+            except Exception as json_err:
+                print(f"Error converting output of {node_id} to JSON: {json_err}")
+                self.errors[node_id] = f"Output could not be displayed: {json_err}"
+                self.display_outputs[node_id] = {
+                    "rows": 1,
+                    "schema": [{"name": "error", "dtype": "object"}],
+                    "offset": 0,
+                    "limit": 1,
+                    "data": [{"error": f"Could not serialize output: {json_err}"}],
+                }
+        elif node.type == "displayImage":
+            # The image stays here, the client fetches an encoding of it from
+            # /results/{run_id}/{node_id}/image
+            if result is not None:
+                image = ImageResult(result)
+                RESULT_STORE.put(self.run_id, node_id, image)
+                self.display_outputs[node_id] = image.describe()
+        elif node.type == "saveImage" and isinstance(result, str) and result:
+            self.dl_files[node_id] = result
+
+        if isinstance(result, BatchReport):
+            self.batch_reports[node_id] = result.to_dict()
+
+        # Sink outputs go out with the event, not only in the final response
+        event: dict[str, Any] = {"durationMs": self._duration_ms(node_id)}
+        if node_id in self.cache_status:
+            event["cache"] = self.cache_status[node_id]
+        if node_id in self.display_outputs:
+            event["output"] = self.display_outputs[node_id]
+        if node_id in self.dl_files:
+            event["downloadFile"] = self.dl_files[node_id]
+        if node_id in self.batch_reports:
+            event["batch"] = self.batch_reports[node_id]
+        self._emit("node_finished", node_id, **event)
+
+    def run(self) -> dict[str, Any]:
+        # Nodes with validation errors are removed as keys, but they still show
+        # up as parents of their children so the skip propagates.
+        if self.scope is None:
+            valid_dep_list = {
+                node_id: deps
+                for node_id, deps in self.dep_list.items()
+                if node_id not in self.validation_errors
+            }
+        else:
+            in_scope = set(self.scope)
+            valid_dep_list = {
+                node_id: [p for p in self.dep_list[node_id] if p in in_scope]
+                for node_id in self.scope
+                if node_id not in self.validation_errors
+            }
+        ts = graphlib.TopologicalSorter(valid_dep_list)
+        ts.prepare()  # Raises CycleError before anything runs
+        exec_order: tuple[str, ...] = tuple(
+            graphlib.TopologicalSorter(valid_dep_list).static_order()
+        )
+        for deps in valid_dep_list.values():
+            for parent_id in deps:
+                self.consumers[parent_id] = self.consumers.get(parent_id, 0) + 1
+
+        if self.backend == "process":
+            pool: Executor = get_process_pool()
+            pool_scope: Any = nullcontext()
+        else:
+            pool = pool_scope = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="node"
+            )
+
+        with pool_scope:
+            running: dict[Future, str] = {}
+            while ts.is_active():
+                for node_id in ts.get_ready():
+                    job = self._prepare(node_id)
+                    if job is None:
+                        self._done(ts, node_id)
+                        continue
+                    hit, value = self._cache_lookup(node_id)
+                    if hit:
+                        self._finish(node_id, value)
+                        self._done(ts, node_id)
+                        continue
+                    running[self._submit(pool, node_id, *job)] = node_id
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    node_id = running.pop(fut)
+                    self._complete(node_id, fut)
+                    self._done(ts, node_id)
+
+        return self._response(exec_order)
+
+    def _response(self, exec_order: tuple[str, ...]) -> dict[str, Any]:
+        # Validation failures first (graph order), then runtime skips in exec order
+        skipped_nodes = list(self.validation_errors)
+        skipped_nodes += [
+            nid
+            for nid in exec_order
+            if nid not in self.validation_errors and nid in self.skipped
+        ]
+        node_errors = dict(self.validation_errors)
+        node_errors.update(
+            {nid: self.errors[nid] for nid in exec_order if nid in self.errors}
+        )
+
+        # --- Determine Overall Status ---
+        final_status = "success"
+        if node_errors:
+            final_status = (
+                "partial_success" if self.completed else "error"
+            )  # Partial if at least something ran
+
+        return {
+            "status": final_status,
+            "message": "Graph execution finished.",
+            "runId": self.run_id,  # Pages of display outputs: /results/{runId}/...
+            "exec_order": exec_order,  # The order attempted
+            "output": {
+                nid: self.display_outputs[nid]
+                for nid in exec_order
+                if nid in self.display_outputs
+            },
+            "skipped_nodes": skipped_nodes,  # List of IDs that were skipped
+            "download_files": [
+                self.dl_files[nid] for nid in exec_order if nid in self.dl_files
+            ],
+            "node_errors": node_errors,  # Dictionary of {node_id: error_message}
+            "batch": {  # Images processed (and images/sec) by sinks run on a batch
+                nid: self.batch_reports[nid]
+                for nid in exec_order
+                if nid in self.batch_reports
+            },
+            "cache": {
+                nid: self.cache_status[nid]
+                for nid in exec_order
+                if nid in self.cache_status
+            },
+        }
+
+
+@dataclass
+class ExecutionPlan:
+    """Everything decided about a graph before its first node runs."""
+
+    nmap: dict[str, Node]
+    dep_list: dict[str, list[str]]
+    validation_errors: dict[str, str]
+    scope: list[str] | None = None
+    pruned_nodes: list[str] = field(default_factory=list)
+    rewrites: list[Rewrite] = field(default_factory=list)
+    read_plans: dict[str, ReadPlan] = field(default_factory=dict)
+    schemas: dict[str, Schema | None] = field(default_factory=dict)
+
+    def estimated_bytes(self) -> int:
+        """
+        Summed size of the node outputs whose schema gives one. An upper
+        bound of the memory a run needs, results are freed after their last
+        consumer (and a batch holds one image per worker at a time).
+        """
+        return sum(
+            nbytes
+            for schema in self.schemas.values()
+            if schema is not None and (nbytes := schema.nbytes()) is not None
+        )
+
+
+def plan_execution(
+    graph: GraphPayload,
+    dependencies: tuple[dict[str, Node], dict[str, list[str]]] | None = None,
+) -> ExecutionPlan:
+    """
+    Optimizer rewrites, demand-driven pruning, validation, typed schemas
+    and read plans. Raises CycleError for cyclic graphs.
+    `dependencies` is the node map and dependency list of the graph when
+    the caller keeps them itself (sessions), graph then only gives options.
+    """
+    if dependencies is None:
+        nmap, dep_list = build_dependency_list(graph.nodes, graph.edges)
+    else:
+        nmap, dep_list = dependencies
+
+    rewrites: list[Rewrite] = []
+    if graph.optimize:
+        nmap, dep_list, rewrites = optimize(nmap, dep_list)
+
+    # --- Demand-driven (pull) mode ---
+    scope: list[str] | None = None
+    pruned_nodes: list[str] = []
+    sinks = graph.sinks
+    if graph.preview:
+        # Sinks with side effects (files written) would see preview-sized
+        # data, they only run in full runs
+        if sinks is None:
+            sinks = [node_id for node_id, node in nmap.items() if is_sink(node)]
+        sinks = [
+            node_id
+            for node_id in sinks
+            if node_id not in nmap
+            or not NODE_INFO.get(nmap[node_id].type, {}).get("sideEffect")
+        ]
+    if graph.prune or sinks is not None:
+        scope = demanded_nodes(nmap, dep_list, sinks)
+        in_scope = set(scope)
+        pruned_nodes = [node_id for node_id in dep_list if node_id not in in_scope]
+        if pruned_nodes:
+            print(f"Pruned nodes not feeding any requested sink: {pruned_nodes}")
+
+    validation_errors = validate_indegrees(
+        nmap,
+        dep_list if scope is None else {nid: dep_list[nid] for nid in scope},
+    )
+
+    # Nodes that cannot accept their inputs' schema (wrong channels, a table
+    # into an image node, ...) fail before any data is read
+    schemas, schema_errors = infer_schemas(nmap, dep_list, scope)
+    for node_id, message in schema_errors.items():
+        validation_errors.setdefault(node_id, message)
+
+    # Columns and simple filters the sources can apply while reading
+    read_plans = plan_reads(
+        nmap,
+        dep_list,
+        validation_errors,
+        scope,
+        graph.previewOptions if graph.preview else None,
+    )
+
+    return ExecutionPlan(
+        nmap,
+        dep_list,
+        validation_errors,
+        scope,
+        pruned_nodes,
+        rewrites,
+        read_plans,
+        schemas,
+    )
+
+
+def _error_response(graph: GraphPayload, e: Exception) -> dict[str, Any]:
+    if isinstance(e, graphlib.CycleError):
+        print(f"Cycle Error: {e}")
+        message = f"Graph contains a cycle: {e}"
+    else:
+        # Catch unexpected errors during setup/sorting
+        print(f"General Execution Error: {e}")
+        message = f"An unexpected error occurred: {e}"
+    return {
+        "status": "error",
+        "message": message,
+        "node_errors": {},
+        "skipped_nodes": [node.id for node in graph.nodes],
+    }
+
+
+def execute(
+    graph: GraphPayload,
+    max_workers: int | None = None,
+    backend: ExecutorBackend | None = None,
+    cache: LRUCache | None = RESULT_CACHE,
+    on_event: Callable[[dict[str, Any]], None] | None = None,
+    run_id: str | None = None,
+) -> dict[str, Any]:
+    """
+    Validates and executes a graph, returning the /execute response payload.
+    Pass cache=None to recompute every node. Display outputs are stored
+    under `run_id` (a fresh id by default).
+    A preview run (graph.preview) is the same graph on smaller source data,
+    a full run of selected `sinks` can follow once the preview looks right.
+    """
+    try:
+        plan = plan_execution(graph)
+        response = GraphExecution(
+            plan.nmap,
+            plan.dep_list,
+            plan.validation_errors,
+            max_workers,
+            backend,
+            cache,
+            scope=plan.scope,
+            on_event=on_event,
+            read_plans=plan.read_plans,
+            run_id=run_id,
+        ).run()
+        response["pruned_nodes"] = plan.pruned_nodes  # Not needed by any sink
+        response["rewrites"] = [rewrite.to_dict() for rewrite in plan.rewrites]
+        response["preview"] = graph.preview
+        return response
+    except Exception as e:
+        return _error_response(graph, e)
+
+
+def explain(graph: GraphPayload) -> dict[str, Any]:
+    """The plan execute() would run for this graph, without running it."""
+    try:
+        plan = plan_execution(graph)
+    except Exception as e:
+        return _error_response(graph, e)
+
+    node_ids = plan.scope if plan.scope is not None else list(plan.dep_list)
+    dependencies = {node_id: plan.dep_list[node_id] for node_id in node_ids}
+    exec_order = list(graphlib.TopologicalSorter(dependencies).static_order())
+    schemas = {node_id: plan.schemas.get(node_id) for node_id in exec_order}
+    return {
+        "status": "success",
+        "exec_order": exec_order,
+        "nodes": [
+            plan.nmap[node_id].model_dump(mode="json")
+            for node_id in exec_order
+            if node_id in plan.nmap
+        ],
+        "dependencies": dependencies,
+        "rewrites": [rewrite.to_dict() for rewrite in plan.rewrites],
+        "read_plans": {
+            node_id: read_plan.describe()
+            for node_id, read_plan in plan.read_plans.items()
+        },
+        "pruned_nodes": plan.pruned_nodes,
+        "node_errors": plan.validation_errors,
+        "schemas": {
+            node_id: schema.to_dict() if schema is not None else None
+            for node_id, schema in schemas.items()
+        },
+        "estimated_bytes": plan.estimated_bytes(),
+    }
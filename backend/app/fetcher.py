@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import httpx
+
+APP_ROOT_DIR = Path(__file__).parent.parent
+
+# Where plugin code files are fetched from: an http(s) URL (the CDN or a
+# local HTTP mirror), a file:// URL or a plain local directory
+CDN_BASE_URL = os.environ.get(
+    "NEUROCIRCUIT_CDN_BASE_URL",
+    "https://cdn.jsdelivr.net/gh/Coder-Harshit/NeuroCircuit@main/",
+)
+# Fetched sources with their ETag / Last-Modified, revalidated on reuse
+FETCH_CACHE_DIR = Path(
+    os.environ.get("NEUROCIRCUIT_FETCH_CACHE_DIR", str(APP_ROOT_DIR / "fetch_cache"))
+)
+# Files fetched at the same time by one batch
+FETCH_CONCURRENCY = int(os.environ.get("NEUROCIRCUIT_FETCH_CONCURRENCY", "8"))
+# Attempts per file when the server answers 429 / 5xx (rate limiting)
+FETCH_ATTEMPTS = 3
+FETCH_TIMEOUT = 30.0
+
+
+def _local_root(base_url: str) -> Path | None:
+    """The directory base_url names, None if it is an HTTP(S) URL."""
+    parsed = urlparse(base_url)
+    if parsed.scheme in ("http", "https"):
+        return None
+    if parsed.scheme == "file":
+        return Path(unquote(parsed.path))
+    return Path(base_url)
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    # The plugin watcher must never see a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def _retry_after(resp: httpx.Response, attempt: int) -> float:
+    try:
+        return min(float(resp.headers.get("Retry-After", "")), 30.0)
+    except ValueError:
+        return float(2**attempt)
+
+
+class PluginFetcher:
+    """
+    Fetches plugin code files through one pooled HTTP client (connections
+    and TLS sessions are reused across files and installs).
+
+    Every fetched file is kept in cache_dir with its ETag / Last-Modified,
+    so fetching it again is a conditional request answered with 304 when
+    it did not change, and the cached copy is used when the server cannot
+    be reached. A local base (directory or file:// URL) is copied from
+    directly, for installs without the internet.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        cache_dir: Path,
+        concurrency: int = FETCH_CONCURRENCY,
+        client: httpx.Client | None = None,
+    ):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.cache_dir = cache_dir
+        self.concurrency = concurrency
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=FETCH_TIMEOUT,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=self.concurrency),
+                )
+            return self._client
+
+    def _cached(self, url: str) -> tuple[Path, Path]:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{name}.src", self.cache_dir / f"{name}.json"
+
+    def _download(self, url: str) -> bytes:
+        body_path, meta_path = self._cached(url)
+        headers = {}
+        if body_path.is_file() and meta_path.is_file():
+            meta = json.loads(meta_path.read_text())
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("lastModified"):
+                headers["If-Modified-Since"] = meta["lastModified"]
+
+        try:
+            for attempt in range(FETCH_ATTEMPTS):
+                resp = self.client.get(url, headers=headers)
+                if resp.status_code != 429 and resp.status_code < 500:
+                    break
+                if attempt < FETCH_ATTEMPTS - 1:
+                    time.sleep(_retry_after(resp, attempt))
+        except httpx.TransportError as e:
+            if headers:
+                print(f"Could not reach {url} ({e}), using the cached copy.")
+                return body_path.read_bytes()
+            raise
+
+        if resp.status_code == 304:
+            print(f"Not modified, using the cached copy of {url}")
+            return body_path.read_bytes()
+        resp.raise_for_status()
+        _write_atomic(body_path, resp.content)
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "lastModified": resp.headers.get("Last-Modified"),
+        }
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        return resp.content
+
+    def fetch(self, rel_path: str, save_path: Path) -> bool:
+        """Fetches base_url + rel_path into save_path. Returns False on failure."""
+        local_root = _local_root(self.base_url)
+        source = str(local_root / rel_path) if local_root else self.base_url + rel_path
+        print("Fetching code file from:", source)
+        try:
+            if local_root is not None:
+                content = Path(source).read_bytes()
+            else:
+                content = self._download(source)
+            _write_atomic(save_path, content)
+            return True
+        except httpx.HTTPStatusError as e:
+            print(
+                f"HTTP error fetching {source}: {e.response.status_code} - {e.response.text}"
+            )
+            return False
+        except (httpx.HTTPError, OSError, ValueError) as e:
+            print(f"Error fetching or saving {source}: {e}")
+            return False
+
+    def fetch_many(self, files: dict[str, Path]) -> list[str]:
+        """
+        Fetches {rel_path: save_path} concurrently over the pooled client.
+        Returns the rel_paths that could not be fetched.
+        """
+        if not files:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(self.concurrency, len(files)),
+            thread_name_prefix="plugin-fetch",
+        ) as pool:
+            done = dict(zip(files, pool.map(self.fetch, files, files.values())))
+        return [rel_path for rel_path, ok in done.items() if not ok]
+
+    def close(self) -> None:
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+PLUGIN_FETCHER = PluginFetcher(CDN_BASE_URL, FETCH_CACHE_DIR)
@@ -0,0 +1,181 @@
+import os
+import struct
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.cache import LRUCache, file_header
+
+# Byte budget of the process-wide cache of decoded images (0 disables it)
+DECODE_CACHE_MAX_BYTES = int(
+    os.environ.get("NEUROCIRCUIT_DECODE_CACHE_BYTES", str(256 * 1024 * 1024))
+)
+
+# Reduction factors OpenCV decodes at directly. Only JPEG scales while
+# decoding (in the DCT), other formats are decoded in full and then resized.
+_REDUCTIONS = (8, 4, 2)
+_REDUCIBLE_EXTENSIONS = {".jpg", ".jpeg"}
+_REDUCED_FLAGS = {
+    "IMREAD_COLOR": "IMREAD_REDUCED_COLOR_{}",
+    "IMREAD_GRAYSCALE": "IMREAD_REDUCED_GRAYSCALE_{}",
+}
+
+
+def _failed(path: str) -> str:
+    return (
+        f"Failed to load image. Check that the file exists and is a valid image: {path}"
+    )
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    """(mtime, size) of the file, a changed file never hits the cache."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise OSError(_failed(path)) from None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _key(path: str, stamp: tuple[int, int], flags: int, factor: int) -> str:
+    return f"{path}|{stamp[0]}|{stamp[1]}|{flags}|{factor}"
+
+
+def _reduced_flag(cv: Any, flags: int, factor: int) -> int | None:
+    """The IMREAD_REDUCED_* flag decoding `flags` at 1/factor, if there is one."""
+    for name, reduced in _REDUCED_FLAGS.items():
+        if flags == getattr(cv, name):
+            return getattr(cv, reduced.format(factor))
+    return None
+
+
+def _reduction(longest: int, max_dim: int) -> int:
+    """Largest factor still decoding at least max_dim pixels on the long side."""
+    for factor in _REDUCTIONS:
+        if longest // factor >= max_dim:
+            return factor
+    return 1
+
+
+class DecodeCache:
+    """
+    Decoded images by (path, mtime, size, decode flags, reduction), bounded
+    by bytes. The same upload read again by another run, node or session is
+    decoded only once, whatever the result cache kept.
+    Cached arrays are read-only: every reader shares them.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.entries = LRUCache(max_bytes)
+
+    def _decode(
+        self, path: str, stamp: tuple[int, int], flags: int, factor: int
+    ) -> np.ndarray:
+        import cv2 as cv  # Only VISION nodes decode images
+
+        key = _key(path, stamp, flags, factor)
+        hit, image = self.entries.get(key)
+        if hit:
+            return image
+
+        reduced = _reduced_flag(cv, flags, factor) if factor > 1 else flags
+        image = cv.imread(path, flags if reduced is None else reduced)
+        if image is None:
+            raise OSError(_failed(path))
+        image.setflags(write=False)
+        self.entries.put(key, image, image.nbytes)
+        return image
+
+    def read(self, path: str, flags: int | None = None, max_dim: int = 0) -> np.ndarray:
+        """
+        The image at path, decoded with the given cv.IMREAD_* flags (colour by
+        default). With max_dim > 0 it is scaled down to fit max_dim, decoding
+        a JPEG at 1/2, 1/4 or 1/8 resolution when that is still large enough,
+        so a preview never pays for a full-resolution decode.
+        """
+        import cv2 as cv
+
+        flags = cv.IMREAD_COLOR if flags is None else flags
+        stamp = _stamp(path)
+        if max_dim <= 0:
+            return self._decode(path, stamp, flags, 1)
+
+        hit, image = self.entries.get(_key(path, stamp, flags, 1))
+        if not hit:
+            # The header gives the size, hence the reduction, before decoding
+            factor = 1
+            size = image_size(path)
+            if size is not None and Path(path).suffix.lower() in _REDUCIBLE_EXTENSIONS:
+                factor = _reduction(max(size), max_dim)
+            image = self._decode(path, stamp, flags, factor)
+
+        height, width = image.shape[:2]
+        if max(height, width) <= max_dim:
+            return image
+        scale = max_dim / max(height, width)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv.resize(image, size, interpolation=cv.INTER_AREA)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+# --- Sizes from file headers, without decoding ---
+
+
+def _jpeg_size(f: Any) -> tuple[int, int] | None:
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue  # Markers without a length
+        (length,) = struct.unpack(">H", f.read(2))
+        # SOF0..SOF15 carry the frame size, C4 / C8 / CC are other tables
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_size(path: str) -> tuple[int, int] | None:
+    """(width, height) from the header of a PNG, JPEG, BMP or WebP file."""
+    with open(path, "rb") as f:
+        head = f.read(30)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return struct.unpack(">II", head[16:24])
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+        if head.startswith(b"BM"):
+            width, height = struct.unpack("<ii", head[18:26])
+            return width, abs(height)  # Negative for top-down bitmaps
+        if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(head[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return (
+                    int.from_bytes(head[24:27], "little") + 1,
+                    int.from_bytes(head[27:30], "little") + 1,
+                )
+    return None  # TIFF and others: only known once decoded
+
+
+def image_size(path: str) -> tuple[int, int] | None:
+    """
+    (width, height) of an image file read from its header (cached per file
+    version), None for unsupported formats. JPEGs with an EXIF rotation
+    decode with width and height swapped.
+    """
+    try:
+        return file_header(path, _read_size)
+    except (OSError, struct.error):
+        return None
+
+
+DECODE_CACHE = DecodeCache(DECODE_CACHE_MAX_BYTES)
@@ -0,0 +1,125 @@
+import os
+import re
+import subprocess
+import sys
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from app.jobs import MAX_FINISHED_JOBS, Job, JobManager
+
+# Directory of wheels to install from (pip --find-links), for offline machines
+WHEEL_DIR = os.environ.get("NEUROCIRCUIT_WHEEL_DIR", "")
+# Package index to install from instead of PyPI (pip --index-url), e.g. a
+# local mirror. With only WHEEL_DIR set, no index is contacted at all.
+PACKAGE_INDEX = os.environ.get("NEUROCIRCUIT_PACKAGE_INDEX", "")
+# Seconds a single pip run may take
+PIP_TIMEOUT = float(os.environ.get("NEUROCIRCUIT_PIP_TIMEOUT", "900"))
+# Lines of pip's output kept in a failed job's error
+PIP_ERROR_LINES = 20
+
+
+def canonical_name(name: str) -> str:
+    """A distribution name as pip compares them (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def pip_command(packages: list[str]) -> list[str]:
+    """The pip invocation installing all `packages` in one resolver run."""
+    cmd = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check"]
+    if WHEEL_DIR:
+        cmd += ["--find-links", WHEEL_DIR]
+        if not PACKAGE_INDEX:
+            cmd.append("--no-index")
+    if PACKAGE_INDEX:
+        cmd += ["--index-url", PACKAGE_INDEX]
+    return cmd + packages
+
+
+def pip_install(packages: list[str]) -> None:
+    """Runs pip, raises RuntimeError with the end of its output if it fails."""
+    cmd = pip_command(packages)
+    print("Running Command: ", " ".join(cmd))
+    try:
+        subprocess.run(
+            cmd,
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=PIP_TIMEOUT,
+        )
+    except subprocess.CalledProcessError as err:
+        output = (err.stderr or err.stdout or "").strip().splitlines()
+        message = "\n".join(output[-PIP_ERROR_LINES:]) or str(err)
+        raise RuntimeError(f"Failed to install dependencies: {message}") from None
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(
+            f"Installing {', '.join(packages)} took more than {PIP_TIMEOUT:.0f}s."
+        ) from None
+
+
+class InstallQueue:
+    """
+    Installs node types as background jobs, one pip run at a time (pip
+    itself is not safe to run concurrently on one environment).
+
+    A request for several node types installs all their dependencies in one
+    resolver run. A node type already queued or installing is not queued
+    again, its job is handed out instead. Jobs check what is installed when
+    they start, so a package an earlier job (jobs run in order) installed
+    is not passed to pip again, one it failed to install is retried.
+    """
+
+    def __init__(
+        self,
+        dependencies: Callable[[str], list[str]],
+        installed: Callable[[], set[str]],
+        finish: Callable[[Job, list[str]], dict[str, Any]],
+        keep_finished: int = MAX_FINISHED_JOBS,
+    ):
+        self.dependencies = dependencies  # node type -> its pip packages
+        self.installed = installed  # names of the installed distributions
+        self.finish = finish  # Fetches code files, rescans, returns the result
+        self.jobs = JobManager(1, keep_finished, name="install-job")
+        self._lock = threading.Lock()
+        self._node_jobs: dict[str, Job] = {}  # Queued / installing node types
+
+    def submit(self, node_types: list[str]) -> dict[str, Job]:
+        """Queues the node types not queued yet. Returns {node_type: job}."""
+        with self._lock:
+            jobs = {
+                node_type: self._node_jobs[node_type]
+                for node_type in node_types
+                if node_type in self._node_jobs
+            }
+            new = list(dict.fromkeys(t for t in node_types if t not in jobs))
+            if not new:
+                return jobs
+
+            packages: dict[str, str] = {}  # Spelled as the first manifest does
+            for node_type in new:
+                for dep in self.dependencies(node_type):
+                    packages.setdefault(canonical_name(dep), dep)
+            job = self.jobs.submit(
+                "install", lambda job: self._run(job, new, list(packages.values()))
+            )
+            for node_type in new:
+                self._node_jobs[node_type] = jobs[node_type] = job
+            return jobs
+
+    def _run(self, job: Job, node_types: list[str], packages: list[str]) -> Any:
+        try:
+            installed = {canonical_name(name) for name in self.installed()}
+            missing = [p for p in packages if canonical_name(p) not in installed]
+            if missing:
+                job.emit({"event": "pip_started", "packages": missing})
+                pip_install(missing)
+                job.emit({"event": "pip_finished", "packages": missing})
+            else:
+                print(f"No Python dependencies to install for: {', '.join(node_types)}")
+            return {"packages": missing, **self.finish(job, node_types)}
+        finally:
+            with self._lock:
+                for node_type in node_types:
+                    if self._node_jobs.get(node_type) is job:
+                        del self._node_jobs[node_type]
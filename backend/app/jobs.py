@@ -0,0 +1,139 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+# Graphs running in the background at the same time
+MAX_RUNNING_JOBS = int(os.environ.get("NEUROCIRCUIT_MAX_RUNNING_JOBS", "2"))
+# Finished jobs kept around for polling/replay before they are dropped
+MAX_FINISHED_JOBS = int(os.environ.get("NEUROCIRCUIT_MAX_FINISHED_JOBS", "64"))
+
+
+class Job:
+    """
+    A unit of background work with an append-only event log.
+
+    Events are numbered in order so a client can (re)connect at any time and
+    replay everything after the last id it saw. Async listeners are woken up
+    through their own event loop, the producer runs on a worker thread.
+    """
+
+    def __init__(self, job_id: str, kind: str):
+        self.id = job_id
+        self.kind = kind
+        self.status = "queued"  # queued -> running -> finished / failed
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.events: list[dict[str, Any]] = []
+
+        self._lock = threading.Lock()
+        self._listeners: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("finished", "failed")
+
+    def emit(self, event: dict[str, Any], status: str | None = None) -> None:
+        """Appends an event, optionally moving the job to a new status with it."""
+        with self._lock:
+            if status is not None:
+                self.status = status
+            event = {"id": len(self.events), "time": time.time(), **event}
+            self.events.append(event)
+            listeners = list(self._listeners)
+        for loop, waiter in listeners:
+            loop.call_soon_threadsafe(waiter.set)
+
+    def events_after(self, last_id: int) -> list[dict[str, Any]]:
+        with self._lock:
+            return self.events[last_id + 1 :]
+
+    async def stream(self, last_id: int = -1, heartbeat: float = 15.0):
+        """
+        Async iterator over the events after `last_id`, ending once the job is
+        done. Yields None when nothing happened for `heartbeat` seconds.
+        """
+        waiter = asyncio.Event()
+        listener = (asyncio.get_running_loop(), waiter)
+        with self._lock:
+            self._listeners.add(listener)
+        try:
+            while True:
+                waiter.clear()
+                for event in self.events_after(last_id):
+                    last_id = event["id"]
+                    yield event
+                if self.done and not self.events_after(last_id):
+                    return
+                try:
+                    await asyncio.wait_for(waiter.wait(), timeout=heartbeat)
+                except TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._listeners.discard(listener)
+
+    def summary(self) -> dict[str, Any]:
+        info: dict[str, Any] = {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "events": len(self.events),
+        }
+        if self.done:
+            info["result"] = self.result
+            info["error"] = self.error
+        return info
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and keeps the recent ones."""
+
+    def __init__(self, workers: int, keep_finished: int, name: str = "job"):
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[Job], Any]) -> Job:
+        """Queues fn(job); its return value becomes the job result."""
+        job = Job(uuid.uuid4().hex, kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.emit({"event": "job_queued"})
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        job.emit({"event": "job_started"}, status="running")
+        try:
+            job.result = fn(job)
+            status = "finished"
+        except Exception as e:  # Like execute: any failure ends up on the job
+            print(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            status = "failed"
+        job.emit(
+            {"event": f"job_{status}", "result": job.result, "error": job.error},
+            status=status,
+        )
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+GRAPH_JOBS = JobManager(MAX_RUNNING_JOBS, MAX_FINISHED_JOBS, name="graph-job")
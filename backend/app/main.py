@@ -1,28 +1,45 @@
 import json
 import os
 from pathlib import Path
-import subprocess
-import sys
 import shutil
-from typing import Any, Dict, List, Set
-from fastapi import BackgroundTasks, FastAPI, HTTPException, UploadFile, File
+from typing import Any
+from fastapi import (
+    BackgroundTasks,
+    FastAPI,
+    Header,
+    HTTPException,
+    UploadFile,
+    File,
+    WebSocket,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-import httpx
-from app.processors.node_map import (
-    NODE_INDEGREE,
-    NODE_PROCESSING_FUNCTIONS,
-    NODE_INSPECTION_FUNCTIONS,
-    discover_plugins,
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.processors.node_map import refresh_plugins, watch_plugins
+from app.classes import GraphPatch, GraphPayload, InspectRequest
+from app import engine
+from app.dataframes import arrow_available
+from app.results import (
+    ARROW_STREAM_MEDIA_TYPE,
+    IMAGE_FORMATS,
+    RESULT_PAGE_ROWS,
+    RESULT_STORE,
+    ImageResult,
+    TableResult,
 )
-from app.classes import GraphPayload, InspectRequest
+from app.fetcher import PLUGIN_FETCHER
+from app.installs import InstallQueue
+from app.jobs import GRAPH_JOBS, Job
+from app.schema_types import TableSchema
+from app.schemas import input_schema
+from app.sessions import SESSIONS
 import graphlib
 
-from app.package_manager import get_node_status, MANIFEST_MAP
+from app.package_manager import get_node_status, MANIFEST_INDEX, MANIFEST_MAP
 
 APP_DIR = Path(__file__).parent.parent
 BACKEND_PLUGINS_DIR = APP_DIR / "plugins"
-CDN_BASE_URL = "https://cdn.jsdelivr.net/gh/Coder-Harshit/NeuroCircuit@main/"
+# Seconds between scans of the plugins directory for dropped-in plugins (0: off)
+PLUGIN_WATCH_SECONDS = float(os.environ.get("NEUROCIRCUIT_PLUGIN_WATCH_SECONDS", "0"))
 BACKEND_PLUGINS_DIR.mkdir(parents=True, exist_ok=True)
 
 TEMP_UPLOAD_DIR = Path("temp_uploads")
@@ -50,6 +67,26 @@ def remove_file(path: Path):
         print(f"Error removing temporary file {path}: {e}")
 
 
+def _plugins_changed(changes: dict[str, list[str]]) -> None:
+    # Warm executor processes hold the old registry, retire them
+    engine.shutdown_process_pool()
+
+
+def rescan_plugins():
+    """
+    Re-scans the plugins directory: only added, changed or removed plugin
+    files (and those that failed to import) are re-registered, the rest of
+    the registry stays in place for the runs in flight.
+    """
+    changes = refresh_plugins()
+    if any(changes.values()):
+        _plugins_changed(changes)
+
+
+if PLUGIN_WATCH_SECONDS > 0:
+    watch_plugins(PLUGIN_WATCH_SECONDS, on_change=_plugins_changed)
+
+
 @app.get("/")
 def read_root():
     return {"message": "Hello from the AI Graph Executor Backend!"}
@@ -57,294 +94,273 @@ def read_root():
 
 @app.post("/execute")
 def execute_graph(graph: GraphPayload) -> dict[str, Any]:
-    nmap = {node.id: node for node in graph.nodes}  # HASHMAP for quickly finding nodes
+    """
+    Executes the graph, running independent branches concurrently.
+    With `preview` set the sources read downscaled images and a sample of
+    rows, for fast approximate results while editing.
+    """
+    return engine.execute(graph)
 
-    # We would need to perform topological sort as the nodes could be in random order, i.e. to make sure dependencies are finished first and then only main task is executed
 
-    # dep_list => DEPENDENCY LIST (opposite of ADJ. LIST)
-    dep_list: dict[str, set[str]] = {node.id: set() for node in graph.nodes}
-    # generated the dep_list
+@app.post("/explain")
+def explain_graph(graph: GraphPayload) -> dict[str, Any]:
+    """
+    Returns the plan /execute would run for this graph: the optimizer
+    rewrites, the execution order, pruned nodes and source read plans.
+    """
+    return engine.explain(graph)
 
-    skipped_nodes: list[str] = []  # To track skipped nodes
-    node_errors: dict[str, str] = {}  # To track errors per node
 
-    for edg in graph.edges:
-        # going from tgt to source becuase we actually want to generate the dependency list
-        if edg.target in nmap and edg.source in nmap:
-            dep_list[edg.target].add(edg.source)
-        else:
-            print(
-                f"Warning: Skipping edge {edg.id} ({edg.source} -> {edg.target}) due to missing node."
-            )
+@app.post("/jobs")
+def submit_job(graph: GraphPayload) -> dict[str, Any]:
+    """
+    Queues the graph for background execution and returns immediately.
+    Progress is streamed from /jobs/{job_id}/events (SSE) or /jobs/{job_id}/ws.
+    """
+    job = GRAPH_JOBS.submit(
+        "execute",
+        lambda job: engine.execute(graph, on_event=job.emit, run_id=job.id),
+    )
+    return {"status": "success", "jobId": job.id}
 
-    # --- In-degree validation ---
-    for node_id, parents in dep_list.items():
-        node = nmap.get(node_id)
-        if not node:
-            continue  # Skip if node doesn't exist (handled above)
-
-        node_type = node.type
-        expected_indegree = NODE_INDEGREE.get(node_type)
-
-        is_valid = False
-        if isinstance(expected_indegree, int) and len(parents) == expected_indegree:
-            is_valid = True
-        elif (
-            isinstance(expected_indegree, list)
-            and expected_indegree[0] <= len(parents) <= expected_indegree[1]
-        ):
-            is_valid = True
-
-        # Allow nodes with no processing function (like noteNode) to bypass degree checks if not specified
-        if expected_indegree is None and node_type not in NODE_PROCESSING_FUNCTIONS:
-            is_valid = True
-
-        if not is_valid:
-            error_msg = f"Node '{node.data.label}' ({node_id}) expects {expected_indegree} inputs but has {len(parents)}."
-            print(f"Validation Error: {error_msg}")
-            # Instead of returning immediately, store the error and skip the node later
-            node_errors[node_id] = error_msg
-            skipped_nodes.append(node_id)
-            # We don't return here, let topological sort handle propagation if possible
-
-    # --- Topological Sort and Execution ---
-    try:
-        # Filter out nodes with validation errors before sorting
-        valid_dep_list = {
-            node_id: deps
-            for node_id, deps in dep_list.items()
-            if node_id not in node_errors
-        }
-        ts = graphlib.TopologicalSorter(valid_dep_list)
-        exec_order: tuple[str, ...] = tuple(ts.static_order())
-
-        results: dict[str, Any] = {}
-        display_outputs: dict[str, str] = {}
-        dl_files: list[str] = []
-
-        for node_id in exec_order:
-            # Although already filtered, double-check just in case
-            if node_id in node_errors:
-                if node_id not in skipped_nodes:
-                    skipped_nodes.append(node_id)
-                continue  # Skip execution if validation failed earlier
-
-            node = nmap[node_id]
-            processing_fun = NODE_PROCESSING_FUNCTIONS.get(node.type)
-
-            if not processing_fun:
-                if node.type in NODE_INDEGREE or node.type in MANIFEST_MAP:
-                    print(
-                        f"Skipping node {node_id} ('{node.data.label}') - processing function missing (likely due to missing dependencies)."
-                    )
-                    if node_id not in skipped_nodes:
-                        skipped_nodes.append(node_id)
-                    if node_id not in node_errors:
-                        node_errors[node_id] = "Node is not correctly installed."
-                else:
-                    print(
-                        f"Ignoring node {node_id} ('{node.data.label}') - no processing function defined."
-                    )
-                continue
 
-            try:
-                parent_node_ids = dep_list.get(node_id, set())
-                parent_results = []
-                can_execute = True
-                for parent_id in parent_node_ids:
-                    if parent_id in skipped_nodes or parent_id not in results:
-                        parent_node = nmap.get(parent_id)
-                        parent_label = (
-                            getattr(
-                                getattr(parent_node, "data", None), "label", "Unknown"
-                            )
-                            if parent_node
-                            else "Unknown"
-                        )
-                        print(
-                            f"Skipping node {node_id} ('{node.data.label}') because parent node {parent_id} was skipped or missing results."
-                        )
-                        if node_id not in skipped_nodes:
-                            skipped_nodes.append(node_id)
-                        if node_id not in node_errors:
-                            node_errors[node_id] = (
-                                f"Input from skipped parent '{parent_label}' ({parent_id})."
-                            )
-                        can_execute = False
-                        break
-                    parent_results.append(results[parent_id])
-
-                if not can_execute:
-                    continue  # Skip to next node in exec_order
-
-                # --- Execute the node ---
-                print(f"Executing node: {node_id} ({node.type})")
-                result = processing_fun(node.data, parent_results)
-                results[node_id] = result
-
-                if node.type == "display":
-                    # Safely convert to JSON, handling potential non-serializable data
-                    try:
-                        display_outputs[node_id] = result.to_json(
-                            orient="records", default_handler=str
-                        )
-                    except Exception as json_err:
-                        print(
-                            f"Error converting output of {node_id} to JSON: {json_err}"
-                        )
-                        node_errors[node_id] = (
-                            f"Output could not be displayed: {json_err}"
-                        )
-                        display_outputs[node_id] = json.dumps(
-                            [{"error": f"Could not serialize output: {json_err}"}]
-                        )
-                elif node.type == "displayImage":
-                    display_outputs[node_id] = (
-                        result  # The result is already the base64 string
-                    )
-                elif node.type == "saveImage":
-                    if isinstance(result, str) and result:
-                        dl_files.append(result)
-
-            except Exception as e:
-                # Catch errors during the *execution* of a specific node
-                error_msg = f"Error executing node '{node.data.label}' ({node_id}): {e}"
-                print(error_msg)
-                node_errors[node_id] = str(e)
-                if node_id not in skipped_nodes:
-                    skipped_nodes.append(node_id)
-                # Continue the loop to see if other independent branches can run
-
-        # --- Determine Overall Status ---
-        final_status = "success"
-        if node_errors:
-            final_status = (
-                "partial_success" if results else "error"
-            )  # Partial if at least something ran
+def _find_job(job_id: str) -> Job | None:
+    return GRAPH_JOBS.get(job_id) or INSTALLS.jobs.get(job_id)
 
-        return {
-            "status": final_status,
-            "message": "Graph execution finished.",
-            "exec_order": exec_order,  # The order attempted
-            "output": display_outputs,
-            "skipped_nodes": skipped_nodes,  # List of IDs that were skipped
-            "download_files": dl_files,
-            "node_errors": node_errors,  # Dictionary of {node_id: error_message}
-        }
 
-    except graphlib.CycleError as e:
-        print(f"Cycle Error: {e}")
-        # Identify nodes involved in the cycle if possible (more advanced)
-        return {
-            "status": "error",
-            "message": f"Graph contains a cycle: {e}",
-            "node_errors": {},
-            "skipped_nodes": list(nmap.keys()),
-        }
-    except Exception as e:
-        # Catch unexpected errors during setup/sorting
-        print(f"General Execution Error: {e}")
-        return {
-            "status": "error",
-            "message": f"An unexpected error occurred: {e}",
-            "node_errors": {},
-            "skipped_nodes": list(nmap.keys()),
-        }
+def _get_job(job_id: str) -> Job:
+    job = _find_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
 
 
-@app.get("/nodes/status")
-def list_node_statuses():
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> dict[str, Any]:
     """
-    Provides the status of all available nodes and their dependencies.
+    Polls a job. Its result is included once it is done: the full /execute
+    response for graph jobs, the installed packages for install jobs.
     """
-    return get_node_status()
+    return _get_job(job_id).summary()
 
 
-async def fetch_codefile_cnd(rel_path: str, save_path: Path) -> bool:
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: int = Header(-1)):
     """
-    Fetches a code file from the jsDelivr CDN and saves it locally.
+    Server-Sent Events stream of a job's progress. Reconnecting clients send
+    Last-Event-ID and only receive what they missed.
     """
-    url = f"{CDN_BASE_URL}{rel_path}"
-    print("Fetching code file from:", url)
+    job = _get_job(job_id)
 
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(save_path, "w", encoding="utf-8") as f:
-                f.write(resp.text)
-                return True
-        except httpx.HTTPStatusError as e:
-            print(
-                f"HTTP error fetching {url}: {e.response.status_code} - {e.response.text}"
-            )
-            return False
-        except Exception as e:
-            print(f"Error fetching or saving {url}: {e}")
-            return False
+    async def event_source():
+        async for event in job.stream(last_event_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
 
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@app.post("/packages/install")
-async def install_node(payload: dict[str, Any]):
-    print(payload)
+
+@app.websocket("/jobs/{job_id}/ws")
+async def job_websocket(websocket: WebSocket, job_id: str):
     """
-    Installs node deps & code files
+    Same progress events as /jobs/{job_id}/events, one JSON message each.
     """
-    node_type = payload.get("nodeType")
-    deps = payload.get("deps", [])
+    await websocket.accept()
+    job = _find_job(job_id)
+    if job is None:
+        await websocket.close(code=4404, reason="Job not found.")
+        return
+    async for event in job.stream():
+        if event is not None:
+            await websocket.send_text(json.dumps(event, default=str))
+    await websocket.close()
+
+
+@app.post("/sessions")
+def create_session(graph: GraphPayload) -> dict[str, Any]:
+    """
+    Stores the graph server-side and runs it once. Later edits are sent as
+    diffs to /sessions/{session_id}/patch.
+    """
+    session = SESSIONS.create(graph)
+    with session.lock:
+        return session.run(set(session.nmap))
 
-    if not node_type:
-        return {"status": "error", "message": "No node type provided"}
 
-    if deps:
-        print(f"Installing dependencies for {node_type}: {', '.join(deps)}")
+@app.post("/sessions/{session_id}/patch")
+def patch_session(session_id: str, patch: GraphPatch) -> dict[str, Any]:
+    """
+    Applies node/edge diffs to a session and re-executes only the nodes
+    downstream of the change.
+    """
+    session = SESSIONS.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    with session.lock:
+        return session.run(session.apply_patch(patch))
+
+
+@app.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    if not SESSIONS.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return {"status": "success", "message": f"Session '{session_id}' closed."}
+
+
+@app.get("/results/{run_id}/{node_id}")
+def get_result_page(
+    run_id: str,
+    node_id: str,
+    offset: int = 0,
+    limit: int = RESULT_PAGE_ROWS,
+    format: str = "json",
+):
+    """
+    One page of a display node's output. `runId` comes from the /execute,
+    /jobs or /sessions response. format=arrow returns an Arrow IPC stream
+    instead of JSON records (needs pyarrow).
+    """
+    table = RESULT_STORE.get(run_id, node_id)
+    if not isinstance(table, TableResult):
+        raise HTTPException(
+            status_code=404, detail="Result not found, run the graph again."
+        )
+    if format == "arrow":
+        if not arrow_available():
+            raise HTTPException(
+                status_code=501, detail="Arrow output needs pyarrow installed."
+            )
+        return Response(
+            table.page_arrow(offset, limit),
+            media_type=ARROW_STREAM_MEDIA_TYPE,
+            headers={"X-Total-Rows": str(table.rows)},
+        )
+    if format != "json":
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    return table.page_json(offset, limit)
+
+
+@app.get("/results/{run_id}/{node_id}/image")
+def get_result_image(
+    run_id: str,
+    node_id: str,
+    format: str = "jpeg",
+    quality: int = 90,
+    maxDim: int = 0,
+    if_none_match: str | None = Header(None),
+):
+    """
+    A displayImage node's output, encoded as JPEG, WebP or PNG. maxDim > 0
+    returns a thumbnail whose longer side is at most maxDim pixels. Clients
+    sending the ETag back in If-None-Match get 304 for an unchanged image.
+    """
+    image = RESULT_STORE.get(run_id, node_id)
+    if not isinstance(image, ImageResult):
+        raise HTTPException(
+            status_code=404, detail="Image not found, run the graph again."
+        )
+    if format not in IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    quality = min(max(quality, 1), 100)
+
+    etag = image.etag(format, quality, maxDim)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
 
-        try:
-            cmd = [sys.executable, "-m", "pip", "install"] + deps
-            print("Running Command: ", [" ".join(cmd)])
-            subprocess.check_call(cmd)
-        except subprocess.CalledProcessError as err:
-            error_output = err.stderr.decode("utf-8") if err.stderr else str(err)
-            print(f"Failed to install dependencies: {error_output}")
-            return {
-                "status": "error",
-                "message": f"Failed to install dependencies: {error_output}",
-            }
-        except Exception as e:
-            print(f"Unexpected error during dependency installation: {e}")
-            return {
-                "status": "error",
-                "message": f"Unexpected error during dependency installation: {e}",
-            }
-    else:
-        print(f"No Python dependencies to install for node type: {node_type}")
+    try:
+        content = image.encode(format, quality, maxDim)
+    except Exception as e:
+        print(f"Error encoding image of {node_id}: {e}")
+        raise HTTPException(status_code=422, detail=f"Could not encode image: {e}")
+    return Response(content, media_type=IMAGE_FORMATS[format][0], headers=headers)
 
-    if node_type not in MANIFEST_MAP:
-        return {"status": "error", "message": f"Unknown node type: {node_type}"}
 
-    py_filename = MANIFEST_MAP.get(node_type, "GENERAL") + "_" + node_type + ".py"
-    py_rel_path = f"backend/plugins/{py_filename}"
-    py_save_path = BACKEND_PLUGINS_DIR / py_filename
+@app.get("/nodes/status")
+def list_node_statuses():
+    """
+    Provides the status of all available nodes and their dependencies.
+    """
+    return get_node_status()
 
-    if not os.path.exists(py_save_path):
-        if not await fetch_codefile_cnd(py_rel_path, py_save_path):
-            return {
-                "status": "error",
-                "message": f"Failed to fetch code file for node type: {node_type}",
-            }
-    else:
-        print("PLUGIN CODE FILE ALREADY PRESENT!")
+
+def _finish_install(job: Job, node_types: list[str]) -> dict[str, Any]:
+    """
+    Second half of an install job, once the dependencies are in: downloads
+    the missing plugin code files and re-scans the plugins.
+    """
+    missing: dict[str, str] = {}  # rel_path -> node type
+    for node_type in node_types:
+        py_filename = MANIFEST_MAP.get(node_type, "GENERAL") + "_" + node_type + ".py"
+        if (BACKEND_PLUGINS_DIR / py_filename).exists():
+            print("PLUGIN CODE FILE ALREADY PRESENT!")
+        else:
+            missing[f"backend/plugins/{py_filename}"] = node_type
+
+    # All of them at once, over the fetcher's pooled connections
+    failed = PLUGIN_FETCHER.fetch_many(
+        {rel_path: BACKEND_PLUGINS_DIR / Path(rel_path).name for rel_path in missing}
+    )
+    if failed:
+        raise RuntimeError(
+            f"Failed to fetch code file for node type: {', '.join(missing[p] for p in failed)}"
+        )
+    for node_type in missing.values():
+        job.emit({"event": "plugin_fetched", "nodeType": node_type})
 
     print("Re-scanning backend plugins...")
-    discover_plugins()
+    rescan_plugins()
 
-    msg = f"Node '{node_type}' processed. Dependencies checked/installed. Backend code checked/downloaded."
+    return {
+        "nodeTypes": node_types,
+        "message": f"Node(s) {', '.join(node_types)} processed. Dependencies checked/installed. Backend code checked/downloaded.",
+    }
+
+
+INSTALLS = InstallQueue(
+    dependencies=lambda node_type: (MANIFEST_INDEX.manifest(node_type) or {}).get(
+        "dependencies", []
+    ),
+    installed=MANIFEST_INDEX.installed_packages,
+    finish=_finish_install,
+)
+
+
+@app.post("/packages/install")
+def install_node(payload: dict[str, Any]):
+    """
+    Queues the installation of a node type ("nodeType"), or of several at
+    once ("nodeTypes", their dependencies resolved in a single pip run),
+    and returns immediately. The dependencies are the ones the manifests
+    list, installed from NEUROCIRCUIT_WHEEL_DIR / NEUROCIRCUIT_PACKAGE_INDEX
+    when set. Poll /jobs/{jobId} until it is finished or failed.
+    """
+    node_types = payload.get("nodeTypes") or (
+        [payload["nodeType"]] if payload.get("nodeType") else []
+    )
+    if not node_types:
+        return {"status": "error", "message": "No node type provided"}
+
+    MANIFEST_INDEX.refresh()  # Picks up manifests added since startup
+    unknown = [node_type for node_type in node_types if node_type not in MANIFEST_MAP]
+    if unknown:
+        return {
+            "status": "error",
+            "message": f"Unknown node type: {', '.join(unknown)}",
+        }
 
+    jobs = INSTALLS.submit(node_types)
     return {
         "status": "success",
-        "message": msg,
-        # "frontend_needs_restart": True
+        "jobId": jobs[node_types[0]].id,
+        "jobs": {node_type: job.id for node_type, job in jobs.items()},
+        "message": f"Installing {', '.join(node_types)} in the background.",
     }
 
 
@@ -358,6 +374,7 @@ async def uninstall_node(payload: dict[str, Any]):
     if not node_type:
         return {"status": "error", "message": "No node type provided"}
 
+    MANIFEST_INDEX.refresh()  # Picks up manifests added since startup
     if node_type not in MANIFEST_MAP:
         return {"status": "error", "message": f"Unknown node type: {node_type}"}
 
@@ -368,7 +385,7 @@ async def uninstall_node(payload: dict[str, Any]):
         if plugin_path.is_file():
             os.remove(plugin_path)
             print("REMOVED plugin file", plugin_path)
-            discover_plugins()
+            rescan_plugins()
 
             return {
                 "status": "success",
@@ -378,7 +395,7 @@ async def uninstall_node(payload: dict[str, Any]):
             print(f"Uninstall failed: Plugin file not found at {plugin_path}")
             # If file is not found, it's already "uninstalled".
             # We should still re-scan just in case and return success.
-            discover_plugins()
+            rescan_plugins()
             return {
                 "status": "success",
                 "message": f"Node '{node_type}' was not installed, state refreshed.",
@@ -420,53 +437,21 @@ async def uninstall_node(payload: dict[str, Any]):
 async def inspect(request: InspectRequest):
     """
     Inspects the graph to determine the input schema for a target node by
-    performing a lightweight metadata propagation.
+    performing a lightweight metadata propagation over the target's
+    ancestors only (see app.schemas, schemas and file headers are memoised).
+    `columns` lists the column names, `schema` is the typed schema (dtypes
+    and row estimate, or image shape), `error` a mismatch found upstream.
     """
-    nmap = {node.id: node for node in request.nodes}
-
-    # Build the dependency list for the topological sort
-    dep_list: Dict[str, Set[str]] = {node.id: set() for node in request.nodes}
-    for edge in request.edges:
-        dep_list[edge.target].add(edge.source)
-
-    # Sort the graph topologically to get the execution order
+    nmap, dep_list = engine.build_dependency_list(request.nodes, request.edges)
     try:
-        ts = graphlib.TopologicalSorter(dep_list)
-        sorted_nodes = list(ts.static_order())
+        schema, error = input_schema(nmap, dep_list, request.targetNodeId)
     except graphlib.CycleError:
         return {"columns": ["Error: Cycle detected in graph"]}
-
-    # --- METADATA PROPAGATION ---
-    # We will store the output schema (column list) of each node here
-    schemas: Dict[str, List[str]] = {}
-
-    # "Dry run" the graph, node by node
-    for node_id in sorted_nodes:
-        node = nmap[node_id]
-
-        # Find the schemas of the parent nodes
-        parent_ids = dep_list[node.id]
-        input_schemas = [schemas.get(pid, []) for pid in parent_ids]
-
-        # Get the appropriate inspection function for this node type
-        inspect_func = NODE_INSPECTION_FUNCTIONS.get(node.type)
-
-        if inspect_func:
-            # Call the node's inspection function with its data and input schemas
-            output_schema = inspect_func(node.data, input_schemas)
-            schemas[node.id] = output_schema
-        else:
-            # If no inspection function, assume the schema passes through unchanged
-            # (This is a safe default for nodes like "Note" or "Display")
-            schemas[node.id] = input_schemas[0] if input_schemas else []
-
-        # If we have just processed the parent of our target, we have our answer
-        for edge in request.edges:
-            if edge.target == request.targetNodeId and edge.source == node_id:
-                return {"columns": schemas.get(node_id, [])}
-
-    # If the target node had no parent or something went wrong
-    return {"columns": []}
+    return {
+        "columns": schema.names if isinstance(schema, TableSchema) else [],
+        "schema": schema.to_dict() if schema is not None else None,
+        "error": error,
+    }
 
 
 @app.post("/files/upload")
@@ -496,11 +481,12 @@ async def upload_file(file: UploadFile = File(...)):
 async def download_file(filepath: str, bg_tasks: BackgroundTasks):
     """
     Downloads a file from the temporary directory and deletes it afterwards.
+    filepath is relative to it, e.g. an output of a batch saveImage node.
     """
     try:
         # Create the full path and resolve any ".." components
         secure_base_path = TEMP_UPLOAD_DIR.resolve()
-        file_to_download = (secure_base_path / Path(filepath).name).resolve()
+        file_to_download = (secure_base_path / filepath).resolve()
 
         # SECURITY CHECK
         if secure_base_path not in file_to_download.parents:
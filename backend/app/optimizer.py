@@ -0,0 +1,261 @@
+import graphlib
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.affine import rotations
+from app.classes import (
+    AffineStep,
+    FilterNodeData,
+    FlipImageNodeData,
+    FusedAffineNodeData,
+    FusedFilterNodeData,
+    Node,
+    ResizeImageNodeData,
+    RotateImageNodeData,
+    SelectColumnNodeData,
+)
+from app.processors.node_map import NODE_AFFINE_FUNCTIONS, NODE_INFO
+
+
+@dataclass
+class Rewrite:
+    rule: str  # push_filter / fold_select / fuse_filters / fuse_affine
+    nodes: list[str]  # Node ids of the original graph involved
+    description: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _selected(data: SelectColumnNodeData) -> list[str]:
+    # Same parsing as the selectColumn plugin
+    return [col.strip() for col in data.columns.split(",") if col.strip()]
+
+
+def _conditions(data: FilterNodeData | FusedFilterNodeData) -> list[FilterNodeData]:
+    return data.conditions if isinstance(data, FusedFilterNodeData) else [data]
+
+
+def _affine_steps(node: Node) -> list[AffineStep]:
+    if isinstance(node.data, FusedAffineNodeData):
+        return node.data.steps
+    return [AffineStep(type=node.type, data=node.data)]  # type: ignore[arg-type]
+
+
+class _Plan:
+    """Mutable copy of the graph the rewrite rules work on."""
+
+    def __init__(self, nmap: dict[str, Node], dep_list: dict[str, list[str]]):
+        self.nmap = dict(nmap)
+        self.dep_list = {node_id: list(deps) for node_id, deps in dep_list.items()}
+        self.rewrites: list[Rewrite] = []
+        # Reverse of dep_list, built once and kept in step by merge_into_child
+        self._children: dict[str, list[str]] = {node_id: [] for node_id in dep_list}
+        for node_id, deps in self.dep_list.items():
+            for parent_id in deps:
+                self._children[parent_id].append(node_id)
+
+    def children(self, node_id: str) -> list[str]:
+        return self._children[node_id]
+
+    def is_filter(self, node_id: str) -> bool:
+        node = self.nmap[node_id]
+        return node.type == "filterRows" and isinstance(
+            node.data, (FilterNodeData, FusedFilterNodeData)
+        )
+
+    def is_select(self, node_id: str) -> bool:
+        node = self.nmap[node_id]
+        return node.type == "selectColumn" and isinstance(
+            node.data, SelectColumnNodeData
+        )
+
+    def is_affine(self, node_id: str) -> bool:
+        node = self.nmap[node_id]
+        return node.type in NODE_AFFINE_FUNCTIONS and isinstance(
+            node.data,
+            (
+                FusedAffineNodeData,
+                FlipImageNodeData,
+                RotateImageNodeData,
+                ResizeImageNodeData,
+            ),
+        )
+
+    def private_pair(self, node_id: str) -> str | None:
+        """
+        The only child of a single-input node whose result nobody else sees
+        (not a sink), if that child has no other input either.
+        """
+        node = self.nmap[node_id]
+        if len(self.dep_list[node_id]) != 1 or NODE_INFO.get(node.type, {}).get("sink"):
+            return None
+        children = self.children(node_id)
+        if len(children) != 1 or self.dep_list[children[0]] != [node_id]:
+            return None
+        return children[0]
+
+    def merge_into_child(self, node_id: str, child_id: str, data: Any) -> None:
+        """Drops node_id, its child takes over its input and the given data."""
+        child = self.nmap[child_id]
+        self.nmap[child_id] = child.model_copy(update={"data": data})
+        self.dep_list[child_id] = self.dep_list.pop(node_id)
+        for parent_id in self.dep_list[child_id]:
+            siblings = self._children[parent_id]
+            siblings[siblings.index(node_id)] = child_id
+        del self.nmap[node_id], self._children[node_id]
+
+    def apply(self, rule) -> None:
+        """
+        Applies a rule anywhere in the graph until it stops matching. A
+        rewrite can only make the rule match again at the node it touched or
+        its neighbours, which are the only ones tried again.
+        """
+        pending = deque(self.dep_list)
+        while pending:
+            node_id = pending.popleft()
+            if node_id not in self.dep_list:
+                continue  # Merged into its child meanwhile
+            neighbours = [*self.dep_list[node_id], *self.children(node_id)]
+            if rule(node_id):
+                pending.extend(
+                    nid for nid in (node_id, *neighbours) if nid in self.dep_list
+                )
+
+    # --- Rules ---
+
+    def push_filter(self, node_id: str) -> bool:
+        """
+        select -> filter  becomes  filter -> select  when the filtered column
+        is selected. Selecting columns is row independent, so the result is
+        the same, and the filter gets closer to the source (fusion, pushdown).
+        Transform/handleMissingVal use statistics over all rows, so filters
+        never move above them.
+        """
+        child_id = self.private_pair(node_id)
+        if child_id is None or not self.is_select(node_id):
+            return False
+        if not self.is_filter(child_id):
+            return False
+        select, filt = self.nmap[node_id], self.nmap[child_id]
+        columns = _selected(select.data)  # type: ignore[arg-type]
+        if any(cond.column not in columns for cond in _conditions(filt.data)):  # type: ignore[arg-type]
+            return False
+
+        # Swap what the two nodes do, the edges stay where they are
+        self.nmap[node_id] = select.model_copy(
+            update={"type": filt.type, "data": filt.data}
+        )
+        self.nmap[child_id] = filt.model_copy(
+            update={"type": select.type, "data": select.data}
+        )
+        self.rewrites.append(
+            Rewrite(
+                "push_filter",
+                [child_id, node_id],
+                f"Filter '{filt.data.label}' runs before selection '{select.data.label}'.",
+            )
+        )
+        return True
+
+    def fold_select(self, node_id: str) -> bool:
+        """select(A) -> select(B)  becomes  select(B in A)."""
+        child_id = self.private_pair(node_id)
+        if child_id is None or not self.is_select(node_id):
+            return False
+        if not self.is_select(child_id):
+            return False
+        first, second = self.nmap[node_id].data, self.nmap[child_id].data
+        outer, inner = _selected(first), _selected(second)  # type: ignore[arg-type]
+        if len(set(outer)) != len(outer) or len(set(inner)) != len(inner):
+            return False  # Duplicate labels select several columns at once
+        folded = [col for col in inner if col in outer]
+        if outer and inner and not folded:
+            return False  # Would drop the rows too, not only the columns
+
+        self.merge_into_child(
+            node_id, child_id, second.model_copy(update={"columns": ",".join(folded)})
+        )
+        self.rewrites.append(
+            Rewrite(
+                "fold_select",
+                [node_id, child_id],
+                f"Selections '{first.label}' and '{second.label}' folded into one.",
+            )
+        )
+        return True
+
+    def fuse_filters(self, node_id: str) -> bool:
+        """filter -> filter  becomes one filter with a single boolean mask."""
+        child_id = self.private_pair(node_id)
+        if child_id is None or not self.is_filter(node_id):
+            return False
+        if not self.is_filter(child_id):
+            return False
+        first, second = self.nmap[node_id].data, self.nmap[child_id].data
+        fused = FusedFilterNodeData(
+            label=second.label,
+            conditions=_conditions(first) + _conditions(second),  # type: ignore[arg-type]
+        )
+        self.merge_into_child(node_id, child_id, fused)
+        self.rewrites.append(
+            Rewrite(
+                "fuse_filters",
+                [node_id, child_id],
+                f"Filters '{first.label}' and '{second.label}' fused into one mask.",
+            )
+        )
+        return True
+
+    def fuse_affine(self, node_id: str) -> bool:
+        """
+        Geometric image nodes (flip / rotate / resize) in a row become one
+        node, run by warp_affine_node as a single warp. A rotation crops
+        what it turns out of its frame and a later rotation would bring that
+        back into view, so chains never fuse two rotations.
+        """
+        child_id = self.private_pair(node_id)
+        if child_id is None or not self.is_affine(node_id):
+            return False
+        if not self.is_affine(child_id):
+            return False
+        first, second = self.nmap[node_id], self.nmap[child_id]
+        steps = _affine_steps(first) + _affine_steps(second)
+        if rotations(steps) > 1:
+            return False
+        fused = FusedAffineNodeData(label=second.data.label, steps=steps)
+        self.merge_into_child(node_id, child_id, fused)
+        self.rewrites.append(
+            Rewrite(
+                "fuse_affine",
+                [node_id, child_id],
+                f"'{first.data.label}' and '{second.data.label}' fused into one node.",
+            )
+        )
+        return True
+
+
+def optimize(
+    nmap: dict[str, Node], dep_list: dict[str, list[str]]
+) -> tuple[dict[str, Node], dict[str, list[str]], list[Rewrite]]:
+    """
+    Rewrites chains of DATA_ and geometric VISION_ nodes before execution.
+    The rules only touch nodes whose result is seen by a single child, so
+    every sink and every node with several consumers produces exactly what
+    it did before.
+    Returns the new node map, dependency list and the applied rewrites.
+    """
+    try:
+        graphlib.TopologicalSorter(dep_list).prepare()
+    except graphlib.CycleError:
+        return nmap, dep_list, []  # Reported by the execution itself
+
+    plan = _Plan(nmap, dep_list)
+    plan.apply(plan.push_filter)
+    plan.apply(plan.fold_select)
+    plan.apply(plan.fuse_filters)
+    plan.apply(plan.fuse_affine)
+    for rewrite in plan.rewrites:
+        print(f"Optimizer: {rewrite.description}")
+    return plan.nmap, plan.dep_list, plan.rewrites
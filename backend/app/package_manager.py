@@ -1,4 +1,7 @@
 import json
+import os
+import sys
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -10,35 +13,46 @@ BACKEND_PLUGINS_DIR = APP_ROOT_DIR / "plugins"
 MANIFESTS_DIR = APP_DIR / "manifests"
 
 
-def generate_manifest_mapping() -> dict[str, str]:
+def read_manifests() -> dict[str, dict[str, Any]]:
     """
-    Scans the manifests directory and builds a map of
-    { nodeType: category }
+    Parses every manifest of the manifests directory, by file name.
+    Files that cannot be parsed are skipped with a warning.
     """
-    manifestMap = {}
-    if not MANIFESTS_DIR.exists:
+    manifests = {}
+    if not MANIFESTS_DIR.exists():
         print(f"Warning: Manifests directory not found at {MANIFESTS_DIR}")
         return {}
-    for manifest_file in MANIFESTS_DIR.glob("*.json"):
+    for manifest_file in sorted(MANIFESTS_DIR.glob("*.json")):
         try:
             with open(manifest_file, "r") as manifest:
-                manifest_data = json.load(manifest)
-            nodeType = manifest_data.get("nodeType")
-            category = manifest_data.get("category")
-            if nodeType and category:
-                manifestMap[nodeType] = category
-            else:
-                print(
-                    f"Warning: Skipping manifest {manifest_file.name}, missing 'nodeType' or 'category'."
-                )
+                manifests[manifest_file.name] = json.load(manifest)
         except json.JSONDecodeError:
             print(f"Warning: Could not parse JSON from {manifest_file.name}.")
         except Exception as e:
             print(f"Warning: Error processing manifest {manifest_file.name}: {e}")
-    return manifestMap
+    return manifests
 
 
-MANIFEST_MAP = generate_manifest_mapping()
+def generate_manifest_mapping(
+    manifests: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, str]:
+    """
+    Builds a map of { nodeType: category } from the manifests (read from
+    the manifests directory if not given).
+    """
+    manifestMap = {}
+    for name, manifest_data in (
+        read_manifests() if manifests is None else manifests
+    ).items():
+        nodeType = manifest_data.get("nodeType")
+        category = manifest_data.get("category")
+        if nodeType and category:
+            manifestMap[nodeType] = category
+        else:
+            print(
+                f"Warning: Skipping manifest {name}, missing 'nodeType' or 'category'."
+            )
+    return manifestMap
 
 
 def get_installed_packages() -> set[str]:
@@ -49,26 +63,21 @@ def get_installed_packages() -> set[str]:
     return {dist.metadata["name"] for dist in distributions()}
 
 
-def get_node_status() -> list[dict[str, Any]]:
-    """
-    Reads all node manifests, checks their dependencies against the
-    current environment, and returns a list of their statuses.
-    """
-    installed_packages = get_installed_packages()
+def _node_statuses(
+    manifests: dict[str, dict[str, Any]],
+    manifest_map: dict[str, str],
+    installed_packages: set[str],
+) -> list[dict[str, Any]]:
     node_statuses: list[dict[str, Any]] = []
 
-    for manifest_path in MANIFESTS_DIR.glob("*.json"):
+    for name, manifest_data in manifests.items():
         try:
-            with open(manifest_path, "r") as manifest:
-                manifest_data = json.load(manifest)
             node_type = manifest_data.get("nodeType")
 
             if node_type == "note":
                 continue
             if not node_type:
-                print(
-                    f"Warning: Skipping manifest {manifest_path.name}, missing 'nodeType'."
-                )
+                print(f"Warning: Skipping manifest {name}, missing 'nodeType'.")
                 continue
 
             all_deps = manifest_data.get("dependencies", [])
@@ -76,7 +85,7 @@ def get_node_status() -> list[dict[str, Any]]:
             missing_deps = [dep for dep in all_deps if dep not in installed_packages]
 
             py_filename = (
-                MANIFEST_MAP.get(node_type, "GENERAL") + "_" + node_type + ".py"
+                manifest_map.get(node_type, "GENERAL") + "_" + node_type + ".py"
             )
             plugin_path = BACKEND_PLUGINS_DIR / py_filename
 
@@ -101,7 +110,123 @@ def get_node_status() -> list[dict[str, Any]]:
                 }
             )
         except Exception as e:
-            print(f"Error processing manifest {manifest_path.name}: {e}")
+            print(f"Error processing manifest {name}: {e}")
 
     print(f"Found {len(node_statuses)} nodes.")
     return node_statuses
+
+
+# --- Cached index ---
+
+
+def _mtime(path: str | Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _manifests_stamp() -> tuple:
+    """(name, mtime, size) of every manifest, so edits in place count too."""
+    try:
+        entries = list(os.scandir(MANIFESTS_DIR))
+    except OSError:
+        return ()
+    return tuple(
+        sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in entries
+            if entry.name.endswith(".json")
+        )
+    )
+
+
+def _site_packages_stamp() -> tuple:
+    """
+    mtime of every directory distributions are found in: installing,
+    upgrading or removing a distribution adds or removes its .dist-info.
+    """
+    return tuple(
+        (path, _mtime(path)) for path in sys.path if path and os.path.isdir(path)
+    )
+
+
+class ManifestIndex:
+    """
+    The parsed manifests, the installed distributions and the node statuses
+    built from them, kept in memory. Each part is rebuilt only when what it
+    depends on changed: the manifest files, the site-packages directories
+    or the plugins directory (plugin files are added / removed), checked
+    with a few stat calls on every access.
+    """
+
+    def __init__(self, manifest_map: dict[str, str]):
+        self.manifest_map = manifest_map  # Updated in place, see MANIFEST_MAP
+        self.manifests: dict[str, dict[str, Any]] = {}
+        self.installed: set[str] = set()
+        self._manifests_stamp: tuple | None = None
+        self._site_stamp: tuple | None = None
+        self._status_key: tuple | None = None
+        self._statuses: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Re-reads whatever changed since the last call."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        stamp = _manifests_stamp()
+        if stamp != self._manifests_stamp:
+            self.manifests = read_manifests()
+            mapping = generate_manifest_mapping(self.manifests)
+            # In place, key by key: every importer of MANIFEST_MAP sees it
+            self.manifest_map.update(mapping)
+            for node_type in set(self.manifest_map) - set(mapping):
+                self.manifest_map.pop(node_type, None)
+            self._manifests_stamp = stamp
+
+        stamp = _site_packages_stamp()
+        if stamp != self._site_stamp:
+            self.installed = get_installed_packages()
+            self._site_stamp = stamp
+
+    def installed_packages(self) -> set[str]:
+        """Names of the installed distributions, re-listed if they changed."""
+        with self._lock:
+            self._refresh()
+            return self.installed
+
+    def manifest(self, node_type: str) -> dict[str, Any] | None:
+        with self._lock:
+            self._refresh()
+            return next(
+                (m for m in self.manifests.values() if m.get("nodeType") == node_type),
+                None,
+            )
+
+    def node_status(self) -> list[dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            key = (self._manifests_stamp, self._site_stamp, _mtime(BACKEND_PLUGINS_DIR))
+            if key != self._status_key:
+                self._statuses = _node_statuses(
+                    self.manifests, self.manifest_map, self.installed
+                )
+                self._status_key = key
+            return list(self._statuses)
+
+
+MANIFEST_MAP: dict[str, str] = {}
+MANIFEST_INDEX = ManifestIndex(MANIFEST_MAP)
+MANIFEST_INDEX.refresh()
+
+
+def get_node_status() -> list[dict[str, Any]]:
+    """
+    The status of every node manifest, its dependencies checked against the
+    current environment. Served from MANIFEST_INDEX, only rebuilt when the
+    manifests, the installed distributions or the plugin files changed.
+    The status dicts are shared, never modify them.
+    """
+    return MANIFEST_INDEX.node_status()
@@ -0,0 +1,154 @@
+import graphlib
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.classes import Node, PreviewOptions
+from app.processors.node_map import (
+    NODE_INFO,
+    NODE_PROCESSING_FUNCTIONS,
+    NODE_PROJECTION_FUNCTIONS,
+)
+from app.streaming import row_wise_step
+
+
+@dataclass
+class ReadPlan:
+    """
+    What a source node has to read: only `usecols` (None reads every
+    column), and only the rows that pass `filters`, the idempotent row
+    filters directly below it. The filter nodes still run on the already
+    filtered rows, so every node keeps its usual output.
+    In a preview run, sources flagged "preview" also get the `preview`
+    options and read smaller data (downscaled images, a sample of rows).
+    """
+
+    usecols: list[str] | None = None
+    filters: list[Node] = field(default_factory=list)
+    preview: PreviewOptions | None = None
+
+    def describe(self) -> dict[str, Any]:
+        """JSON form, part of the source node's cache key."""
+        described: dict[str, Any] = {
+            "usecols": self.usecols,
+            "filters": [
+                [node.type, node.data.model_dump(mode="json")] for node in self.filters
+            ],
+        }
+        if self.preview is not None:
+            described["preview"] = self.preview.model_dump()
+        return described
+
+    def kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for the source node's processing function."""
+        kwargs: dict[str, Any] = {}
+        if self.usecols is not None or self.filters:
+            kwargs["usecols"] = self.usecols
+            kwargs["row_filters"] = [
+                row_wise_step(NODE_PROCESSING_FUNCTIONS[node.type], node.data)
+                for node in self.filters
+            ]
+        if self.preview is not None:
+            kwargs["preview"] = self.preview
+        return kwargs
+
+
+def _children(
+    dep_list: dict[str, list[str]], scope: list[str] | None
+) -> dict[str, list[str]]:
+    node_ids = list(dep_list) if scope is None else scope
+    children: dict[str, list[str]] = {node_id: [] for node_id in node_ids}
+    for node_id in node_ids:
+        for parent_id in dep_list[node_id]:
+            if parent_id in children:
+                children[parent_id].append(node_id)
+    return children
+
+
+def required_columns(
+    nmap: dict[str, Node],
+    dep_list: dict[str, list[str]],
+    scope: list[str] | None = None,
+) -> dict[str, set[str] | None]:
+    """
+    Columns every node's output has to provide, None meaning all of them.
+
+    Walks the graph from the leaves up. Each child says which of its input
+    columns it reads for the columns it has to provide itself (the plugin's
+    projection_function), a node needs the union over its children. Leaves,
+    sinks and children without a projection function need everything.
+    """
+    children = _children(dep_list, scope)
+    order = list(
+        graphlib.TopologicalSorter(
+            {node_id: dep_list[node_id] for node_id in children}
+        ).static_order()
+    )
+
+    needed: dict[str, set[str] | None] = {}
+    for node_id in reversed(order):
+        if node_id not in children:
+            continue  # A parent outside the scope
+        sink = NODE_INFO.get(nmap[node_id].type, {}).get("sink")
+        columns: set[str] | None = set() if children[node_id] and not sink else None
+        for child_id in children[node_id]:
+            child = nmap[child_id]
+            project = NODE_PROJECTION_FUNCTIONS.get(child.type)
+            child_needs = project(child.data, needed[child_id]) if project else None
+            if child_needs is None:
+                columns = None
+                break
+            columns |= child_needs  # type: ignore[operator]
+        needed[node_id] = columns
+    return needed
+
+
+def plan_reads(
+    nmap: dict[str, Node],
+    dep_list: dict[str, list[str]],
+    validation_errors: dict[str, str],
+    scope: list[str] | None = None,
+    preview: PreviewOptions | None = None,
+) -> dict[str, ReadPlan]:
+    """
+    Read plans for every source node that supports pushdown (or previews,
+    in a preview run), for the nodes in scope. Nodes that need no change
+    are left out.
+    """
+    children = _children(dep_list, scope)
+    needed = required_columns(nmap, dep_list, scope)
+
+    plans: dict[str, ReadPlan] = {}
+    for node_id in children:
+        info = NODE_INFO.get(nmap[node_id].type, {})
+        if preview is not None and info.get("preview"):
+            plan = ReadPlan(preview=preview)
+            print(f"Read plan for {node_id}: preview {preview.model_dump()}")
+            plans[node_id] = plan
+        if not info.get("pushdown"):
+            continue
+
+        columns = needed[node_id]
+        plan = plans.get(node_id, ReadPlan())
+        plan.usecols = None if columns is None else sorted(columns)
+
+        # Follow the chain of single-input row filters hanging off the source
+        current = node_id
+        while len(children[current]) == 1:
+            child = nmap[children[current][0]]
+            if (
+                not NODE_INFO.get(child.type, {}).get("rowFilter")
+                or len(dep_list[child.id]) != 1
+                or child.id in validation_errors
+                or child.type not in NODE_PROCESSING_FUNCTIONS
+            ):
+                break
+            plan.filters.append(child)
+            current = child.id
+
+        if plan.usecols is not None or plan.filters:
+            print(
+                f"Read plan for {node_id}: columns {plan.usecols}, "
+                f"{len(plan.filters)} pushed filter(s)"
+            )
+            plans[node_id] = plan
+    return plans
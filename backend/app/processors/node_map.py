@@ -1,125 +1,413 @@
+import ast
+import contextlib
+import hashlib
 import importlib
-from pathlib import Path
 import pkgutil
 import sys
-from typing import Callable, Dict, Set
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 
-NODE_PROCESSING_FUNCTIONS: Dict[str, Callable] = {}
-NODE_INSPECTION_FUNCTIONS: Dict[str, Callable] = {}
-NODE_INDEGREE: Dict[str, int] = {}
-FAILED_NODE_TYPES: Set[str] = set()
+from app.dataframes import enable_copy_on_write
 
 
-def discover_plugins():
+class LazyRegistry(dict):
     """
-    Scans the 'plugins' directory, imports modules, and populates the
-    global dictionaries mapping node types to their functions and metadata.
-    Clears existing dictionaries before scanning.
+    Node type -> one of its plugin's functions (the node_info entry `key`).
+
+    Plugins are only imported the first time one of their functions is looked
+    up (`in`, `[]` or `get`), so startup never pays for cv2, pandas or sklearn.
+    Iterating or len() only sees the plugins loaded so far.
     """
-    global \
-        NODE_PROCESSING_FUNCTIONS, \
-        NODE_INSPECTION_FUNCTIONS, \
-        NODE_INDEGREE, \
-        FAILED_NODE_TYPES
 
-    # Clear previous state
-    NODE_PROCESSING_FUNCTIONS.clear()
-    NODE_INSPECTION_FUNCTIONS.clear()
-    NODE_INDEGREE.clear()
-    FAILED_NODE_TYPES.clear()
+    def __init__(self, key: str):
+        super().__init__()
+        self.key = key
 
-    print("--- Starting Plugin Discovery ---")
+    def __contains__(self, node_type: object) -> bool:
+        load_plugin(node_type)
+        return super().__contains__(node_type)
 
-    backend_dir = Path(__file__).parent.parent.parent
-    plugins_dir = backend_dir / "plugins"
+    def __getitem__(self, node_type: str) -> Callable:
+        load_plugin(node_type)
+        return super().__getitem__(node_type)
 
-    plugins_dir.mkdir(exist_ok=True)
+    def get(self, node_type: str, default: Any = None) -> Any:
+        load_plugin(node_type)
+        return super().get(node_type, default)
 
-    if not plugins_dir.is_dir():
-        print(f"ERROR: Plugins directory not found at {plugins_dir}")
-        return
 
-    if str(backend_dir) not in sys.path:
-        sys.path.insert(0, str(backend_dir))
-        added_to_path = True
-    else:
-        added_to_path = False
+NODE_PROCESSING_FUNCTIONS = LazyRegistry("function")
+# Column names only (legacy)
+NODE_INSPECTION_FUNCTIONS = LazyRegistry("inspection_function")
+# Typed output schema of a node
+NODE_SCHEMA_FUNCTIONS = LazyRegistry("schema_function")
+# For chunked (streamed) inputs
+NODE_STREAMING_FUNCTIONS = LazyRegistry("streaming_function")
+# Input columns a node reads
+NODE_PROJECTION_FUNCTIONS = LazyRegistry("projection_function")
+# Geometric nodes as a 2x3 matrix
+NODE_AFFINE_FUNCTIONS = LazyRegistry("affine_function")
+NODE_INDEGREE: dict[str, int] = {}
+NODE_INFO: dict[str, dict[str, Any]] = {}  # Raw node_info of every plugin
+FAILED_NODE_TYPES: set[str] = set()
+# Content hash of every plugin's file, part of its nodes' cache keys
+PLUGIN_VERSIONS: dict[str, str] = {}
+
+FUNCTION_REGISTRIES = (
+    NODE_PROCESSING_FUNCTIONS,
+    NODE_INSPECTION_FUNCTIONS,
+    NODE_SCHEMA_FUNCTIONS,
+    NODE_STREAMING_FUNCTIONS,
+    NODE_PROJECTION_FUNCTIONS,
+    NODE_AFFINE_FUNCTIONS,
+)
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+PLUGINS_DIR = BACKEND_DIR / "plugins"
+
+
+@dataclass
+class PluginFile:
+    """What the registry last saw of a plugin file."""
 
+    stamp: tuple[int, int]  # (mtime, size), a file that keeps it is not re-hashed
+    digest: str
+    node_type: str | None
+
+
+# Module name -> the plugin file it was registered from
+_PLUGIN_FILES: dict[str, PluginFile] = {}
+# Node type -> plugin module name, for the plugins not imported yet
+_PENDING_MODULES: dict[str, str] = {}
+# Plugin modules imported since the last discovery, re-imported when changed
+_IMPORTED_MODULES: set[str] = set()
+# Plugin imports can come from several executor threads at once
+_LOAD_LOCK = threading.RLock()
+
+
+@contextlib.contextmanager
+def _plugins_importable() -> Iterator[None]:
+    """Puts the backend directory on sys.path while plugins are imported."""
+    if str(BACKEND_DIR) in sys.path:
+        yield
+        return
+    sys.path.insert(0, str(BACKEND_DIR))
     try:
-        for _, module_name, _ in pkgutil.iter_modules([str(plugins_dir)]):
-            module_name = f"plugins.{module_name}"
+        yield
+    finally:
+        if str(BACKEND_DIR) in sys.path:
+            sys.path.remove(str(BACKEND_DIR))
 
+
+def read_node_info(path: Path) -> dict[str, Any] | None:
+    """
+    The node_info dict of a plugin file, parsed from its source without
+    importing it. None if the file has no node_info literal (a plugin that
+    builds it at import time), such plugins are imported right away.
+    """
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return None
+    for statement in tree.body:
+        if isinstance(statement, ast.Assign):
+            targets, value = statement.targets, statement.value
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            targets, value = [statement.target], statement.value
+        else:
+            continue
+        if any(isinstance(t, ast.Name) and t.id == "node_info" for t in targets):
             try:
-                if module_name in sys.modules:
-                    module = importlib.reload(sys.modules[module_name])
-                    print(f"Reloading plugin module: {module_name}")
-                else:
-                    module = importlib.import_module(module_name)
-                    print(f"Loading plugin module: {module_name}")
-
-                if hasattr(module, "node_info"):
-                    node_type = module.node_info.get("nodeType")
-                    if not node_type:
-                        print(
-                            f"Warning: Plugin '{module_name}' is missing 'nodeType' in node_info. Skipping."
-                        )
-                        continue
-
-                    if "function" in module.node_info:
-                        func_name = module.node_info["function"]
-                        if hasattr(module, func_name):
-                            NODE_PROCESSING_FUNCTIONS[node_type] = getattr(
-                                module, func_name
-                            )
-                        else:
-                            print(
-                                f"Warning: Processing function '{func_name}' not found in plugin '{module_name}' for node type '{node_type}'."
-                            )
-
-                    if "inspection_function" in module.node_info:
-                        inspect_func_name = module.node_info["inspection_function"]
-                        if hasattr(module, inspect_func_name):
-                            NODE_INSPECTION_FUNCTIONS[node_type] = getattr(
-                                module, inspect_func_name
-                            )
-                        else:
-                            print(
-                                f"Warning: Inspection function '{inspect_func_name}' not found in plugin '{module_name}' for node type '{node_type}'."
-                            )
-
-                    if "inDegree" in module.node_info:
-                        degree = module.node_info["inDegree"]
-                        try:
-                            NODE_INDEGREE[node_type] = int(degree)
-                        except (ValueError, TypeError):
-                            print(
-                                f"Warning: Invalid inDegree value '{degree}' for node type '{node_type}' in '{module_name}'. Skipping inDegree registration."
-                            )
-                    else:
-                        print(
-                            f"Warning: Plugin module '{module_name}' is missing 'node_info'. Skipping."
-                        )
-
-            except ModuleNotFoundError as e:
+                node_info = ast.literal_eval(value)
+            except ValueError:
+                return None
+            return node_info if isinstance(node_info, dict) else None
+    return None
+
+
+def _register_info(node_info: dict[str, Any], module_name: str) -> str | None:
+    """Records a plugin's metadata. Returns its node type, None if it has none."""
+    node_type = node_info.get("nodeType")
+    if not node_type:
+        print(
+            f"Warning: Plugin '{module_name}' is missing 'nodeType' in node_info. Skipping."
+        )
+        return None
+
+    NODE_INFO[node_type] = dict(node_info)
+
+    NODE_INDEGREE.pop(node_type, None)
+    if "inDegree" in node_info:
+        degree = node_info["inDegree"]
+        try:
+            NODE_INDEGREE[node_type] = int(degree)
+        except (ValueError, TypeError):
+            print(
+                f"Warning: Invalid inDegree value '{degree}' for node type '{node_type}' in '{module_name}'. Skipping inDegree registration."
+            )
+    return node_type
+
+
+def _register_functions(module: Any, node_type: str, module_name: str) -> None:
+    """
+    Fills every function registry from an imported plugin module, entry by
+    entry (a function the new version no longer names is removed), so
+    readers see either the old or the new function, never a gap.
+    """
+    for registry in FUNCTION_REGISTRIES:
+        func_name = module.node_info.get(registry.key)
+        func = getattr(module, func_name, None) if func_name else None
+        if func_name and func is None:
+            print(
+                f"Warning: Function '{func_name}' ({registry.key}) not found in plugin '{module_name}' for node type '{node_type}'."
+            )
+        if func is None:
+            registry.pop(node_type, None)
+        else:
+            dict.__setitem__(registry, node_type, func)
+
+
+def _import_plugin(module_name: str) -> Any:
+    """
+    Imports a plugin module, re-executing it if it was imported before (its
+    file may have changed since, e.g. after an install).
+    Records it in FAILED_NODE_TYPES and returns None if it cannot be imported.
+    """
+    try:
+        if module_name.startswith("plugins.DATA_"):
+            # Process-wide pandas option, set before any frame is built
+            enable_copy_on_write()
+        with _plugins_importable():
+            if module_name in sys.modules:
+                module = importlib.reload(sys.modules[module_name])
+                print(f"Reloading plugin module: {module_name}")
+            else:
+                module = importlib.import_module(module_name)
+                print(f"Loading plugin module: {module_name}")
+        _IMPORTED_MODULES.add(module_name)
+        return module
+
+    except ModuleNotFoundError as e:
+        print(
+            f"Info: Could not load plugin '{module_name}' due to missing dependency: {e}. It might become available after installation."
+        )
+    except Exception as e:
+        print(f"ERROR loading plugin '{module_name}': {e}")
+    FAILED_NODE_TYPES.add(module_name)
+    return None
+
+
+def load_plugin(node_type: object) -> None:
+    """Imports the plugin of node_type if it has not been imported yet."""
+    if node_type not in _PENDING_MODULES:
+        return
+    with _LOAD_LOCK:
+        module_name = _PENDING_MODULES.get(node_type)  # type: ignore[call-overload]
+        if module_name is None:
+            return  # Loaded by another thread meanwhile
+        module = _import_plugin(module_name)
+        if module is not None:
+            _register_functions(module, node_type, module_name)  # type: ignore[arg-type]
+        # Only now, so other threads wait for the registries to be filled
+        del _PENDING_MODULES[node_type]  # type: ignore[arg-type]
+
+
+def load_all_plugins() -> None:
+    """Imports every plugin not imported yet (for tools that list functions)."""
+    for node_type in list(_PENDING_MODULES):
+        load_plugin(node_type)
+
+
+# --- Incremental refresh ---
+
+
+def _scan_plugins_dir() -> dict[str, Path]:
+    """Module name -> source file of every plugin in the plugins directory."""
+    PLUGINS_DIR.mkdir(exist_ok=True)
+    found = {}
+    for _, name, is_package in pkgutil.iter_modules([str(PLUGINS_DIR)]):
+        path = (
+            PLUGINS_DIR / name / "__init__.py"
+            if is_package
+            else PLUGINS_DIR / f"{name}.py"
+        )
+        found[f"plugins.{name}"] = path
+    return found
+
+
+def _file_version(path: Path, known: PluginFile | None) -> tuple[tuple[int, int], str]:
+    """(mtime, size) and content hash of a file, hashed only if the stamp moved."""
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if known is not None and known.stamp == stamp:
+        return stamp, known.digest
+    return stamp, hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _drop_functions(node_type: str) -> None:
+    for registry in FUNCTION_REGISTRIES:
+        registry.pop(node_type, None)
+
+
+def _drop_node_type(node_type: str) -> None:
+    """Unregisters a node type whose plugin was removed or renamed it."""
+    _PENDING_MODULES.pop(node_type, None)
+    _drop_functions(node_type)
+    NODE_INFO.pop(node_type, None)
+    NODE_INDEGREE.pop(node_type, None)
+    PLUGIN_VERSIONS.pop(node_type, None)
+
+
+def _forget_plugin(module_name: str) -> None:
+    """Unregisters a deleted plugin file and unloads its module."""
+    known = _PLUGIN_FILES.pop(module_name)
+    if known.node_type:
+        _drop_node_type(known.node_type)
+    FAILED_NODE_TYPES.discard(module_name)
+    _IMPORTED_MODULES.discard(module_name)
+    sys.modules.pop(module_name, None)
+
+
+def _register_plugin(module_name: str, path: Path, digest: str) -> str | None:
+    """
+    (Re-)registers a new or changed plugin file. A plugin nobody used yet
+    only gets its metadata updated and is imported on first use. A plugin
+    already imported is re-imported right away and its entries overwritten
+    in place, so concurrent runs never see it missing.
+    Returns its node type, None if it has none.
+    """
+    known = _PLUGIN_FILES.get(module_name)
+    old_type = known.node_type if known else None
+    FAILED_NODE_TYPES.discard(module_name)
+
+    node_info = read_node_info(path)
+    in_use = module_name in _IMPORTED_MODULES and old_type not in _PENDING_MODULES
+    module = None
+    if node_info is None or in_use:
+        module = _import_plugin(module_name)
+        if module is not None:
+            node_info = getattr(module, "node_info", None)
+            if node_info is None:
                 print(
-                    f"Info: Could not load plugin '{module_name}' due to missing dependency: {e}. It might become available after installation."
+                    f"Warning: Plugin module '{module_name}' is missing 'node_info'. Skipping."
                 )
-                FAILED_NODE_TYPES.add(module_name)
 
-            except Exception as e:
-                print(f"ERROR loading plugin '{module_name}': {e}")
-                FAILED_NODE_TYPES.add(module_name)
-                continue
+    node_type = _register_info(node_info, module_name) if node_info else None
+    if old_type and old_type != node_type:
+        _drop_node_type(old_type)
+    if not node_type:
+        return None
 
-    finally:
-        # Clean up sys.path if modified
-        if added_to_path and str(backend_dir) in sys.path:
-            sys.path.remove(str(backend_dir))
+    PLUGIN_VERSIONS[node_type] = digest
+    if module is not None:
+        _register_functions(module, node_type, module_name)
+        _PENDING_MODULES.pop(node_type, None)
+    elif module_name in FAILED_NODE_TYPES:
+        _drop_functions(node_type)
+    else:
+        # Pending first: a reader then waits for the lock, then imports it
+        _PENDING_MODULES[node_type] = module_name
+        _drop_functions(node_type)
+    return node_type
+
+
+def refresh_plugins(retry_failed: bool = True) -> dict[str, list[str]]:
+    """
+    Brings the registry up to date with the plugins directory: plugin files
+    that were added, changed (content hash, checked when mtime or size
+    moved) or removed are re-registered or dropped, the others are left
+    alone. Plugins that failed to import are retried (their dependencies may
+    have been installed since) unless retry_failed is False.
+
+    Returns the module names that were "added", "changed", "removed" and
+    "retried".
+    """
+    changes: dict[str, list[str]] = {
+        "added": [],
+        "changed": [],
+        "removed": [],
+        "retried": [],
+    }
+    with _LOAD_LOCK:
+        found = _scan_plugins_dir()
+        for module_name in set(_PLUGIN_FILES) - set(found):
+            _forget_plugin(module_name)
+            changes["removed"].append(module_name)
+
+        for module_name, path in sorted(found.items()):
+            known = _PLUGIN_FILES.get(module_name)
+            try:
+                stamp, digest = _file_version(path, known)
+            except OSError:
+                continue  # Deleted while scanning, the next refresh drops it
+            if known is not None and known.digest == digest:
+                known.stamp = stamp
+                if not (retry_failed and module_name in FAILED_NODE_TYPES):
+                    continue
+                changes["retried"].append(module_name)
+            else:
+                changes["changed" if known else "added"].append(module_name)
+            node_type = _register_plugin(module_name, path, digest)
+            _PLUGIN_FILES[module_name] = PluginFile(stamp, digest, node_type)
+
+    if any(changes.values()):
+        print(f"Plugin registry refreshed: { {k: v for k, v in changes.items() if v} }")
+    return changes
+
+
+def watch_plugins(
+    interval: float, on_change: Callable[[dict[str, list[str]]], None] | None = None
+) -> threading.Thread:
+    """
+    Starts a daemon thread refreshing the registry every `interval`
+    seconds, so plugins dropped into the plugins directory are picked up
+    without an API call. on_change gets the changes of every refresh that
+    found some. Failed plugins are not retried on every poll.
+    """
+
+    def poll() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                changes = refresh_plugins(retry_failed=False)
+                if on_change is not None and any(changes.values()):
+                    on_change(changes)
+            except (OSError, RuntimeError) as e:  # Files moved during a scan
+                print(f"ERROR refreshing plugins: {e}")
+
+    watcher = threading.Thread(target=poll, name="plugin-watcher", daemon=True)
+    watcher.start()
+    return watcher
+
+
+def discover_plugins():
+    """
+    Rebuilds the registry from scratch: scans the 'plugins' directory and
+    populates NODE_INFO and NODE_INDEGREE from the node_info of every plugin,
+    read from its source. The function registries fill up as node types are
+    first executed or inspected, when their plugin gets imported.
+    Use refresh_plugins to pick up changes without clearing the registry.
+    """
+    print("--- Starting Plugin Discovery ---")
+
+    with _LOAD_LOCK:
+        for registry in FUNCTION_REGISTRIES:
+            registry.clear()
+        NODE_INDEGREE.clear()
+        NODE_INFO.clear()
+        FAILED_NODE_TYPES.clear()
+        PLUGIN_VERSIONS.clear()
+        _PENDING_MODULES.clear()
+        _PLUGIN_FILES.clear()
+        _IMPORTED_MODULES.clear()
+        refresh_plugins()
 
     print("--- Plugin Discovery Finished ---")
-    print(
-        f"Successfully loaded functions for node types: {list(NODE_PROCESSING_FUNCTIONS.keys())}"
-    )
+    print(f"Registered node types (imported on first use): {list(NODE_INFO.keys())}")
     if FAILED_NODE_TYPES:
         print(
             f"Failed to load plugins (or dependencies missing): {list(FAILED_NODE_TYPES)}"
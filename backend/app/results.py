@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import io
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.streaming import ChunkedFrame
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rows of a display result sent inline with /execute, the rest is paged
+RESULT_PAGE_ROWS = int(os.environ.get("NEUROCIRCUIT_RESULT_PAGE_ROWS", "100"))
+# Runs whose display results are kept for paging, the oldest is dropped
+MAX_RESULT_RUNS = int(os.environ.get("NEUROCIRCUIT_MAX_RESULT_RUNS", "16"))
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Encodings of an image result: media type and the OpenCV quality flag
+IMAGE_FORMATS = {
+    "jpeg": ("image/jpeg", ".jpg", "IMWRITE_JPEG_QUALITY"),
+    "webp": ("image/webp", ".webp", "IMWRITE_WEBP_QUALITY"),
+    "png": ("image/png", ".png", None),  # Lossless, quality is ignored
+}
+# Encoded variants (format / quality / size) kept per image result
+MAX_IMAGE_VARIANTS = 4
+
+
+class TableResult:
+    """
+    The output of a display node, kept server-side so the client can fetch
+    it page by page. A streamed (ChunkedFrame) output stays a recipe: the
+    counting pass keeps the first page and the row each chunk starts at, so
+    a later page re-reads the file from the chunk it starts in.
+    Built in the worker that ran the display node (see table_result), the
+    counting pass never runs on the scheduler thread.
+    """
+
+    def __init__(self, value: pd.DataFrame | ChunkedFrame):
+        self.value = value
+        self._chunk_starts: list[int] = []  # Output row each chunk starts at
+        self._head: pd.DataFrame | None = None  # First page of a streamed output
+        self.rows, first = self._count()
+        self.schema = [
+            {"name": str(name), "dtype": str(dtype)}
+            for name, dtype in first.dtypes.items()
+        ]
+
+    def _count(self) -> tuple[int, pd.DataFrame]:
+        """Total rows, plus a frame with the output's columns."""
+        import pandas as pd
+
+        if not isinstance(self.value, ChunkedFrame):
+            return len(self.value), self.value
+        rows, head = 0, []
+        for chunk in self.value:  # One pass, one chunk in memory at a time
+            self._chunk_starts.append(rows)
+            if rows < RESULT_PAGE_ROWS:
+                head.append(chunk.iloc[: RESULT_PAGE_ROWS - rows])
+            rows += len(chunk)
+        self._head = pd.concat(head) if head else pd.DataFrame()
+        return rows, self._head
+
+    def page(self, offset: int, limit: int) -> pd.DataFrame:
+        import pandas as pd
+
+        offset, limit = max(offset, 0), max(limit, 0)
+        if not isinstance(self.value, ChunkedFrame):
+            return self.value.iloc[offset : offset + limit]
+        if self._head is not None and offset + limit <= len(self._head):
+            return self._head.iloc[offset : offset + limit]
+
+        first = max(bisect.bisect_right(self._chunk_starts, offset) - 1, 0)
+        start = self._chunk_starts[first] if self._chunk_starts else 0
+        parts = []
+        for chunk in self.value.chunks_from(first):
+            end = start + len(chunk)
+            if end > offset:
+                parts.append(
+                    chunk.iloc[max(offset - start, 0) : offset + limit - start]
+                )
+            start = end
+            if start >= offset + limit:
+                break
+        return pd.concat(parts) if parts else pd.DataFrame(columns=self.columns)
+
+    @property
+    def columns(self) -> list[str]:
+        return [field["name"] for field in self.schema]
+
+    def page_json(
+        self, offset: int = 0, limit: int = RESULT_PAGE_ROWS
+    ) -> dict[str, Any]:
+        """Row count, schema and one page of records, the display node payload."""
+        page = self.page(offset, limit)
+        return {
+            "rows": self.rows,
+            "schema": self.schema,
+            "offset": offset,
+            "limit": limit,
+            "data": json.loads(page.to_json(orient="records", default_handler=str)),
+        }
+
+    def page_arrow(self, offset: int, limit: int) -> bytes:
+        """One page as an Arrow IPC stream (needs pyarrow)."""
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(self.page(offset, limit), preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+
+
+def table_result(value: Any) -> Any:
+    """
+    A display node's output as it leaves the worker: a streamed output is
+    counted there, into a TableResult, anything else is returned as is.
+    """
+    return TableResult(value) if isinstance(value, ChunkedFrame) else value
+
+
+class ImageResult:
+    """
+    The output of a displayImage node. The raw image stays on the server,
+    the client asks for an encoding (format, quality, thumbnail size) and
+    gets it from /results/{run_id}/{node_id}/image. The ETag is derived
+    from the pixels, so an unchanged image is never sent twice.
+    """
+
+    def __init__(self, image: np.ndarray):
+        self.image = np.ascontiguousarray(image)
+        content = hashlib.blake2b(digest_size=16)
+        content.update(f"{self.image.shape}{self.image.dtype}".encode())
+        content.update(self.image.data)
+        self.digest = content.hexdigest()
+        self._variants: OrderedDict[tuple[str, int, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def describe(self) -> dict[str, Any]:
+        """The displayImage node payload of /execute."""
+        height, width = self.image.shape[:2]
+        channels = 1 if self.image.ndim == 2 else self.image.shape[2]
+        return {
+            "etag": self.digest,
+            "width": width,
+            "height": height,
+            "channels": channels,
+        }
+
+    def etag(self, fmt: str, quality: int, max_dim: int) -> str:
+        return f'"{self.digest}-{fmt}-{quality}-{max_dim}"'
+
+    def encode(self, fmt: str, quality: int, max_dim: int) -> bytes:
+        """The image in `fmt`, scaled down to fit max_dim (0 keeps the size)."""
+        key = (fmt, quality, max_dim)
+        with self._lock:
+            if key in self._variants:
+                self._variants.move_to_end(key)
+                return self._variants[key]
+
+        import cv2 as cv  # Only VISION nodes produce images
+
+        image = self.image
+        height, width = image.shape[:2]
+        if 0 < max_dim < max(height, width):
+            scale = max_dim / max(height, width)
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = cv.resize(image, size, interpolation=cv.INTER_AREA)
+        if fmt == "jpeg" and image.ndim == 3 and image.shape[2] == 4:
+            image = cv.cvtColor(image, cv.COLOR_BGRA2BGR)  # JPEG has no alpha
+
+        _, extension, quality_flag = IMAGE_FORMATS[fmt]
+        params = [getattr(cv, quality_flag), quality] if quality_flag else []
+        status, buffer = cv.imencode(extension, image, params)
+        if not status:
+            raise ValueError(f"Could not encode the image as {fmt}.")
+
+        encoded = buffer.tobytes()
+        with self._lock:
+            self._variants[key] = encoded
+            while len(self._variants) > MAX_IMAGE_VARIANTS:
+                self._variants.popitem(last=False)
+        return encoded
+
+
+class ResultStore:
+    """
+    Display (table and image) results of the last MAX_RESULT_RUNS runs, by
+    run id and node id.
+    An /execute or /jobs run gets a fresh id, a session reuses its own id so
+    its results are replaced node by node as patches re-run them. A
+    session's run is pinned: it is not counted nor dropped with the others,
+    the session discards it when it is deleted or evicted.
+    """
+
+    def __init__(self, max_runs: int):
+        self.max_runs = max_runs
+        self._runs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._pinned: set[str] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        return uuid.uuid4().hex
+
+    def pin(self, run_id: str) -> None:
+        """Keeps the run until discard(run_id) drops it."""
+        with self._lock:
+            self._pinned.add(run_id)
+
+    def put(self, run_id: str, node_id: str, result: TableResult | ImageResult) -> None:
+        with self._lock:
+            self._runs.setdefault(run_id, {})[node_id] = result
+            self._runs.move_to_end(run_id)
+            unpinned = [rid for rid in self._runs if rid not in self._pinned]
+            for evicted in unpinned[: max(len(unpinned) - self.max_runs, 0)]:
+                del self._runs[evicted]
+                print(f"Dropped display results of run: {evicted}")
+
+    def get(self, run_id: str, node_id: str) -> TableResult | ImageResult | None:
+        with self._lock:
+            return self._runs.get(run_id, {}).get(node_id)
+
+    def discard(self, run_id: str, node_id: str | None = None) -> None:
+        """Drops one node's result, or the whole run when node_id is None."""
+        with self._lock:
+            if node_id is None:
+                self._runs.pop(run_id, None)
+                self._pinned.discard(run_id)
+            else:
+                self._runs.get(run_id, {}).pop(node_id, None)
+
+
+RESULT_STORE = ResultStore(MAX_RESULT_RUNS)
@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+# Bytes assumed per value of a column without a fixed size (strings, objects)
+OBJECT_VALUE_BYTES = 64
+
+
+class SchemaError(ValueError):
+    """A node cannot accept its inputs, found before a single row or pixel is read."""
+
+
+def _itemsize(dtype: str) -> int:
+    try:
+        parsed = np.dtype(dtype.removesuffix("[pyarrow]"))
+    except TypeError:
+        return OBJECT_VALUE_BYTES  # str, string[pyarrow], unknown, ...
+    return OBJECT_VALUE_BYTES if parsed.kind in "OSUV" else parsed.itemsize
+
+
+@dataclass
+class TableSchema:
+    """
+    What a DATA_ node outputs: column name -> dtype ("unknown" when it could
+    not be inferred), and an estimate of the row count (None when unknown).
+    Filters keep their input's estimate, so it is an upper bound.
+    """
+
+    columns: dict[str, str] = field(default_factory=dict)
+    rows: int | None = None
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.columns)
+
+    def nbytes(self) -> int | None:
+        """Estimated size in memory, strings counted at OBJECT_VALUE_BYTES."""
+        if self.rows is None:
+            return None
+        return self.rows * sum(_itemsize(dtype) for dtype in self.columns.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "kind": "table",
+            "columns": [
+                {"name": name, "dtype": dtype} for name, dtype in self.columns.items()
+            ],
+            "rows": self.rows,
+            "nbytes": self.nbytes(),
+        }
+
+
+@dataclass
+class ImageSchema:
+    """
+    What a VISION_ node outputs, None where unknown (the images of a batch
+    may differ in size). A batch has `images` > 1, its images are processed
+    one at a time, so nbytes is per image.
+    """
+
+    width: int | None = None
+    height: int | None = None
+    channels: int | None = None
+    dtype: str = "uint8"
+    images: int = 1
+
+    @property
+    def size(self) -> tuple[int, int] | None:
+        """(width, height) as OpenCV takes it, None when unknown."""
+        if self.width is None or self.height is None:
+            return None
+        return self.width, self.height
+
+    def nbytes(self) -> int | None:
+        if self.size is None or self.channels is None:
+            return None
+        return self.width * self.height * self.channels * _itemsize(self.dtype)  # type: ignore[operator]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "kind": "image",
+            "width": self.width,
+            "height": self.height,
+            "channels": self.channels,
+            "dtype": self.dtype,
+            "images": self.images,
+            "nbytes": self.nbytes(),
+        }
+
+
+Schema = TableSchema | ImageSchema
+
+
+def table_input(inputs: list[Schema | None], index: int = 0) -> TableSchema | None:
+    """Input `index` of a DATA_ node, None if unknown. An image is a SchemaError."""
+    schema = inputs[index] if index < len(inputs) else None
+    if isinstance(schema, ImageSchema):
+        raise SchemaError("Expects a table but receives an image.")
+    return schema
+
+
+def image_input(inputs: list[Schema | None], index: int = 0) -> ImageSchema | None:
+    """Input `index` of a VISION_ node, None if unknown. A table is a SchemaError."""
+    schema = inputs[index] if index < len(inputs) else None
+    if isinstance(schema, TableSchema):
+        raise SchemaError("Expects an image but receives a table.")
+    return schema
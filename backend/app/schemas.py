@@ -0,0 +1,148 @@
+import graphlib
+from collections.abc import Collection
+from dataclasses import replace
+
+from app.affine import compose
+from app.cache import LRUCache, node_cache_key
+from app.classes import FusedAffineNodeData, Node
+from app.processors.node_map import NODE_INSPECTION_FUNCTIONS, NODE_SCHEMA_FUNCTIONS
+from app.schema_types import (
+    ImageSchema,
+    Schema,
+    SchemaError,
+    TableSchema,
+    image_input,
+)
+
+# Output schemas kept across /inspect calls and runs, one per node version
+SCHEMA_MEMO_ENTRIES = 4096
+
+# Sized in entries rather than bytes (every schema counts as 1)
+SCHEMA_MEMO = LRUCache(SCHEMA_MEMO_ENTRIES)
+
+
+def ancestors(
+    dep_list: dict[str, list[str]],
+    node_ids: list[str],
+    stop: Collection[str] = (),
+) -> set[str]:
+    """
+    The given nodes and every node they (transitively) depend on, without
+    walking past the nodes in `stop`.
+    """
+    seen: set[str] = set()
+    stack = [node_id for node_id in node_ids if node_id in dep_list]
+    while stack:
+        node_id = stack.pop()
+        if node_id not in seen:
+            seen.add(node_id)
+            if node_id not in stop:
+                stack.extend(dep_list[node_id])
+    return seen
+
+
+def _fused_affine_schema(
+    data: FusedAffineNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """Geometric nodes fused by the optimizer: the composed output size."""
+    image = image_input(inputs)
+    if image is None or image.size is None:
+        return image
+    _, (width, height), _ = compose(data, image.size)
+    return replace(image, width=width, height=height)
+
+
+def node_schema(node: Node, inputs: list[Schema | None]) -> Schema | None:
+    """
+    A node's output schema from its inputs' (None where unknown). Plugins
+    with a schema_function give a typed schema, plugins with only an
+    inspection_function give column names (dtypes and rows unknown), other
+    nodes pass their first input through. Schemas are memoised and shared,
+    a schema function returns new ones and never modifies its inputs.
+    """
+    if isinstance(node.data, FusedAffineNodeData):
+        return _fused_affine_schema(node.data, inputs)
+    schema_func = NODE_SCHEMA_FUNCTIONS.get(node.type)
+    if schema_func:
+        return schema_func(node.data, inputs)
+    inspect_func = NODE_INSPECTION_FUNCTIONS.get(node.type)
+    if inspect_func:
+        names = [
+            schema.names if isinstance(schema, TableSchema) else [] for schema in inputs
+        ]
+        return TableSchema(dict.fromkeys(inspect_func(node.data, names), "unknown"))
+    # A safe default for nodes like "Note" or "Display"
+    return inputs[0] if inputs else None
+
+
+def infer_schemas(
+    nmap: dict[str, Node],
+    dep_list: dict[str, list[str]],
+    node_ids: list[str] | None = None,
+    known: dict[str, Schema | None] | None = None,
+) -> tuple[dict[str, Schema | None], dict[str, str]]:
+    """
+    Output schemas of node_ids (every node by default) and of their
+    ancestors only, propagated from the sources. Every node is looked up in
+    SCHEMA_MEMO under its content address (type, data, parent addresses,
+    file stamp, see node_cache_key), so an unchanged upstream is never
+    inspected twice.
+    `known` gives the schemas of nodes inferred before (sessions), their
+    ancestors are not visited. The nodes below them skip SCHEMA_MEMO, they
+    have no content address.
+
+    Returns the schemas (None where unknown) and {node_id: message} for the
+    nodes that cannot accept their inputs (SchemaError). The nodes below
+    those get no schema but no error either, the engine skips them anyway.
+    Raises CycleError if the ancestors form a cycle.
+    """
+    known = known or {}
+    needed = ancestors(
+        dep_list, list(dep_list) if node_ids is None else node_ids, known
+    )
+    order = graphlib.TopologicalSorter(
+        {node_id: [] if node_id in known else dep_list[node_id] for node_id in needed}
+    ).static_order()
+
+    schemas: dict[str, Schema | None] = {}
+    errors: dict[str, str] = {}
+    keys: dict[str, str] = {}
+    for node_id in order:
+        if node_id in known:
+            schemas[node_id] = known[node_id]
+            continue
+        node = nmap[node_id]
+        parents = dep_list[node_id]
+        hit, schema = False, None
+        if all(pid in keys for pid in parents):
+            keys[node_id] = node_cache_key(node, [keys[pid] for pid in parents])
+            hit, schema = SCHEMA_MEMO.get(keys[node_id])
+        if not hit:
+            try:
+                schema = node_schema(node, [schemas[pid] for pid in parents])
+            except SchemaError as e:
+                errors[node_id] = f"{node.data.label}: {e}"
+                schema = None
+            except (OSError, ValueError, LookupError, TypeError) as e:
+                # Unreadable file header, unexpected node data: no schema
+                print(f"Warning: Could not infer the schema of {node_id}: {e}")
+                schema = None
+            else:
+                if node_id in keys:
+                    SCHEMA_MEMO.put(keys[node_id], schema, nbytes=1)
+        schemas[node_id] = schema
+    return schemas, errors
+
+
+def input_schema(
+    nmap: dict[str, Node], dep_list: dict[str, list[str]], target_id: str
+) -> tuple[Schema | None, str | None]:
+    """
+    The schema a node receives, its first parent's output schema, and the
+    error that parent (or one of its ancestors) reports, if any.
+    """
+    parents = dep_list.get(target_id, [])
+    if not parents:
+        return None, None
+    schemas, errors = infer_schemas(nmap, dep_list, parents[:1])
+    return schemas[parents[0]], next(iter(errors.values()), None)
@@ -0,0 +1,524 @@
+import graphlib
+import os
+import threading
+import uuid
+from collections import Counter, OrderedDict, deque
+from typing import Any
+
+from app.cache import RESULT_CACHE
+from app.classes import Edge, GraphPatch, GraphPayload, Node
+from app.engine import (
+    ExecutionPlan,
+    GraphExecution,
+    is_sink,
+    plan_execution,
+    validate_indegrees,
+)
+from app.planner import ReadPlan, plan_reads
+from app.processors.node_map import NODE_INFO
+from app.results import RESULT_STORE
+from app.schema_types import Schema
+from app.schemas import ancestors, infer_schemas
+
+# Sessions kept in memory at once, the least recently used one is dropped
+MAX_SESSIONS = int(os.environ.get("NEUROCIRCUIT_MAX_SESSIONS", "16"))
+
+
+def _signature(plan: ExecutionPlan, node_id: str) -> tuple:
+    """What a planned node's result depends on, besides its parents' results."""
+    node = plan.nmap[node_id]
+    read_plan = plan.read_plans.get(node_id)
+    return (
+        node.type,
+        node.data.model_dump(mode="json"),
+        tuple(plan.dep_list[node_id]),
+        read_plan.describe() if read_plan is not None else None,
+    )
+
+
+def _described(plan: ReadPlan | None) -> dict[str, Any] | None:
+    return plan.describe() if plan is not None else None
+
+
+class GraphSession:
+    """
+    A graph kept on the server together with the results of its last run.
+
+    The node map, the dependency list and the reverse (children) list are
+    updated in place by patches. A run plans like /execute does, with the
+    options (sinks, preview, ...) of the request that created the session,
+    but only what a patch can have changed: the patched nodes and their
+    descendants, plus the sources above them whose pushed-down read
+    (columns, filters) depends on those. Every other node keeps its
+    validation, schema, read plan and result from the run that planned it.
+    With optimize, rewrites move nodes across ids, so each run plans the
+    whole graph and reruns the nodes whose planned form differs.
+    """
+
+    def __init__(self, session_id: str, options: GraphPayload | None = None):
+        self.id = session_id
+        self.lock = threading.Lock()
+        # Planning options, its nodes and edges are unused (see run)
+        self.options = options or GraphPayload(nodes=[], edges=[])
+
+        self.nmap: dict[str, Node] = {}
+        self.dep_list: dict[str, list[str]] = {}
+        self.children: dict[str, list[str]] = {}
+        self.edges: dict[str, Edge] = {}
+        self.node_edges: dict[str, set[str]] = {}
+        self.links: Counter[tuple[str, str]] = Counter()
+
+        self.results: dict[str, Any] = {}
+        self.skipped: set[str] = set()
+        self.errors: dict[str, str] = {}
+        self.outputs: dict[str, Any] = {}
+        self.cache_keys: dict[str, str] = {}
+
+        # Planning state of the nodes that ran (not pruned)
+        self.in_scope: set[str] = set()
+        self.invalid: dict[str, str] = {}
+        self.schemas: dict[str, Schema | None] = {}
+        self.read_plans: dict[str, ReadPlan] = {}
+        # Dirty nodes of patches whose run did not happen (cycle, crash)
+        self.pending: set[str] = set()
+        # Nodes that lost a child, the read plan above them may change
+        self.reshaped: set[str] = set()
+        # With optimize: planned form of the nodes that ran (see _plan_whole)
+        self.planned: dict[str, tuple] = {}
+
+    # --- Graph maintenance ---
+
+    def _link(self, edge: Edge) -> str | None:
+        """Adds an edge to the dependency lists, returns the dirty target."""
+        if edge.source not in self.nmap or edge.target not in self.nmap:
+            print(
+                f"Warning: Edge {edge.id} ({edge.source} -> {edge.target}) is waiting for a missing node."
+            )
+            return None
+        self.links[(edge.source, edge.target)] += 1
+        if self.links[(edge.source, edge.target)] == 1:
+            self.dep_list[edge.target].append(edge.source)
+            self.children[edge.source].append(edge.target)
+        return edge.target
+
+    def _unlink(self, edge: Edge) -> str | None:
+        pair = (edge.source, edge.target)
+        if self.links[pair] == 0:
+            return None
+        self.links[pair] -= 1
+        if self.links[pair] == 0:
+            del self.links[pair]
+            self.dep_list[edge.target].remove(edge.source)
+            self.children[edge.source].remove(edge.target)
+            self.reshaped.add(edge.source)
+        return edge.target
+
+    def _add_edge(self, edge: Edge) -> str | None:
+        if edge.id in self.edges:
+            self._remove_edge(edge.id)
+        self.edges[edge.id] = edge
+        self.node_edges.setdefault(edge.source, set()).add(edge.id)
+        self.node_edges.setdefault(edge.target, set()).add(edge.id)
+        return self._link(edge)
+
+    def _remove_edge(self, edge_id: str) -> str | None:
+        edge = self.edges.pop(edge_id, None)
+        if edge is None:
+            return None
+        for node_id in (edge.source, edge.target):
+            self.node_edges.get(node_id, set()).discard(edge_id)
+        return self._unlink(edge)
+
+    def _upsert_node(self, node: Node) -> list[str]:
+        """Adds or replaces a node. Position-only changes dirty nothing."""
+        old = self.nmap.get(node.id)
+        self.nmap[node.id] = node
+        if old is not None:
+            changed = old.type != node.type or old.data != node.data
+            return [node.id] if changed else []
+
+        dirty = [node.id]
+        self.dep_list[node.id] = []
+        self.children[node.id] = []
+        # Re-attach edges that arrived before this node did
+        for edge_id in self.node_edges.get(node.id, set()):
+            edge = self.edges[edge_id]
+            other = edge.target if edge.source == node.id else edge.source
+            if other in self.nmap:
+                dirty.append(self._link(edge) or "")
+        return dirty
+
+    def _remove_node(self, node_id: str) -> list[str]:
+        if node_id not in self.nmap:
+            return []
+        orphans = list(self.children[node_id])
+        for edge_id in list(self.node_edges.get(node_id, set())):
+            self._remove_edge(edge_id)
+        self.node_edges.pop(node_id, None)
+        del self.nmap[node_id], self.dep_list[node_id], self.children[node_id]
+        self._forget(node_id)
+        self.in_scope.discard(node_id)
+        self.invalid.pop(node_id, None)
+        self.schemas.pop(node_id, None)
+        self.read_plans.pop(node_id, None)
+        self.pending.discard(node_id)
+        self.planned.pop(node_id, None)
+        return orphans
+
+    def _forget(self, node_id: str) -> None:
+        self.results.pop(node_id, None)
+        self.skipped.discard(node_id)
+        self.errors.pop(node_id, None)
+        self.outputs.pop(node_id, None)
+        self.cache_keys.pop(node_id, None)
+        RESULT_STORE.discard(self.id, node_id)
+
+    def apply_patch(self, patch: GraphPatch) -> set[str]:
+        """Applies node/edge diffs and returns the ids of the changed nodes."""
+        dirty: set[str] = set()
+
+        for edge_id in patch.removeEdges:
+            dirty.add(self._remove_edge(edge_id) or "")
+        for node_id in patch.removeNodes:
+            dirty.update(self._remove_node(node_id))
+        for node in [*patch.addNodes, *patch.updateNodes]:
+            dirty.update(self._upsert_node(node))
+        for edge in patch.addEdges:
+            dirty.add(self._add_edge(edge) or "")
+
+        return {node_id for node_id in dirty if node_id in self.nmap}
+
+    def downstream(
+        self, dirty: set[str], children: dict[str, list[str]] | None = None
+    ) -> list[str]:
+        """The dirty nodes and all of their descendants, in BFS order."""
+        children = self.children if children is None else children
+        order: list[str] = []
+        seen: set[str] = set()
+        queue = deque(sorted(dirty))
+        while queue:
+            node_id = queue.popleft()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            order.append(node_id)
+            queue.extend(children[node_id])
+        return order
+
+    # --- Planning ---
+
+    def _demanded(self, affected: list[str]) -> list[str]:
+        """
+        The affected nodes feeding a requested sink (see plan_execution).
+        Their descendants are affected too, so the walk stays inside them.
+        """
+        options = self.options
+        if not (options.prune or options.preview or options.sinks is not None):
+            return affected
+
+        def requested(node_id: str) -> bool:
+            node = self.nmap[node_id]
+            if options.sinks is not None and node_id not in options.sinks:
+                return False
+            if options.sinks is None and not is_sink(node):
+                return False
+            # Side-effect sinks only run in full runs, as with /execute
+            return not (
+                options.preview and NODE_INFO.get(node.type, {}).get("sideEffect")
+            )
+
+        affected_set = set(affected)
+        needed: set[str] = set()
+        stack = [node_id for node_id in affected if requested(node_id)]
+        while stack:
+            node_id = stack.pop()
+            if node_id in needed or node_id not in affected_set:
+                continue
+            needed.add(node_id)
+            stack.extend(self.dep_list[node_id])
+        return [node_id for node_id in affected if node_id in needed]
+
+    def _plan_reads(
+        self, touched: set[str], planned: set[str], invalid: dict[str, str]
+    ) -> dict[str, ReadPlan | None]:
+        """
+        New read plans (None: reads everything) of the sources above the
+        touched nodes, the only ones whose pushed-down read can change.
+        `planned` are the nodes that run (or ran) in this graph, not pruned.
+        """
+        preview = self.options.previewOptions if self.options.preview else None
+        plans: dict[str, ReadPlan | None] = {}
+        for node_id in ancestors(self.dep_list, sorted(touched)):
+            info = NODE_INFO.get(self.nmap[node_id].type, {})
+            if node_id not in planned or self.dep_list[node_id]:
+                continue
+            if not info.get("pushdown") and not (preview and info.get("preview")):
+                continue
+            # Only what the source's descendants need decides its read
+            below = [nid for nid in self.downstream({node_id}) if nid in planned]
+            plans[node_id] = plan_reads(
+                self.nmap, self.dep_list, invalid, below, preview
+            ).get(node_id)
+        return plans
+
+    def _plan_changes(self, dirty: set[str]) -> tuple[ExecutionPlan, list[str]]:
+        """
+        Plans the dirty nodes, their descendants and the sources whose read
+        plan they change. Returns the plan and the nodes to run, in order.
+        Raises CycleError when a patch closed a cycle (through a dirty node).
+        """
+        touched = {nid for nid in dirty | self.reshaped if nid in self.nmap}
+        while True:
+            affected = self.downstream(dirty)
+            affected_set = set(affected)
+            graphlib.TopologicalSorter(
+                {
+                    node_id: [p for p in self.dep_list[node_id] if p in affected_set]
+                    for node_id in affected
+                }
+            ).prepare()
+
+            scope = self._demanded(affected)
+            scope_set = set(scope)
+            # Parents pruned so far (a sink was added) run now as well
+            missing = {
+                parent_id
+                for node_id in scope
+                for parent_id in self.dep_list[node_id]
+                if parent_id not in affected_set and parent_id not in self.in_scope
+            }
+            if missing:
+                dirty = dirty | missing
+                continue
+
+            invalid = validate_indegrees(
+                self.nmap, {node_id: self.dep_list[node_id] for node_id in scope}
+            )
+            known = {
+                parent_id: self.schemas.get(parent_id)
+                for node_id in scope
+                for parent_id in self.dep_list[node_id]
+                if parent_id not in scope_set
+            }
+            schemas, schema_errors = infer_schemas(
+                self.nmap, self.dep_list, scope, known
+            )
+            for node_id, message in schema_errors.items():
+                invalid.setdefault(node_id, message)
+
+            kept = {k: v for k, v in self.invalid.items() if k not in affected_set}
+            planned = scope_set | (self.in_scope - affected_set)
+            read_plans = self._plan_reads(touched, planned, {**kept, **invalid})
+            # A source whose read changed runs again, with everything below
+            moved = {
+                node_id
+                for node_id, plan in read_plans.items()
+                if node_id not in affected_set
+                and _described(plan) != _described(self.read_plans.get(node_id))
+            }
+            if not moved:
+                break
+            dirty = dirty | moved
+
+        plans = {k: v for k, v in self.read_plans.items() if k not in read_plans}
+        plans.update({k: v for k, v in read_plans.items() if v is not None})
+        plan = ExecutionPlan(
+            self.nmap,
+            self.dep_list,
+            invalid,
+            scope,
+            [node_id for node_id in affected if node_id not in scope_set],
+            read_plans=plans,
+            schemas={k: v for k, v in schemas.items() if k in scope_set},
+        )
+        return plan, affected
+
+    def _plan_whole(self, dirty: set[str]) -> tuple[ExecutionPlan, list[str]]:
+        """
+        Plans the whole graph (optimize), the nodes whose planned form
+        changed run again. Raises CycleError for cyclic graphs.
+        """
+        plan = plan_execution(self.options, (self.nmap, self.dep_list))
+        scope = plan.scope if plan.scope is not None else list(plan.dep_list)
+        in_scope = set(scope)
+        # Ids the plan no longer runs: pruned, or merged by the optimizer
+        for node_id in [nid for nid in self.planned if nid not in in_scope]:
+            del self.planned[node_id]
+            self._forget(node_id)
+
+        changed = {
+            node_id
+            for node_id in scope
+            if node_id in dirty
+            or self.planned.get(node_id) != _signature(plan, node_id)
+        }
+        children: dict[str, list[str]] = {node_id: [] for node_id in scope}
+        for node_id in scope:
+            for parent_id in plan.dep_list[node_id]:
+                children[parent_id].append(node_id)
+        affected = self.downstream(changed, children)
+        affected_set = set(affected)
+        plan.scope = affected
+        plan.validation_errors = {
+            node_id: message
+            for node_id, message in plan.validation_errors.items()
+            if node_id in affected_set
+        }
+        return plan, affected
+
+    def _commit(self, plan: ExecutionPlan, affected: list[str]) -> None:
+        """Keeps the planning state of a run that happened."""
+        self.pending.clear()
+        self.reshaped.clear()
+        if self.options.optimize:
+            for node_id in affected:
+                self.planned[node_id] = _signature(plan, node_id)
+            return
+
+        scope = set(plan.scope or ())
+        for node_id in affected:
+            self.invalid.pop(node_id, None)
+            self.schemas.pop(node_id, None)
+            if node_id in scope:
+                self.in_scope.add(node_id)
+            else:
+                self.in_scope.discard(node_id)
+        self.invalid.update(plan.validation_errors)
+        self.schemas.update(plan.schemas)
+        self.read_plans = plan.read_plans
+
+    # --- Execution ---
+
+    def run(self, dirty: set[str]) -> dict[str, Any]:
+        dirty = {node_id for node_id in dirty | self.pending if node_id in self.nmap}
+        try:
+            if self.options.optimize:
+                plan, affected = self._plan_whole(dirty)
+            else:
+                plan, affected = self._plan_changes(dirty)
+        except graphlib.CycleError as e:
+            # A patch can close a cycle, the graph stays as patched until fixed
+            self.pending = dirty
+            return self._error(f"Graph contains a cycle: {e}", list(self.nmap))
+
+        for node_id in affected:
+            self._forget(node_id)
+
+        scope = plan.scope or []
+        execution = GraphExecution(
+            plan.nmap,
+            plan.dep_list,
+            plan.validation_errors,
+            cache=RESULT_CACHE,
+            scope=scope,
+            retain_results=True,
+            read_plans=plan.read_plans,
+            run_id=self.id,  # Display pages stay reachable across patches
+        )
+
+        # Only the direct inputs of the planned subgraph are needed
+        scope_set = set(scope)
+        boundary = {
+            parent_id
+            for node_id in scope
+            for parent_id in plan.dep_list[node_id]
+            if parent_id not in scope_set
+        }
+        execution.seed(
+            {pid: self.results[pid] for pid in boundary if pid in self.results},
+            {pid for pid in boundary if pid in self.skipped},
+            {pid: self.cache_keys[pid] for pid in boundary if pid in self.cache_keys},
+        )
+
+        try:
+            response = execution.run()
+        except (RuntimeError, OSError) as e:  # e.g. a broken process pool
+            self.pending = dirty | set(affected)
+            self.skipped.update(scope)
+            return self._error(f"An unexpected error occurred: {e}", scope)
+
+        self._commit(plan, affected)
+        for node_id in scope:
+            if node_id in execution.results:
+                self.results[node_id] = execution.results[node_id]
+            if node_id in execution.skipped:
+                self.skipped.add(node_id)
+            if node_id in execution.cache_keys:
+                self.cache_keys[node_id] = execution.cache_keys[node_id]
+        self.errors.update(response["node_errors"])
+        self.outputs.update(response["output"])
+
+        status = "success"
+        if self.errors:
+            status = "partial_success" if self.results else "error"
+        return {
+            **response,
+            **self._state(),
+            "status": status,
+            "pruned_nodes": plan.pruned_nodes,
+            "rewrites": [rewrite.to_dict() for rewrite in plan.rewrites],
+            "preview": self.options.preview,
+        }
+
+    def _error(self, message: str, skipped: list[str]) -> dict[str, Any]:
+        print(f"Session {self.id} Error: {message}")
+        state = self._state()
+        return {
+            **state,
+            "status": "error",
+            "message": message,
+            "skipped_nodes": list(dict.fromkeys([*state["skipped_nodes"], *skipped])),
+            "exec_order": [],
+            "download_files": [],
+            "cache": {},
+        }
+
+    def _state(self) -> dict[str, Any]:
+        """Session-wide outputs, skips and errors, in graph order."""
+        return {
+            "sessionId": self.id,
+            "runId": self.id,
+            "output": {
+                nid: self.outputs[nid] for nid in self.nmap if nid in self.outputs
+            },
+            "skipped_nodes": [nid for nid in self.nmap if nid in self.skipped],
+            "node_errors": {
+                nid: self.errors[nid] for nid in self.nmap if nid in self.errors
+            },
+        }
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, GraphSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, graph: GraphPayload) -> GraphSession:
+        options = graph.model_copy(update={"nodes": [], "edges": []})
+        session = GraphSession(uuid.uuid4().hex, options)
+        session.apply_patch(GraphPatch(addNodes=graph.nodes, addEdges=graph.edges))
+        # Its display pages outlive any number of /execute runs meanwhile
+        RESULT_STORE.pin(session.id)
+        with self._lock:
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                RESULT_STORE.discard(evicted)
+                print(f"Evicted graph session: {evicted}")
+        return session
+
+    def get(self, session_id: str) -> GraphSession | None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        RESULT_STORE.discard(session_id)
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+
+SESSIONS = SessionStore(MAX_SESSIONS)
@@ -0,0 +1,203 @@
+import pickle
+import sys
+import weakref
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+
+# Column buffers inside a shared block start on a cache line boundary
+_ALIGN = 64
+
+
+@dataclass
+class SharedRef:
+    """
+    Picklable handle to a node result living in a shared memory block.
+
+    kind is one of "ndarray", "dataframe" or "object". Only the small `meta`
+    dict travels through the process pool's pipe, the pixel/column data is
+    mapped by name on the other side.
+    """
+
+    kind: str
+    name: str | None = None
+    size: int = 0
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _is_dataframe(value: Any) -> bool:
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(value, pd.DataFrame)
+
+
+def _shareable(arr: Any) -> bool:
+    """Plain numpy buffers (numbers, bools, datetimes) can be shared as-is."""
+    return isinstance(arr, np.ndarray) and arr.dtype.kind in "biufcmM"
+
+
+def export_value(value: Any) -> SharedRef:
+    """
+    Copies a result into a new shared memory block and returns its handle.
+    Anything that is not an image or a DataFrame is pickled into the handle.
+    """
+    if isinstance(value, np.ndarray) and _shareable(value):
+        arr = np.ascontiguousarray(value)
+        meta = {"shape": arr.shape, "dtype": arr.dtype.str, "offset": 0}
+        return _write_block("ndarray", [arr], [meta], meta)
+
+    if _is_dataframe(value):
+        return _export_dataframe(value)
+
+    return SharedRef(kind="object", meta={"pickle": pickle.dumps(value)})
+
+
+def _export_dataframe(df: Any) -> SharedRef:
+    pd = sys.modules["pandas"]
+
+    arrays: list[np.ndarray] = []
+    columns: list[dict[str, Any]] = []
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        values = col.to_numpy() if isinstance(col.dtype, np.dtype) else None
+        if values is not None and _shareable(values):
+            values = np.ascontiguousarray(values)
+            col_meta = {"shape": values.shape, "dtype": values.dtype.str}
+            arrays.append(values)
+        else:
+            # Strings, categoricals and other extension arrays are pickled
+            col_meta = {"pickle": pickle.dumps(col.array)}
+        columns.append(col_meta)
+
+    if isinstance(df.index, pd.RangeIndex):
+        index = ("range", df.index.start, df.index.stop, df.index.step)
+    else:
+        index = ("pickle", pickle.dumps(df.index))
+
+    meta = {
+        "columns": columns,
+        "labels": pickle.dumps(df.columns),
+        "index": index,
+    }
+    shared_metas = [c for c in columns if "pickle" not in c]
+    return _write_block("dataframe", arrays, shared_metas, meta)
+
+
+def _write_block(
+    kind: str, arrays: list[np.ndarray], metas: list[dict], meta: dict
+) -> SharedRef:
+    offset = 0
+    for arr, arr_meta in zip(arrays, metas):
+        offset = _align(offset)
+        arr_meta["offset"] = offset
+        offset += arr.nbytes
+
+    # A zero sized block is not allowed, so empty frames still map one byte
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    try:
+        for arr, arr_meta in zip(arrays, metas):
+            start = arr_meta["offset"]
+            shm.buf[start : start + arr.nbytes] = arr.reshape(-1).view(np.uint8)
+    finally:
+        shm.close()
+    return SharedRef(kind=kind, name=shm.name, size=shm.size, meta=meta)
+
+
+def _read_array(
+    shm: shared_memory.SharedMemory, meta: dict[str, Any], copy: bool
+) -> np.ndarray:
+    dtype = np.dtype(meta["dtype"])
+    count = int(np.prod(meta["shape"], dtype=np.int64))
+    view = np.frombuffer(shm.buf, dtype=dtype, count=count, offset=meta["offset"])
+    view = view.reshape(meta["shape"])
+    return view.copy() if copy else view
+
+
+def _build(ref: SharedRef, shm: shared_memory.SharedMemory | None, copy: bool) -> Any:
+    if ref.kind == "object":
+        return pickle.loads(ref.meta["pickle"])
+
+    assert shm is not None
+    if ref.kind == "ndarray":
+        return _read_array(shm, ref.meta, copy)
+
+    import pandas as pd
+
+    columns = {}
+    for i, col_meta in enumerate(ref.meta["columns"]):
+        if "pickle" in col_meta:
+            columns[i] = pickle.loads(col_meta["pickle"])
+        else:
+            columns[i] = _read_array(shm, col_meta, copy)
+
+    kind, *index_args = ref.meta["index"]
+    if kind == "range":
+        index = pd.RangeIndex(*index_args)
+    else:
+        index = pickle.loads(index_args[0])
+
+    df = pd.DataFrame(columns, index=index, copy=False)
+    df.columns = pickle.loads(ref.meta["labels"])
+    return df
+
+
+def attach_value(ref: SharedRef) -> tuple[Any, shared_memory.SharedMemory | None]:
+    """
+    Maps a shared result without copying it. The returned block must stay
+    open while the value (or any view of it) is in use.
+    """
+    if ref.kind == "object":
+        return _build(ref, None, copy=False), None
+    shm = shared_memory.SharedMemory(name=ref.name)
+    return _build(ref, shm, copy=False), shm
+
+
+def load_value(ref: SharedRef) -> Any:
+    """Returns a private copy of a shared result."""
+    if ref.kind == "object":
+        return _build(ref, None, copy=True)
+    shm = shared_memory.SharedMemory(name=ref.name)
+    try:
+        return _build(ref, shm, copy=True)
+    finally:
+        shm.close()
+
+
+def _unlink(name: str) -> None:
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+class SharedResult:
+    """
+    Owner of a shared block in the parent process. The block is unlinked
+    as soon as the last reference to this object goes away.
+    """
+
+    def __init__(self, ref: SharedRef):
+        self.ref = ref
+        if ref.name is not None:
+            weakref.finalize(self, _unlink, ref.name)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ref.size
+
+    def load(self) -> Any:
+        return load_value(self.ref)
+
+
+def materialize(value: Any) -> Any:
+    """Turns a SharedResult back into a regular in-process value."""
+    if isinstance(value, SharedResult):
+        return value.load()
+    return value
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+# pandas is imported where it is used: starting the server must not load it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# CSV files bigger than this are read in chunks unless the node sets chunkSize
+CSV_STREAM_BYTES = int(
+    os.environ.get("NEUROCIRCUIT_CSV_STREAM_BYTES", str(1024 * 1024 * 1024))
+)
+# Rows per chunk for automatically streamed files
+CSV_CHUNK_ROWS = int(os.environ.get("NEUROCIRCUIT_CSV_CHUNK_ROWS", "100000"))
+
+# Values of one column an exact median may collect before it narrows further
+MEDIAN_MAX_VALUES = 1_000_000
+MEDIAN_BINS = 1024
+
+
+class ChunkedFrame:
+    """
+    A CSV file read in chunks of rows, plus the row-wise steps applied to it.
+
+    It is only a recipe: iterating re-reads the file and pushes every chunk
+    through the steps, so memory is bounded by the chunk size and a node that
+    needs two passes simply iterates twice. Steps must be picklable (module
+    level functions / partials) so the recipe can cross to worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunksize: int,
+        steps: tuple[Callable[[pd.DataFrame], pd.DataFrame], ...] = (),
+        usecols: list[str] | None = None,
+        options: dict[str, Any] | None = None,
+    ):
+        self.path = path
+        self.chunksize = chunksize
+        self.steps = steps
+        self.usecols = usecols
+        self.options = options or {}  # Extra read_csv arguments (dtype_backend)
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        return self.chunks_from(0)
+
+    def chunks_from(self, start: int) -> Iterator[pd.DataFrame]:
+        """
+        The chunks from number `start` on. The rows before it are skipped by
+        the CSV tokenizer, neither parsed nor pushed through the steps.
+        """
+        import pandas as pd
+
+        skipped = start * self.chunksize
+        header: dict[str, Any] = {}
+        if skipped:
+            # Past the header line, so the column names are passed along
+            names = pd.read_csv(self.path, nrows=0, **self.options).columns
+            header = {"skiprows": skipped + 1, "header": None, "names": list(names)}
+        with pd.read_csv(
+            self.path,
+            chunksize=self.chunksize,
+            usecols=self.usecols,
+            **header,
+            **self.options,
+        ) as reader:
+            for chunk in reader:
+                if skipped:
+                    chunk.index += skipped  # Same row labels as a full read
+                for step in self.steps:
+                    chunk = step(chunk)
+                yield chunk
+
+    def __repr__(self) -> str:
+        return f"ChunkedFrame({self.path!r}, chunksize={self.chunksize}, steps={len(self.steps)})"
+
+    def map(self, step: Callable[[pd.DataFrame], pd.DataFrame]) -> ChunkedFrame:
+        return ChunkedFrame(
+            self.path, self.chunksize, (*self.steps, step), self.usecols, self.options
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Concatenates every chunk, for nodes that need the whole frame."""
+        import pandas as pd
+
+        chunks = list(self)
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks)
+
+
+def csv_chunk_rows(path: str, chunk_size: int) -> int:
+    """Rows per chunk to read `path` with, 0 to read it in one go."""
+    if chunk_size > 0:
+        return chunk_size
+    try:
+        return CSV_CHUNK_ROWS if os.path.getsize(path) > CSV_STREAM_BYTES else 0
+    except OSError:
+        return 0
+
+
+def preview_rows(
+    chunks: Iterable[pd.DataFrame], rows: int, sample: str, seed: int = 0
+) -> pd.DataFrame:
+    """
+    The first `rows` rows of the chunks ("head", stops reading as soon as
+    it has them) or a uniform sample of `rows` rows in file order
+    ("uniform", one pass keeping the rows with the smallest random keys).
+    The seed is fixed so the same file always gives the same preview.
+    """
+    import pandas as pd
+
+    if sample == "head":
+        parts, count = [], 0
+        for chunk in chunks:
+            parts.append(chunk)
+            count += len(chunk)
+            if count >= rows:
+                break
+        return pd.concat(parts).iloc[:rows] if parts else pd.DataFrame()
+
+    rng = np.random.default_rng(seed)
+    kept: pd.DataFrame | None = None
+    keys = np.empty(0)
+    for chunk in chunks:
+        kept = chunk if kept is None else pd.concat([kept, chunk])
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        if len(kept) > rows:
+            keep = np.sort(np.argpartition(keys, rows)[:rows])
+            kept, keys = kept.iloc[keep], keys[keep]
+    return kept if kept is not None else pd.DataFrame()
+
+
+def _row_wise(
+    chunk: pd.DataFrame, processing_fun: Callable, data: Any, ownership: bool
+) -> pd.DataFrame:
+    # Every chunk is freshly read, the step always owns it
+    if ownership:
+        return processing_fun(data, [chunk], owned=[True])
+    return processing_fun(data, [chunk])
+
+
+def row_wise_step(
+    processing_fun: Callable, data: Any, ownership: bool = False
+) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """Wraps a single-input plugin function so it runs on each chunk."""
+    return partial(
+        _row_wise, processing_fun=processing_fun, data=data, ownership=ownership
+    )
+
+
+# --- Aggregates over all chunks ---
+
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max of every numeric column, merged chunk
+    by chunk (Chan et al. parallel update, so no catastrophic cancellation).
+    """
+
+    def __init__(self) -> None:
+        import pandas as pd
+
+        self.count = pd.Series(dtype="float64")
+        self.mean = pd.Series(dtype="float64")
+        self.m2 = pd.Series(dtype="float64")
+        self.min = pd.Series(dtype="float64")
+        self.max = pd.Series(dtype="float64")
+
+    def update(self, df: pd.DataFrame) -> None:
+        numeric = df.select_dtypes(include=["number"]).astype("float64")
+        count = numeric.count().astype("float64")
+        mean = numeric.mean()
+        m2 = ((numeric - mean) ** 2).sum()
+
+        total = self.count.add(count, fill_value=0)
+        delta = mean.sub(self.mean, fill_value=0)
+        old_count = self.count.reindex(total.index, fill_value=0)
+        new_count = count.reindex(total.index, fill_value=0)
+        share = (new_count / total).fillna(0)
+
+        self.mean = self.mean.reindex(total.index, fill_value=0).add(
+            delta * share, fill_value=0
+        )
+        self.m2 = (
+            self.m2.add(m2, fill_value=0)
+            + (delta**2 * old_count * new_count / total).fillna(0)
+        ).reindex(total.index)
+        self.count = total
+        self.min = self.min.combine(numeric.min(), np.fmin)
+        self.max = self.max.combine(numeric.max(), np.fmax)
+
+    def std(self, ddof: int = 1) -> pd.Series:
+        return np.sqrt(self.m2 / (self.count - ddof))
+
+    def column_mean(self) -> pd.Series:
+        return self.mean.where(self.count > 0)
+
+
+def running_moments(frames: ChunkedFrame) -> RunningMoments:
+    moments = RunningMoments()
+    for chunk in frames:
+        moments.update(chunk)
+    return moments
+
+
+def most_frequent(frames: ChunkedFrame, columns: list[str]) -> pd.Series:
+    """Most frequent value per column, the smallest one on ties (as sklearn)."""
+    import pandas as pd
+
+    counts: dict[str, pd.Series] = {col: pd.Series(dtype="int64") for col in columns}
+    for chunk in frames:
+        for col in columns:
+            counts[col] = counts[col].add(chunk[col].value_counts(), fill_value=0)
+
+    modes = {}
+    for col, col_counts in counts.items():
+        if col_counts.empty:
+            modes[col] = np.nan
+        else:
+            modes[col] = col_counts[col_counts == col_counts.max()].index.min()
+    return pd.Series(modes, dtype="float64")
+
+
+class _MedianSearch:
+    """
+    Narrows one column down to the value range holding its median ranks.
+    Values below `lo` are only counted, values in the range are binned (or
+    collected once few enough are left).
+    """
+
+    def __init__(self, count: int, lo: float, hi: float):
+        self.ranks = ((count - 1) // 2, count // 2)
+        self.lo, self.hi = lo, hi
+        self.hi_inclusive = True
+        self.below = 0
+        self.inside = count
+        self.result: float | None = float(lo) if lo == hi else None
+
+    @property
+    def collecting(self) -> bool:
+        return self.inside <= MEDIAN_MAX_VALUES
+
+    def select(self, values: np.ndarray) -> np.ndarray:
+        upper = values <= self.hi if self.hi_inclusive else values < self.hi
+        return values[(values >= self.lo) & upper]
+
+    def narrow(self, hist: np.ndarray) -> None:
+        edges = np.linspace(self.lo, self.hi, MEDIAN_BINS + 1)
+        cum = np.cumsum(hist)
+        first, last = (
+            int(np.searchsorted(cum, rank - self.below, side="right"))
+            for rank in self.ranks
+        )
+        inside = int(hist[first : last + 1].sum())
+        if inside >= self.inside:
+            # Float edges stopped splitting the values, collect them instead
+            self.inside = 0
+            return
+        self.below += int(cum[first - 1]) if first else 0
+        self.lo, self.hi = float(edges[first]), float(edges[last + 1])
+        self.hi_inclusive = self.hi_inclusive and last == MEDIAN_BINS - 1
+        self.inside = inside
+        if self.lo == self.hi:
+            self.result = self.lo
+
+    def finish(self, values: np.ndarray) -> None:
+        values = np.sort(values)
+        low, high = (values[rank - self.below] for rank in self.ranks)
+        self.result = float((low + high) / 2)
+
+
+def exact_medians(frames: ChunkedFrame, moments: RunningMoments) -> pd.Series:
+    """
+    Exact median of every numeric column in a few passes over the chunks.
+    Each pass bins the values of the remaining range into MEDIAN_BINS
+    buckets and keeps only the bucket(s) holding the median ranks, until the
+    range is small enough to sort in memory.
+    """
+    import pandas as pd
+
+    searches = {
+        col: _MedianSearch(int(n), moments.min[col], moments.max[col])
+        for col, n in moments.count.items()
+        if n > 0
+    }
+
+    while pending := {c: s for c, s in searches.items() if s.result is None}:
+        hists = {c: np.zeros(MEDIAN_BINS, dtype=np.int64) for c in pending}
+        collected: dict[str, list[np.ndarray]] = {c: [] for c in pending}
+        for chunk in frames:
+            for col, search in pending.items():
+                values = chunk[col].dropna().to_numpy(dtype="float64")
+                values = search.select(values)
+                if search.collecting:
+                    collected[col].append(values)
+                else:
+                    hists[col] += np.histogram(
+                        values, bins=MEDIAN_BINS, range=(search.lo, search.hi)
+                    )[0]
+        for col, search in pending.items():
+            if search.collecting:
+                search.finish(np.concatenate(collected[col]))
+            else:
+                search.narrow(hists[col])
+
+    return pd.Series(
+        {col: search.result for col, search in searches.items()}, dtype="float64"
+    ).reindex(moments.count.index)
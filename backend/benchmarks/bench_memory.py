@@ -0,0 +1,128 @@
+"""
+Peak memory of a long linear image pipeline, with and without freeing
+intermediate results.
+
+    cd backend
+    python -m benchmarks.bench_memory --width 7680 --height 4320 --steps 10
+
+Every configuration runs in a fresh process. The peak is read from
+tracemalloc (numpy reports every pixel buffer to it) and, where available,
+from the process' max RSS.
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+def _chain(img_path: str, steps: int) -> dict:
+    nodes = [
+        {
+            "id": "load",
+            "type": "loadImage",
+            "position": {"x": 0, "y": 0},
+            "data": {"label": "load", "filePath": img_path},
+        }
+    ]
+    edges = []
+    for i in range(steps):
+        nodes.append(
+            {
+                "id": f"flip{i}",
+                "type": "flipImage",
+                "position": {"x": 0, "y": 0},
+                "data": {"label": f"flip{i}", "horizontal": True},
+            }
+        )
+        source = nodes[-2]["id"]
+        edges.append({"id": f"e{i}", "source": source, "target": f"flip{i}"})
+    nodes.append(
+        {
+            "id": "save",
+            "type": "saveImage",
+            "position": {"x": 0, "y": 0},
+            "data": {"label": "save"},
+        }
+    )
+    edges.append({"id": "e_save", "source": f"flip{steps - 1}", "target": "save"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def _measure(img_path: str, steps: int, retain: bool, queue) -> None:
+    # Plugin discovery and the nodes print a lot, keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        _run_chain(img_path, steps, retain, queue)
+
+
+def _run_chain(img_path: str, steps: int, retain: bool, queue) -> None:
+    from app import engine
+    from app.classes import GraphPayload
+
+    graph = GraphPayload.model_validate(_chain(img_path, steps))
+    nmap, dep_list = engine.build_dependency_list(graph.nodes, graph.edges)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    tracemalloc.start()
+    execution = engine.GraphExecution(
+        nmap, dep_list, {}, max_workers=1, retain_results=retain
+    )
+    execution.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+    queue.put((peak, (rss_after - rss_before) * 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=7680)
+    parser.add_argument("--height", type=int, default=4320)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(
+        0, 255, (args.height, args.width, 3), dtype=np.uint8
+    )
+    frame_mb = frame.nbytes / 2**20
+    ctx = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        img_path = str(Path(tmp) / "frame.png")
+        cv.imwrite(img_path, frame)
+        del frame
+
+        print(
+            f"{args.steps}-step flip chain on {args.width}x{args.height} "
+            f"({frame_mb:.1f} MiB per frame)"
+        )
+        for label, retain in (("keep all results", True), ("refcount freeing", False)):
+            queue = ctx.Queue()
+            proc = ctx.Process(
+                target=_measure, args=(img_path, args.steps, retain, queue)
+            )
+            proc.start()
+            peak, rss = queue.get()
+            proc.join()
+            rss_info = f", max RSS grew {rss / 2**20:8.1f} MiB" if resource else ""
+            print(
+                f"  {label:<17} peak traced {peak / 2**20:8.1f} MiB "
+                f"({peak / 2**20 / frame_mb:4.1f} frames){rss_info}"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Backend cold start: time to import app.main (what uvicorn does before it
+serves the first request) with plugins imported lazily, versus importing
+every plugin up front as discovery used to.
+
+    cd backend
+    python -m benchmarks.bench_startup --repeat 5
+
+Every measurement runs in a fresh interpreter, so nothing is imported yet.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+_SCRIPTS = {
+    "lazy (default)": "import app.main",
+    "eager": (
+        "import app.main\n"
+        "from app.processors.node_map import load_all_plugins\n"
+        "load_all_plugins()"
+    ),
+}
+
+_TIMED = """
+import contextlib, io, time
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+{body}
+print(time.perf_counter() - started)
+"""
+
+
+def _time(body: str) -> float:
+    script = _TIMED.format(body="\n".join("    " + line for line in body.split("\n")))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"import app.main in a fresh process, median of {args.repeat}")
+    for label, body in _SCRIPTS.items():
+        timings = [_time(body) for _ in range(args.repeat)]
+        print(f"  {label:<15} {statistics.median(timings) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
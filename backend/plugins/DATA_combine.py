@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from app.classes import CombineNodeData
+from app.schema_types import Schema, TableSchema, table_input
 
 
 # --- Plugin Metadata ---
@@ -7,6 +9,8 @@ node_info = {
     "nodeType": "combine",
     "function": "process_combine_node",
     "inDegree": "2",
+    "projection_function": "project_combine_node",
+    "schema_function": "schema_combine_node",
 }
 # -----------------------
 
@@ -37,3 +41,50 @@ def process_combine_node(
         return pd.DataFrame()
 
     return concatenated_df
+
+
+def project_combine_node(
+    data: CombineNodeData, needed: set[str] | None
+) -> set[str] | None:
+    """
+    Stacking rows keeps the column names, so both inputs only need the asked
+    for columns. Side by side the columns are renumbered, read everything.
+    """
+    return needed if data.axis == 0 else None
+
+
+def _stacked_dtype(first: str | None, second: str | None) -> str:
+    """dtype of a column once both inputs' rows are stacked."""
+    if first == second:
+        return first  # type: ignore[return-value]
+    if first is None or second is None or "unknown" in (first, second):
+        return "unknown"  # Missing values are filled in, depends on the dtype
+    try:
+        return str(np.result_type(first, second))
+    except TypeError:
+        return "object"
+
+
+def schema_combine_node(
+    data: CombineNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
+    """
+    Stacked rows: the union of the columns and the sum of the rows. Side by
+    side: every column, renumbered from 0, and the longer input's rows.
+    """
+    first, second = table_input(inputs, 0), table_input(inputs, 1)
+    if first is None or second is None:
+        return None
+    known = first.rows is not None and second.rows is not None
+
+    if data.axis == 0:
+        names = first.names + [col for col in second.names if col not in first.columns]
+        columns = {
+            col: _stacked_dtype(first.columns.get(col), second.columns.get(col))
+            for col in names
+        }
+        return TableSchema(columns, first.rows + second.rows if known else None)  # type: ignore[operator]
+
+    dtypes = [*first.columns.values(), *second.columns.values()]
+    columns = {str(i): dtype for i, dtype in enumerate(dtypes)}
+    return TableSchema(columns, max(first.rows, second.rows) if known else None)  # type: ignore[type-var]
@@ -1,20 +1,54 @@
-import pandas as pd
+import os
+from collections.abc import Callable
 from typing import Any
-from app.classes import InputNodeData
 
+import pandas as pd
+
+from app.cache import file_header
+from app.classes import InputNodeData, PreviewOptions
+from app.dataframes import arrow_available
+from app.schema_types import Schema, TableSchema
+from app.streaming import CSV_CHUNK_ROWS, ChunkedFrame, csv_chunk_rows, preview_rows
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "csvInput",
     "function": "process_input_node",
-    "inspection_function": "inspect_load_csv",
+    "schema_function": "schema_load_csv",
     "inDegree": "0",
+    "pushdown": True,  # Accepts usecols / row_filters from the read planner
+    "preview": True,  # Reads a head / sample of the rows in preview runs
 }
 # -----------------------
 
+# Rows parsed to infer the dtypes, bytes read to estimate the row count
+SCHEMA_SAMPLE_ROWS = 1000
+SCHEMA_SAMPLE_BYTES = 64 * 1024
+
+
+def process_input_node(
+    data: InputNodeData,
+    inputs: list[Any],
+    usecols: list[str] | None = None,
+    row_filters: list[Callable[[pd.DataFrame], pd.DataFrame]] | None = None,
+    preview: PreviewOptions | None = None,
+) -> pd.DataFrame | ChunkedFrame:
+    """
+    Loads data from a CSV file specified in the node's data. Files that are
+    streamed (see csv_chunk_rows) are returned as a lazy ChunkedFrame.
+
+    The read planner may limit the parsed columns to `usecols` and pass the
+    `row_filters` below this node, which are applied chunk by chunk while
+    reading so dropped rows are never held all at once.
+
+    With `arrow` set the columns are Arrow-backed and whole files are parsed
+    by the multithreaded pyarrow reader (chunked reads keep the C parser,
+    the pyarrow engine cannot read in chunks).
 
-def process_input_node(data: InputNodeData, inputs: list[Any]) -> pd.DataFrame:
-    """Loads data from a CSV file specified in the node's data."""
+    A preview run reads only the first `preview.rows` rows passing the
+    filters, or a uniform sample of them (which still scans the file, but
+    never holds more than one chunk plus the sample).
+    """
     print(f"  -> Loading data from: {data.filePath}")
 
     if len(inputs) != 0:
@@ -27,24 +61,114 @@ def process_input_node(data: InputNodeData, inputs: list[Any]) -> pd.DataFrame:
         # We assume the file is in the 'backend' directory for now
         if data.filePath == "":
             raise FileNotFoundError
+        if usecols is not None:
+            usecols = _existing_columns(data.filePath, usecols)
+            print(f"  -> Reading only columns: {usecols}")
+        steps = tuple(row_filters or ())
+        arrow = getattr(data, "arrow", False) and _arrow_or_fallback()
+        chunk_options = {"dtype_backend": "pyarrow"} if arrow else {}
+
+        if preview is not None:
+            print(f"  -> Preview: {preview.sample} of {preview.rows} rows.")
+            chunk_rows = preview.rows if preview.sample == "head" else CSV_CHUNK_ROWS
+            chunks = ChunkedFrame(
+                data.filePath, max(chunk_rows, 1), steps, usecols, chunk_options
+            )
+            return preview_rows(chunks, preview.rows, preview.sample)
+
+        chunk_rows = csv_chunk_rows(data.filePath, data.chunkSize)
+        if chunk_rows:
+            print(f"  -> Streaming in chunks of {chunk_rows} rows.")
+            return ChunkedFrame(
+                data.filePath, chunk_rows, steps, usecols, chunk_options
+            )
+        elif steps:
+            print(f"  -> Filtering {len(steps)} condition(s) while reading.")
+            df = ChunkedFrame(
+                data.filePath, CSV_CHUNK_ROWS, steps, usecols, chunk_options
+            ).to_frame()
+        elif arrow:
+            df = pd.read_csv(
+                data.filePath,
+                usecols=usecols,
+                engine="pyarrow",
+                dtype_backend="pyarrow",
+            )
         else:
-            df = pd.read_csv(data.filePath)
+            df = pd.read_csv(data.filePath, usecols=usecols)
         return df
     except FileNotFoundError:
         print(f"Error: File not found at {data.filePath}")
         return pd.DataFrame()  # Return empty DataFrame on error
 
 
-def inspect_load_csv(data: InputNodeData, *args) -> list[str]:
+def _arrow_or_fallback() -> bool:
+    if arrow_available():
+        print("  -> Reading with pyarrow into Arrow-backed columns.")
+        return True
+    print("  -> Warning: pyarrow is not installed, using the default CSV reader.")
+    return False
+
+
+def _existing_columns(file_path: str, wanted: list[str]) -> list[str]:
     """
-    Inspects an inputNode to get its output schema (column names).
-    Efficiently reads only the header of the CSV.
+    The wanted columns in file order. At least one column is always read,
+    otherwise pandas would return a frame without any rows.
+    """
+    header = file_header(file_path, _read_header)
+    columns = [col for col in header if col in set(wanted)]
+    return columns or header[:1]
+
+
+def _read_header(file_path: str) -> list[str]:
+    return pd.read_csv(file_path, nrows=0).columns.tolist()
+
+
+def _estimate_rows(file_path: str) -> int | None:
+    """
+    Data rows of the file: counted if it is small, otherwise extrapolated
+    from the average line length of its first SCHEMA_SAMPLE_BYTES.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        head = f.read(SCHEMA_SAMPLE_BYTES)
+    lines = head.count(b"\n")
+    if len(head) == size:
+        return max(lines - 1 + (0 if head.endswith(b"\n") else 1), 0)
+
+    body_start = head.find(b"\n") + 1
+    body_end = head.rfind(b"\n") + 1
+    if lines < 2:
+        return None  # Not even one full row in the sample
+    return round((size - body_start) / ((body_end - body_start) / (lines - 1)))
+
+
+def _sample_schema(file_path: str, options: dict[str, Any]) -> TableSchema:
+    sample = pd.read_csv(file_path, nrows=SCHEMA_SAMPLE_ROWS, **options)
+    columns = {str(col): str(dtype) for col, dtype in sample.dtypes.items()}
+    return TableSchema(columns, _estimate_rows(file_path))
+
+
+def _read_schema(file_path: str) -> TableSchema:
+    return _sample_schema(file_path, {})
+
+
+def _read_arrow_schema(file_path: str) -> TableSchema:
+    return _sample_schema(file_path, {"dtype_backend": "pyarrow"})
+
+
+def schema_load_csv(
+    data: InputNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
+    """
+    Inspects an inputNode to get its output schema: the dtypes of the first
+    rows and an estimate of the row count. Read once per file version.
     """
     file_path = data.filePath
-    if file_path:
-        try:
-            df_header = pd.read_csv(file_path, nrows=0)
-            return df_header.columns.tolist()
-        except Exception:
-            return []
-    return []
+    if not file_path:
+        return None
+    arrow = getattr(data, "arrow", False) and arrow_available()
+    try:
+        return file_header(file_path, _read_arrow_schema if arrow else _read_schema)
+    except Exception:
+        return None
@@ -1,13 +1,16 @@
 import pandas as pd
 from app.classes import DisplayNodeData
+from app.schema_types import Schema, TableSchema, table_input
 
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "display",
     "function": "process_display_node",
-    "inspection_function": "inspect_pass_through",
+    "schema_function": "schema_pass_through",
     "inDegree": "1",
+    "rowWise": True,  # Runs chunk by chunk on streamed input
+    "sink": True,
 }
 # -----------------------
 
@@ -25,11 +28,8 @@ def process_display_node(
     return inputs[0]
 
 
-def inspect_pass_through(data: DisplayNodeData, inputs: list[list[str]]) -> list[str]:
-    """
-    A generic inspection function for nodes that don't change the schema.
-    It simply passes the schema from its first parent through.
-    """
-    if inputs:
-        return inputs[0]  # Pass the column list from the first parent
-    return []
+def schema_pass_through(
+    data: DisplayNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
+    """The schema of the first parent, displayed as is."""
+    return table_input(inputs)
@@ -1,22 +1,24 @@
 import pandas as pd
-from app.classes import FilterNodeData
+from app.classes import FilterNodeData, FusedFilterNodeData
+from app.schema_types import Schema, TableSchema, table_input
 
 node_info = {
     "nodeType": "filterRows",
     "function": "process_filter_rows",
-    "inspection_function": "inspect_pass_through",
+    "schema_function": "schema_filter_rows",
     "inDegree": "1",
+    "rowWise": True,  # Runs chunk by chunk on streamed input
+    "rowFilter": True,  # Idempotent, can be pushed into the source read
+    "projection_function": "project_filter_rows",
 }
 
+# A missing column, a value of the wrong type or a query pandas cannot parse:
+# the filter is left out and its input passes through
+_FILTER_ERRORS = (LookupError, NameError, SyntaxError, TypeError, ValueError)
 
-def process_filter_rows(
-    data: FilterNodeData, inputs: list[pd.DataFrame]
-) -> pd.DataFrame:
-    if not inputs:
-        return pd.DataFrame()
-
-    df = inputs[0].copy()
 
+def _condition(df: pd.DataFrame, data: FilterNodeData) -> str | None:
+    """The query string of one filter, None if its parameters are not set."""
     # Get parameters from the frontend
     column = getattr(data, "column", None)
     operator = getattr(data, "operator", "==")
@@ -24,28 +26,70 @@ def process_filter_rows(
 
     if not column or value is None:
         print("  -> Error: Filter parameters (column, value) not set.")
-        return df
+        return None
 
     print(f"  -> Filtering rows: {column} {operator} {value}")
 
-    try:
-        if pd.api.types.is_numeric_dtype(df[column]):
-            numeric_value = pd.to_numeric(value)
-            query_str = f"`{column}` {operator} {numeric_value}"
-        else:
-            query_str = f"`{column}` {operator} '{value}'"
+    if pd.api.types.is_numeric_dtype(df[column]):
+        numeric_value = pd.to_numeric(value)
+        return f"`{column}` {operator} {numeric_value}"
+    return f"`{column}` {operator} '{value}'"
+
+
+def process_filter_rows(
+    data: FilterNodeData | FusedFilterNodeData, inputs: list[pd.DataFrame]
+) -> pd.DataFrame:
+    if not inputs:
+        return pd.DataFrame()
+
+    # query() builds a new frame, the input is never modified
+    df = inputs[0]
 
+    if isinstance(data, FusedFilterNodeData):
+        return _filter_fused(df, data)
+
+    try:
+        query_str = _condition(df, data)
+        if query_str is None:
+            return df
         return df.query(query_str)
-    except Exception as e:
+    except _FILTER_ERRORS as e:
         print(f"  -> Error during filtering: {e}")
         return df
 
 
-def inspect_pass_through(data: FilterNodeData, inputs: list[list[str]]) -> list[str]:
+def _filter_fused(df: pd.DataFrame, data: FusedFilterNodeData) -> pd.DataFrame:
+    """
+    Several filters merged by the optimizer: one boolean mask and a single
+    new frame. A condition that cannot be evaluated is left out, just like
+    the filter node on its own would pass its input through.
+    """
+    mask = pd.Series(True, index=df.index)
+    for condition in data.conditions:
+        try:
+            query_str = _condition(df, condition)
+            if query_str is not None:
+                mask &= df.eval(query_str)
+        except _FILTER_ERRORS as e:
+            print(f"  -> Error during filtering: {e}")
+    return df[mask]
+
+
+def project_filter_rows(
+    data: FilterNodeData | FusedFilterNodeData, needed: set[str] | None
+) -> set[str] | None:
+    """Input columns needed: the ones asked for plus the filtered column(s)."""
+    if needed is None:
+        return None
+    conditions = data.conditions if isinstance(data, FusedFilterNodeData) else [data]
+    return needed | {condition.column for condition in conditions}
+
+
+def schema_filter_rows(
+    data: FilterNodeData | FusedFilterNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
     """
-    A generic inspection function for nodes that don't change the schema.
-    It simply passes the schema from its first parent through.
+    Same columns as the input. The row estimate stays the input's, an upper
+    bound: how many rows pass is only known once they are read.
     """
-    if inputs:
-        return inputs[0]  # Pass the column list from the first parent
-    return []
+    return table_input(inputs)
@@ -1,24 +1,35 @@
+from functools import partial
+
 import pandas as pd
 from app.classes import HandleMissingNodeData
+from app.dataframes import float_dtype_like, is_owned, writable
+from app.schema_types import Schema, TableSchema, table_input
+from app.streaming import ChunkedFrame, exact_medians, most_frequent, running_moments
 from sklearn.impute import SimpleImputer
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "handleMissingVal",
     "function": "process_handle_missing",
-    "inspection_function": "inspect_pass_through",
+    "schema_function": "schema_handle_missing",
     "inDegree": "1",
+    "ownership": True,
+    "streaming_function": "stream_handle_missing",
+    "projection_function": "project_handle_missing",
 }
 # -----------------------
 
 
 def process_handle_missing(
-    data: HandleMissingNodeData, inputs: list[pd.DataFrame]
+    data: HandleMissingNodeData,
+    inputs: list[pd.DataFrame],
+    owned: list[bool] | None = None,
 ) -> pd.DataFrame:
     if not inputs:
         return pd.DataFrame()
 
-    df = inputs[0].copy()
+    # Modify the input in place if nobody else reads it, else a CoW copy
+    df = writable(inputs[0], is_owned(owned))
     strategy = getattr(data, "strategy", "mean")
 
     print(f"  -> Handling missing values with strategy: {strategy}")
@@ -28,18 +39,74 @@ def process_handle_missing(
     # Select only numeric columns to impute
     numeric_cols = df.select_dtypes(include=["number"]).columns
     if not numeric_cols.empty:
-        df[numeric_cols] = imputer.fit_transform(df[numeric_cols])
+        # Arrow-backed columns come back as Arrow doubles, not numpy floats
+        dtypes = {
+            col: float_dtype_like(dtype)
+            for col, dtype in df[numeric_cols].dtypes.items()
+        }
+        df[numeric_cols] = imputer.fit_transform(df[numeric_cols].astype("float64"))
+        df = df.astype(dtypes)
 
     return df
 
 
-def inspect_pass_through(
-    data: HandleMissingNodeData, inputs: list[list[str]]
-) -> list[str]:
+def _fill(chunk: pd.DataFrame, fill_values: pd.Series) -> pd.DataFrame:
+    columns = [col for col in fill_values.index if col in chunk.columns]
+    # SimpleImputer returns floats, keep every chunk consistent with it
+    dtypes = {
+        col: float_dtype_like(dtype) for col, dtype in chunk[columns].dtypes.items()
+    }
+    chunk[columns] = chunk[columns].astype("float64").fillna(fill_values[columns])
+    return chunk.astype(dtypes)
+
+
+def stream_handle_missing(
+    data: HandleMissingNodeData, inputs: list[ChunkedFrame]
+) -> ChunkedFrame:
     """
-    A generic inspection function for nodes that don't change the schema.
-    It simply passes the schema from its first parent through.
+    Streamed version: the fill value of every numeric column is computed
+    over all chunks first (mean in one pass, exact median in a few), then
+    the gaps are filled chunk by chunk.
     """
-    if inputs:
-        return inputs[0]  # Pass the column list from the first parent
-    return []
+    strategy = getattr(data, "strategy", "mean")
+    print(f"  -> Handling missing values of streamed data with strategy: {strategy}")
+
+    moments = running_moments(inputs[0])
+    if strategy == "mean":
+        fill_values = moments.column_mean()
+    elif strategy == "median":
+        fill_values = exact_medians(inputs[0], moments)
+    elif strategy == "most_frequent":
+        fill_values = most_frequent(inputs[0], list(moments.count.index))
+    else:
+        fill_values = pd.Series(0.0, index=moments.count.index)  # SimpleImputer
+
+    return inputs[0].map(partial(_fill, fill_values=fill_values))
+
+
+def project_handle_missing(
+    data: HandleMissingNodeData, needed: set[str] | None
+) -> set[str] | None:
+    """Every column is imputed on its own, so it only needs itself."""
+    return needed
+
+
+def _imputed_dtype(dtype: str) -> str:
+    try:
+        parsed = pd.api.types.pandas_dtype(dtype)
+    except TypeError:
+        return dtype  # "unknown"
+    if pd.api.types.is_numeric_dtype(parsed) and not pd.api.types.is_bool_dtype(parsed):
+        return float_dtype_like(parsed)
+    return dtype
+
+
+def schema_handle_missing(
+    data: HandleMissingNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
+    """Same columns and rows, the imputed (numeric) columns become floats."""
+    table = table_input(inputs)
+    if table is None:
+        return None
+    columns = {col: _imputed_dtype(dtype) for col, dtype in table.columns.items()}
+    return TableSchema(columns, table.rows)
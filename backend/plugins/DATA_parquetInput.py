@@ -0,0 +1,172 @@
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import ipc
+
+from app.cache import file_header
+from app.classes import InputNodeData, PreviewOptions
+from app.schema_types import Schema, TableSchema
+from app.streaming import CSV_CHUNK_ROWS, preview_rows
+
+# --- Plugin Metadata ---
+node_info = {
+    "nodeType": "parquetInput",
+    "function": "process_parquet_input",
+    "schema_function": "schema_load_parquet",
+    "inDegree": "0",
+    "pushdown": True,  # Accepts usecols / row_filters from the read planner
+    "preview": True,  # Reads a head / sample of the rows in preview runs
+}
+# -----------------------
+
+# Arrow IPC files, everything else is read as Parquet
+FEATHER_SUFFIXES = {".feather", ".arrow", ".ipc"}
+
+
+def _is_feather(file_path: str) -> bool:
+    return Path(file_path).suffix.lower() in FEATHER_SUFFIXES
+
+
+def process_parquet_input(
+    data: InputNodeData,
+    inputs: list[Any],
+    usecols: list[str] | None = None,
+    row_filters: list[Callable[[pd.DataFrame], pd.DataFrame]] | None = None,
+    preview: PreviewOptions | None = None,
+) -> pd.DataFrame:
+    """
+    Loads a Parquet or Feather (Arrow IPC) file. Both are columnar, so the
+    columns the read planner leaves out are never decoded. With `arrow` set
+    the frame keeps pyarrow dtypes, which the DATA_ nodes pass on as is.
+    A preview run reads record batch by record batch, up to the rows it needs.
+    """
+    print(f"  -> Loading data from: {data.filePath}")
+
+    if len(inputs) != 0:
+        print("  -> Error: InputNode should not have any input.")
+        return pd.DataFrame()
+
+    try:
+        if data.filePath == "":
+            raise FileNotFoundError
+        if usecols is not None:
+            usecols = _existing_columns(data.filePath, usecols)
+            print(f"  -> Reading only columns: {usecols}")
+        arrow = getattr(data, "arrow", False)
+        options = {"dtype_backend": "pyarrow"} if arrow else {}
+
+        if preview is not None:
+            print(f"  -> Preview: {preview.sample} of {preview.rows} rows.")
+            batch_rows = preview.rows if preview.sample == "head" else CSV_CHUNK_ROWS
+            frames = _batches(data.filePath, usecols, arrow, max(batch_rows, 1))
+            filtered = (_filter(df, row_filters) for df in frames)
+            return preview_rows(filtered, preview.rows, preview.sample)
+
+        if _is_feather(data.filePath):
+            df = pd.read_feather(data.filePath, columns=usecols, **options)
+        else:
+            df = pd.read_parquet(data.filePath, columns=usecols, **options)
+
+        return _filter(df, row_filters)
+    except FileNotFoundError:
+        print(f"Error: File not found at {data.filePath}")
+        return pd.DataFrame()  # Return empty DataFrame on error
+
+
+def _filter(
+    df: pd.DataFrame, row_filters: list[Callable[[pd.DataFrame], pd.DataFrame]] | None
+) -> pd.DataFrame:
+    for step in row_filters or ():
+        df = step(df)
+    return df
+
+
+def _batches(
+    file_path: str, usecols: list[str] | None, arrow: bool, batch_rows: int
+) -> Iterator[pd.DataFrame]:
+    """The file as frames of one record batch each, read lazily."""
+    types_mapper = pd.ArrowDtype if arrow else None
+    if _is_feather(file_path):
+        reader = ipc.open_file(file_path)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if usecols is not None:
+                batch = batch.select(usecols)
+            yield batch.to_pandas(types_mapper=types_mapper)
+    else:
+        batches = pq.ParquetFile(file_path).iter_batches(
+            batch_size=batch_rows, columns=usecols
+        )
+        for batch in batches:
+            yield batch.to_pandas(types_mapper=types_mapper)
+
+
+def _schema_columns(file_path: str) -> list[str]:
+    """Column names from the file footer / header, once per file version."""
+    return file_header(file_path, _read_schema_columns)
+
+
+def _read_schema_columns(file_path: str) -> list[str]:
+    """Column names from the file footer / header, without reading any data."""
+    if _is_feather(file_path):
+        names = ipc.open_file(file_path).schema.names
+    else:
+        names = pq.read_schema(file_path).names
+    # A stored pandas index is not a column of the loaded frame
+    return [name for name in names if not name.startswith("__index_level_")]
+
+
+def _existing_columns(file_path: str, wanted: list[str]) -> list[str]:
+    """
+    The wanted columns in file order. At least one column is always read,
+    otherwise the frame would have no rows.
+    """
+    header = _schema_columns(file_path)
+    columns = [col for col in header if col in set(wanted)]
+    return columns or header[:1]
+
+
+def _file_schema(file_path: str, types_mapper: Any) -> TableSchema:
+    """dtypes and the exact row count, from the file's metadata only."""
+    if _is_feather(file_path):
+        reader = ipc.open_file(pa.memory_map(file_path))
+        schema = reader.schema
+        rows = sum(
+            reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+        )
+    else:
+        parquet = pq.ParquetFile(file_path)
+        schema, rows = parquet.schema_arrow, parquet.metadata.num_rows
+    empty = schema.empty_table().to_pandas(types_mapper=types_mapper)
+    return TableSchema(
+        {str(col): str(dtype) for col, dtype in empty.dtypes.items()}, rows
+    )
+
+
+def _read_schema(file_path: str) -> TableSchema:
+    return _file_schema(file_path, None)
+
+
+def _read_arrow_schema(file_path: str) -> TableSchema:
+    return _file_schema(file_path, pd.ArrowDtype)
+
+
+def schema_load_parquet(
+    data: InputNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
+    """
+    Inspects a parquetInput node to get its output schema (dtypes and row
+    count). Only the file's metadata is read, once per file version.
+    """
+    file_path = data.filePath
+    if not file_path:
+        return None
+    reader = _read_arrow_schema if getattr(data, "arrow", False) else _read_schema
+    try:
+        return file_header(file_path, reader)
+    except (OSError, ValueError):  # Missing file, not parquet (ArrowInvalid)
+        return None
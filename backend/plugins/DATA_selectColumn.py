@@ -1,11 +1,14 @@
 import pandas as pd
 from app.classes import SelectColumnNodeData  # We will add this in the next step
+from app.schema_types import Schema, TableSchema, table_input
 
 node_info = {
     "nodeType": "selectColumn",
     "function": "process_select_column",
-    "inspection_function": "inspect_select_column",
+    "schema_function": "schema_select_column",
     "inDegree": 1,
+    "rowWise": True,  # Runs chunk by chunk on streamed input
+    "projection_function": "project_select_column",
 }
 
 
@@ -18,7 +21,8 @@ def process_select_column(
     if not inputs:
         return pd.DataFrame()
 
-    df = inputs[0].copy()
+    # Selecting columns builds a new frame, the input is never modified
+    df = inputs[0]
 
     # data.columns is the comma-separated string from the frontend, e.g., "name,age"
     columns_to_select = [col.strip() for col in data.columns.split(",") if col.strip()]
@@ -34,17 +38,30 @@ def process_select_column(
     return df[existing_columns]
 
 
-def inspect_select_column(
-    data: SelectColumnNodeData, inputs: list[list[str]]
-) -> list[str]:
+def project_select_column(
+    data: SelectColumnNodeData, needed: set[str] | None
+) -> set[str] | None:
+    """Input columns needed: the selected ones (that are asked for)."""
+    selected = {col.strip() for col in data.columns.split(",") if col.strip()}
+    return selected if needed is None else selected & needed
+
+
+def schema_select_column(
+    data: SelectColumnNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
     """
     Inspects the selected columns and returns the new, filtered schema.
     """
     # The columns selected by the user in the UI
     columns_to_select = {col.strip() for col in data.columns.split(",") if col.strip()}
 
-    # The columns coming from the parent node
-    input_columns = inputs[0] if inputs else []
+    # The schema coming from the parent node
+    table = table_input(inputs)
+    if table is None:
+        return None
 
-    # Return only the selected columns that actually exist in the input
-    return [col for col in input_columns if col in columns_to_select]
+    # Keep only the selected columns that actually exist in the input
+    columns = {
+        col: dtype for col, dtype in table.columns.items() if col in columns_to_select
+    }
+    return TableSchema(columns, table.rows)
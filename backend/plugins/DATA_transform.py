@@ -1,19 +1,29 @@
+from functools import partial
+
 import pandas as pd
 from app.classes import TransformNodeData
+from app.dataframes import is_owned, writable
+from app.schema_types import Schema, SchemaError, TableSchema, table_input
+from app.streaming import ChunkedFrame, running_moments
 
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "transform",
     "function": "process_transform_node",
-    "inspection_function": "inspect_pass_through",
+    "schema_function": "schema_transform_node",
     "inDegree": "1",
+    "ownership": True,
+    "streaming_function": "stream_transform_node",
+    "projection_function": "project_transform_node",
 }
 # -----------------------
 
 
 def process_transform_node(
-    data: TransformNodeData, inputs: list[pd.DataFrame]
+    data: TransformNodeData,
+    inputs: list[pd.DataFrame],
+    owned: list[bool] | None = None,
 ) -> pd.DataFrame:
     """Applies a transformation to the input DataFrame."""
 
@@ -23,7 +33,8 @@ def process_transform_node(
         print("  -> Error: TransformNode has no input.")
         return pd.DataFrame()
 
-    df = inputs[0].copy()  # Work on a copy to avoid side effects
+    # Modify the input in place if nobody else reads it, else a CoW copy
+    df = writable(inputs[0], is_owned(owned))
     method = data.method
 
     print(f"  -> Transforming data using method: {method}")
@@ -41,11 +52,55 @@ def process_transform_node(
     return df
 
 
-def inspect_pass_through(data: TransformNodeData, inputs: list[list[str]]) -> list[str]:
+def _rescale(
+    chunk: pd.DataFrame, column: str, offset: float, scale: float
+) -> pd.DataFrame:
+    chunk[column] = (chunk[column] - offset) / scale
+    return chunk
+
+
+def stream_transform_node(
+    data: TransformNodeData, inputs: list[ChunkedFrame]
+) -> ChunkedFrame:
     """
-    A generic inspection function for nodes that don't change the schema.
-    It simply passes the schema from its first parent through.
+    Streamed version: one pass collects the statistics of "value", the
+    rescaling itself then runs chunk by chunk.
     """
-    if inputs:
-        return inputs[0]  # Pass the column list from the first parent
-    return []
+    method = data.method
+    print(f"  -> Transforming streamed data using method: {method}")
+
+    if method not in ("normalize", "standardize"):
+        return inputs[0]
+
+    moments = running_moments(inputs[0])
+    if method == "normalize":
+        offset = moments.min["value"]
+        scale = moments.max["value"] - moments.min["value"]
+    else:
+        offset = moments.mean["value"]
+        scale = moments.std()["value"]
+
+    return inputs[0].map(partial(_rescale, column="value", offset=offset, scale=scale))
+
+
+def project_transform_node(
+    data: TransformNodeData, needed: set[str] | None
+) -> set[str] | None:
+    """Input columns needed: the ones asked for plus "value"."""
+    if needed is None:
+        return None
+    return needed | {"value"}
+
+
+def schema_transform_node(
+    data: TransformNodeData, inputs: list[Schema | None]
+) -> TableSchema | None:
+    """Same columns and rows, "value" is rescaled (and has to exist)."""
+    table = table_input(inputs)
+    if table is None or data.method not in ("normalize", "standardize"):
+        return table
+    if "value" not in table.columns:
+        raise SchemaError(f'{data.method} needs a "value" column.')
+    arrow = table.columns["value"].endswith("[pyarrow]")
+    value = "double[pyarrow]" if arrow else "float64"
+    return TableSchema({**table.columns, "value": value}, table.rows)
@@ -1,12 +1,15 @@
 import cv2 as cv
 from typing import Any
 from app.classes import BlurImageNodeData
+from app.schema_types import ImageSchema, Schema, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "blurImage",
     "function": "blur_image_node",
     "inDegree": "1",
+    "perImage": True,  # Runs image by image on a batch
+    "schema_function": "schema_blur_image",
 }
 # -----------------------
 
@@ -34,3 +37,10 @@ def blur_image_node(data: BlurImageNodeData, inputs: list[Any]) -> cv.typing.Mat
         return cv.bilateralFilter(image_in, ksize, 75, 75)
     else:
         raise ValueError
+
+
+def schema_blur_image(
+    data: BlurImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """Blurring keeps the size, channels and dtype."""
+    return image_input(inputs)
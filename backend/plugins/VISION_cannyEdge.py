@@ -1,12 +1,16 @@
 import cv2 as cv
 from typing import Any
+from dataclasses import replace
 from app.classes import CannyEdgeNodeData
+from app.schema_types import ImageSchema, Schema, SchemaError, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "cannyEdge",
     "function": "canny_edge_node",
     "inDegree": "1",
+    "perImage": True,  # Runs image by image on a batch
+    "schema_function": "schema_canny_edge",
 }
 # -----------------------
 
@@ -31,3 +35,15 @@ def canny_edge_node(data: CannyEdgeNodeData, inputs: list[Any]) -> cv.typing.Mat
     print(f"  -> Applying Canny edge detection with thresholds: {t1}, {t2}")
 
     return cv.Canny(image_in, t1, t2)
+
+
+def schema_canny_edge(
+    data: CannyEdgeNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """An edge map: the input's size, one uint8 channel."""
+    image = image_input(inputs)
+    if image is None:
+        return ImageSchema(channels=1)
+    if image.dtype != "uint8":
+        raise SchemaError(f"Canny needs an 8-bit image, gets {image.dtype}.")
+    return replace(image, channels=1)
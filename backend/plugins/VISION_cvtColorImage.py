@@ -1,12 +1,16 @@
 import cv2 as cv
 from typing import Any
+from dataclasses import replace
 from app.classes import CvtColorImageNodeData
+from app.schema_types import ImageSchema, Schema, SchemaError, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "cvtColorImage",
     "function": "cvt_color_image_node",
     "inDegree": "1",
+    "perImage": True,  # Runs image by image on a batch
+    "schema_function": "schema_cvt_color",
 }
 # -----------------------
 
@@ -32,3 +36,28 @@ def cvt_color_image_node(
     converted_img = cv.cvtColor(image_in, conversionCode)
 
     return converted_img
+
+
+def _channels(colorspace: str) -> int:
+    return 1 if colorspace == "GRAY" else 3
+
+
+def schema_cvt_color(
+    data: CvtColorImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """
+    The input has to have the channels of in_colorspace (1 for GRAY, else
+    3), the output has those of out_colorspace.
+    """
+    if getattr(cv, f"COLOR_{data.in_colorspace}2{data.out_colorspace}", None) is None:
+        raise SchemaError(
+            f"Invalid color space conversion: {data.in_colorspace} to {data.out_colorspace}"
+        )
+    image = image_input(inputs) or ImageSchema()
+    expected = _channels(data.in_colorspace)
+    if image.channels is not None and image.channels != expected:
+        raise SchemaError(
+            f"{data.in_colorspace} input needs {expected} channel(s), "
+            f"the image has {image.channels}."
+        )
+    return replace(image, channels=_channels(data.out_colorspace))
@@ -1,22 +1,27 @@
-import base64
 import numpy as np
-import cv2 as cv
+from app.batch import ImageBatch
 from app.classes import DisplayImageNodeData
+from app.schema_types import ImageSchema, Schema, SchemaError, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "displayImage",
     "function": "display_image_node",
     "inDegree": 1,
+    "sink": True,
+    "streaming_function": "display_image_batch",
+    "schema_function": "schema_display_image",
 }
 # -----------------------
 
 
 def display_image_node(
     data: DisplayImageNodeData, inputs: list[np.ndarray]
-) -> str | None:
+) -> np.ndarray | None:
     """
-    Receives an image from parent results and returns a base64 data URL (PNG)
+    Receives an image from parent results and passes it on as is. The engine
+    keeps it server-side, it is encoded (format, quality, thumbnail size) only
+    when the client fetches it from /results/{run_id}/{node_id}/image.
     """
     if not inputs or inputs[0] is None:
         print("Display Image node received invalid or no input")
@@ -24,31 +29,31 @@ def display_image_node(
 
     in_image = inputs[0]
 
-    try:
-        # Image Dimensionality Check
-        if in_image.ndim == 2:
-            # Grayscale image
-            out_img = cv.cvtColor(in_image, cv.COLOR_GRAY2BGR)
-        elif in_image.ndim == 3 and in_image.shape[2] == 4:
-            # RGBA image
-            out_img = cv.cvtColor(in_image, cv.COLOR_BGRA2BGR)
-        else:
-            out_img = in_image
-
-        # IMAGE ENCODE
-        status, buffer = cv.imencode(".png", out_img)
-        if not status:
-            print("Failed to encode image in Display Image node.")
-            return None
-
-        base64_enc_str = base64.b64encode(buffer.tobytes()).decode("ascii")
-        d_url = f"data:image/png;base64,{base64_enc_str}"
-        # with open("temp.txt",'w') as file:
-        #     file.write(d_url)
-        return d_url
-
-    except Exception as e:
+    # Image Dimensionality Check
+    if in_image.ndim not in (2, 3) or (
+        in_image.ndim == 3 and in_image.shape[2] not in (1, 3, 4)
+    ):
         print(
-            f"Error in display_image_node ({getattr(data, 'label', 'Display Image')}): {e}"
+            f"Error in display_image_node ({getattr(data, 'label', 'Display Image')}): "
+            f"unsupported image shape {in_image.shape}"
         )
         return None
+    return in_image
+
+
+def display_image_batch(
+    data: DisplayImageNodeData, inputs: list[ImageBatch]
+) -> np.ndarray | None:
+    """Batch version: shows the first image of the batch as a preview."""
+    print(f"  -> Previewing the first image of {inputs[0].source}")
+    return display_image_node(data, [inputs[0].first()])
+
+
+def schema_display_image(
+    data: DisplayImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """Shown as is, grayscale, BGR or BGRA."""
+    image = image_input(inputs)
+    if image is not None and image.channels not in (None, 1, 3, 4):
+        raise SchemaError(f"Cannot display an image with {image.channels} channels.")
+    return image
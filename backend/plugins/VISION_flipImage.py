@@ -1,6 +1,8 @@
 import cv2 as cv
+import numpy as np
 from typing import Any
 from app.classes import FlipImageNodeData
+from app.schema_types import ImageSchema, Schema, image_input
 
 
 # --- Plugin Metadata ---
@@ -8,6 +10,9 @@ node_info = {
     "nodeType": "flipImage",
     "function": "flip_image_node",
     "inDegree": "1",
+    "perImage": True,  # Runs image by image on a batch
+    "affine_function": "flip_affine",
+    "schema_function": "schema_flip_image",
 }
 # -----------------------
 
@@ -30,3 +35,24 @@ def flip_image_node(data: FlipImageNodeData, inputs: list[Any]) -> cv.typing.Mat
 
     flipped_img = cv.flip(image_in, flip_code)
     return flipped_img
+
+
+def flip_affine(
+    data: FlipImageNodeData, size: tuple[int, int]
+) -> tuple[np.ndarray, tuple[int, int], bool]:
+    """The flip as a 2x3 matrix (see app/affine.py), pixel for pixel like cv.flip."""
+    width, height = size
+    sx = -1 if data.horizontal else 1
+    sy = -1 if data.vertical else 1
+    matrix = np.array(
+        [[sx, 0, width - 1 if sx < 0 else 0], [0, sy, height - 1 if sy < 0 else 0]],
+        dtype=np.float64,
+    )
+    return matrix, size, False
+
+
+def schema_flip_image(
+    data: FlipImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """Mirroring keeps the size, channels and dtype."""
+    return image_input(inputs)
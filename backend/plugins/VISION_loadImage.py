@@ -1,34 +1,61 @@
-import cv2 as cv
-from app.classes import LoadImageNodeData
+from app.batch import ImageBatch, is_batch_source
+from app.classes import LoadImageNodeData, PreviewOptions
+from app.images import DECODE_CACHE, image_size
+from app.schema_types import ImageSchema, Schema
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "loadImage",
     "function": "image_input_node",
-    # "inspection_function": "inspect_load_csv",
+    "schema_function": "schema_load_image",
     "inDegree": "0",
+    "preview": True,  # Loads downscaled images in preview runs
 }
 # -----------------------
 
 
-def image_input_node(data: LoadImageNodeData, *args):
-    """Loads an image from a file specified in the node's data."""
+def image_input_node(
+    data: LoadImageNodeData, *args, preview: PreviewOptions | None = None
+):
+    """
+    Loads an image from a file specified in the node's data. A directory or
+    a glob pattern (e.g. photos/*.jpg) gives a lazy batch instead, which the
+    following per-image nodes are mapped over.
+    In a preview run images are scaled down to fit preview.maxDim, JPEGs
+    are decoded at reduced resolution directly.
+    """
+    max_dim = preview.maxDim if preview is not None else 0
     if not data.filePath:
         # Raise an error if the path is empty
         raise ValueError("File path is missing in the Image Input node.")
 
+    if is_batch_source(data.filePath):
+        batch = ImageBatch(data.filePath, max_dim=max_dim)
+        if not batch.paths():
+            raise ValueError(f"No images found for: {data.filePath}")
+        print(f"  -> Batch of images from: {data.filePath}")
+        return batch
+
     print(f"  -> Loading image from: {data.filePath}")
 
     try:
-        if data.filePath == "":
-            raise FileNotFoundError
-        else:
-            img = cv.imread(data.filePath)
-        if img is None:
-            raise IOError(
-                f"Failed to load image. Check that the file exists and is a valid image: {data.filePath}"
-            )
-        return img
+        # Decoded once per file version, shared read-only by every run
+        return DECODE_CACHE.read(data.filePath, max_dim=max_dim)
     except FileNotFoundError:
         print(f"Error: File not found at {data.filePath}")
         return None
+
+
+def schema_load_image(
+    data: LoadImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """
+    Images are decoded as 3 channel uint8 (BGR). The size of a single image
+    comes from its file header, the images of a batch are only counted.
+    """
+    if not data.filePath:
+        return None
+    if is_batch_source(data.filePath):
+        return ImageSchema(channels=3, images=len(ImageBatch(data.filePath).paths()))
+    width, height = image_size(data.filePath) or (None, None)
+    return ImageSchema(width, height, channels=3)
@@ -1,26 +1,23 @@
 import cv2 as cv
+import numpy as np
 from typing import Any
+from dataclasses import replace
 from app.classes import ResizeImageNodeData
+from app.schema_types import ImageSchema, Schema, SchemaError, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "resizeImage",
     "function": "image_resize_node",
-    # "inspection_function": "inspect_load_csv",
+    "schema_function": "schema_resize_image",
     "inDegree": "1",
+    "perImage": True,  # Runs image by image on a batch
+    "affine_function": "resize_affine",
 }
 # -----------------------
 
 
-def image_resize_node(
-    data: ResizeImageNodeData, inputs: list[Any]
-) -> cv.typing.MatLike:
-    """Resizes an input image to the specified width and height."""
-    if not inputs or inputs[0] is None:
-        raise ValueError("Input image is missing for Resize Image node.")
-
-    image_in = inputs[0]
-
+def _check_size(data: ResizeImageNodeData) -> None:
     if not isinstance(data.width, int) or data.width <= 0:
         raise ValueError(
             f"Invalid width specified: {data.width}. Must be a positive integer."
@@ -31,8 +28,47 @@ def image_resize_node(
             f"Invalid height specified: {data.height}. Must be a positive integer."
         )
 
+
+def image_resize_node(
+    data: ResizeImageNodeData, inputs: list[Any]
+) -> cv.typing.MatLike:
+    """Resizes an input image to the specified width and height."""
+    if not inputs or inputs[0] is None:
+        raise ValueError("Input image is missing for Resize Image node.")
+
+    image_in = inputs[0]
+    _check_size(data)
+
     print(f"Resizing from {image_in.shape[:2]} -> ({data.height}, {data.width})")
 
     rz_img = cv.resize(image_in, (data.width, data.height))
 
     return rz_img
+
+
+def resize_affine(
+    data: ResizeImageNodeData, size: tuple[int, int]
+) -> tuple[np.ndarray, tuple[int, int], bool]:
+    """
+    The resize as a 2x3 matrix (see app/affine.py). Pixel centres are mapped
+    onto each other like cv.resize does: x_out = (x_in + 0.5) * scale - 0.5.
+    """
+    _check_size(data)
+    width, height = size
+    sx, sy = data.width / width, data.height / height
+    matrix = np.array(
+        [[sx, 0, 0.5 * sx - 0.5], [0, sy, 0.5 * sy - 0.5]], dtype=np.float64
+    )
+    return matrix, (data.width, data.height), False
+
+
+def schema_resize_image(
+    data: ResizeImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """The configured size, the input's channels and dtype."""
+    try:
+        _check_size(data)
+    except ValueError as e:
+        raise SchemaError(str(e)) from None
+    image = image_input(inputs) or ImageSchema()
+    return replace(image, width=data.width, height=data.height)
@@ -1,12 +1,17 @@
 import cv2 as cv
+import numpy as np
 from typing import Any
 from app.classes import RotateImageNodeData
+from app.schema_types import ImageSchema, Schema, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "rotateImage",
     "function": "rotate_image_node",
     "inDegree": "1",
+    "perImage": True,  # Runs image by image on a batch
+    "affine_function": "rotate_affine",
+    "schema_function": "schema_rotate_image",
 }
 # -----------------------
 
@@ -20,6 +25,23 @@ def rotate_image_node(
 
     image_in = inputs[0]
 
+    (h, w) = image_in.shape[:2]
+    M, size, _ = rotate_affine(data, (w, h))
+    print(
+        f"Rotating the image by {data.angle} degree in {data.rotationDirection} direction"
+    )
+    rotated_img = cv.warpAffine(image_in, M, size)
+
+    return rotated_img
+
+
+def rotate_affine(
+    data: RotateImageNodeData, size: tuple[int, int]
+) -> tuple[np.ndarray, tuple[int, int], bool]:
+    """
+    The rotation matrix around the image centre (see app/affine.py). The
+    output keeps the input size, the uncovered corners are filled black.
+    """
     if not isinstance(data.angle, int):
         raise ValueError(f"Invalid angle specified: {data.angle}.")
 
@@ -31,11 +53,7 @@ def rotate_image_node(
             f"Invalid rotationDirection specified: {data.rotationDirection}. Must be either Clockwise or Anticlockwise."
         )
 
-    print(
-        f"Rotating the image by {data.angle} degree in {data.rotationDirection} direction"
-    )
-
-    (h, w) = image_in.shape[:2]
+    (w, h) = size
     (cX, cY) = (w // 2, h // 2)
 
     rotationAngle = data.angle * (
@@ -43,6 +61,11 @@ def rotate_image_node(
     )
 
     M = cv.getRotationMatrix2D((cX, cY), rotationAngle, 1.0)
-    rotated_img = cv.warpAffine(image_in, M, (w, h))
+    return M, size, True
 
-    return rotated_img
+
+def schema_rotate_image(
+    data: RotateImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """The rotation keeps the input size (corners are cut), channels and dtype."""
+    return image_input(inputs)
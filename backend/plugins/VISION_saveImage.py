@@ -1,21 +1,29 @@
 from pathlib import Path
-from typing import List
+
 import cv2 as cv
+import numpy as np
+
+from app.batch import BatchReport, ImageBatch
 from app.classes import SaveImageNodeData
+from app.schema_types import ImageSchema, Schema, image_input
 
 # --- Plugin Metadata ---
 node_info = {
     "nodeType": "saveImage",
     "function": "image_save_node",
-    # "inspection_function": "inspect_load_csv",
+    "schema_function": "schema_save_image",
     "inDegree": "1",
+    "cacheable": False,  # Writes a file on every run
+    "sideEffect": True,  # Left out of preview runs
+    "sink": True,
+    "streaming_function": "save_image_batch",
 }
 # -----------------------
 
 TEMP_DIR = Path("temp_uploads")
 
 
-def image_save_node(data: SaveImageNodeData, inputs: List[cv.typing.MatLike]) -> str:
+def image_save_node(data: SaveImageNodeData, inputs: list[cv.typing.MatLike]) -> str:
     """Saving the Processed image"""
     filename = "image.png"
     save_path = TEMP_DIR / filename
@@ -26,7 +34,78 @@ def image_save_node(data: SaveImageNodeData, inputs: List[cv.typing.MatLike]) ->
 
     success = cv.imwrite(str(save_path), inputs[0])
     if not success:
-        raise IOError(f"OpenCV failed to save temporary image to {save_path}.")
+        raise OSError(f"OpenCV failed to save temporary image to {save_path}.")
 
     print("  -> Temporary image saved.")
     return filename
+
+
+def _output_dir(output_dir: str) -> Path:
+    """outputDir resolved under TEMP_DIR, paths leading outside of it are refused."""
+    base = TEMP_DIR.resolve()
+    out_dir = (base / (output_dir or "batch")).resolve()
+    if out_dir != base and base not in out_dir.parents:
+        raise ValueError(
+            f"outputDir must be a directory inside {TEMP_DIR}, got {output_dir!r}."
+        )
+    return out_dir
+
+
+def _output_names(
+    batch: ImageBatch, paths: list[str]
+) -> tuple[dict[str, Path], dict[str, str]]:
+    """
+    Output file of every input: its path below the batch directory, as .png.
+    Inputs that would overwrite an earlier one (a.jpg and a.png) get a
+    numbered name instead, returned as {path: new name}.
+    """
+    names: dict[str, Path] = {}
+    renamed: dict[str, str] = {}
+    taken: set[Path] = set()
+    for path in paths:
+        name = candidate = batch.relative_path(path).with_suffix(".png")
+        number = 1
+        while candidate in taken:
+            candidate = name.with_name(f"{name.stem}-{number}.png")
+            number += 1
+        taken.add(candidate)
+        names[path] = candidate
+        if candidate != name:
+            renamed[path] = candidate.as_posix()
+    return names, renamed
+
+
+def save_image_batch(data: SaveImageNodeData, inputs: list[ImageBatch]) -> BatchReport:
+    """
+    Batch version: every image is written on its own, at its path below the
+    batch directory, to the node's outputDir (a directory inside temp_uploads,
+    "batch" by default). The report's outputs are relative to temp_uploads,
+    as /files/download takes them.
+    """
+    base = TEMP_DIR.resolve()
+    out_dir = _output_dir(getattr(data, "outputDir", ""))
+    print(f"  -> Saving batch images to: {out_dir}")
+
+    batch = inputs[0]
+    paths = batch.paths()
+    names, renamed = _output_names(batch, paths)
+    for path, name in renamed.items():
+        print(f"  -> {path} saved as {name}, its name was taken")
+
+    def save(path: str, image: np.ndarray) -> str:
+        save_path = out_dir / names[path]
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        if not cv.imwrite(str(save_path), image):
+            raise OSError(f"OpenCV failed to save image to {save_path}.")
+        return save_path.relative_to(base).as_posix()
+
+    report = batch.run(save, paths=paths)
+    report.renamed = renamed
+    return report
+
+
+def schema_save_image(
+    data: SaveImageNodeData, inputs: list[Schema | None]
+) -> ImageSchema | None:
+    """The image that is written."""
+    return image_input(inputs)
@@ -0,0 +1,81 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import engine
+from app.classes import GraphPayload, HandleMissingNodeData, InputNodeData
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 0, "y": 0},
+        "data": {"label": node_id, **data},
+    }
+
+
+def _edge(source: str, target: str) -> dict[str, str]:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.integers(0, 10, 100), "value": rng.random(100)})
+    df.loc[::7, "value"] = np.nan
+    return df
+
+
+def _payload(source: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "nodes": [
+            source,
+            _node("f1", "filterRows", column="a", operator=">", value="2"),
+            _node("fill", "handleMissingVal", strategy="median"),
+            _node("out", "display"),
+        ],
+        "edges": [_edge("src", "f1"), _edge("f1", "fill"), _edge("fill", "out")],
+    }
+
+
+def _run(payload: dict[str, Any]) -> dict[str, Any]:
+    return engine.execute(GraphPayload.model_validate(payload), cache=None)
+
+
+def test_csv_arrow_option_gives_the_same_output(tmp_path):
+    # Without pyarrow installed the option falls back to the default reader
+    csv_path = tmp_path / "in.csv"
+    _frame().to_csv(csv_path, index=False)
+
+    plain = _run(_payload(_node("src", "csvInput", filePath=str(csv_path))))
+    arrow = _run(_payload(_node("src", "csvInput", filePath=str(csv_path), arrow=True)))
+    assert plain["status"] == arrow["status"] == "success"
+    assert arrow["output"] == plain["output"]
+
+
+def test_parquet_input_keeps_arrow_dtypes(tmp_path):
+    pytest.importorskip("pyarrow")
+    from plugins.DATA_handleMissingVal import process_handle_missing
+    from plugins.DATA_parquetInput import process_parquet_input
+
+    parquet_path = tmp_path / "in.parquet"
+    _frame().to_parquet(parquet_path)
+    data = {"label": "src", "filePath": str(parquet_path), "arrow": True}
+
+    df = process_parquet_input(InputNodeData(**data), [], usecols=["value"])
+    assert list(df.columns) == ["value"]
+    assert isinstance(df["value"].dtype, pd.ArrowDtype)
+
+    filled = process_handle_missing(
+        HandleMissingNodeData(label="fill", strategy="median"), [df]
+    )
+    assert isinstance(filled["value"].dtype, pd.ArrowDtype)
+    assert not filled["value"].isna().any()
+
+    csv_path = tmp_path / "in.csv"
+    _frame().to_csv(csv_path, index=False)
+    from_parquet = _run(_payload(_node("src", "parquetInput", **data)))
+    from_csv = _run(_payload(_node("src", "csvInput", filePath=str(csv_path))))
+    assert from_parquet["output"] == from_csv["output"]
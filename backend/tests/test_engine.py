@@ -0,0 +1,486 @@
+import gc
+import os
+import sys
+from typing import Any
+
+import cv2 as cv
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import engine
+from app.cache import LRUCache, node_cache_key
+from app.classes import GraphPayload, Node
+from app.shm import SharedResult, export_value
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 0, "y": 0},
+        "data": {"label": node_id, **data},
+    }
+
+
+def _edge(source: str, target: str) -> dict[str, str]:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def test_parallel_branches_match_sequential(tmp_path):
+    """
+    Independent branches give the same response whatever the worker count.
+    """
+    img_path = tmp_path / "in.png"
+    cv.imwrite(str(img_path), np.full((32, 48, 3), 127, dtype=np.uint8))
+
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("img", "loadImage", filePath=str(img_path)),
+                _node("blur", "blurImage", blurType="GAUSSIAN", kernelSize=3),
+                _node("canny", "cannyEdge", threshold1=50, threshold2=150),
+                _node("show1", "displayImage"),
+                _node("show2", "displayImage"),
+                _node("bad", "loadImage", filePath=str(tmp_path / "missing.png")),
+                _node("flip", "flipImage", horizontal=True),
+                _node("show3", "displayImage"),
+            ],
+            "edges": [
+                _edge("img", "blur"),
+                _edge("blur", "show1"),
+                _edge("img", "canny"),
+                _edge("canny", "show2"),
+                _edge("bad", "flip"),
+                _edge("flip", "show3"),
+            ],
+        }
+    )
+
+    sequential = engine.execute(graph, max_workers=1, cache=None, run_id="run")
+    parallel = engine.execute(graph, max_workers=8, cache=None, run_id="run")
+
+    assert parallel == sequential
+    assert parallel["status"] == "partial_success"
+    assert parallel["skipped_nodes"] == ["bad", "flip", "show3"]
+    assert list(parallel["node_errors"]) == ["bad", "flip", "show3"]
+    assert set(parallel["output"]) == {"show1", "show2"}
+
+
+def test_validation_error_propagates_to_children():
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("flip", "flipImage"),
+                _node("show", "displayImage"),
+            ],
+            "edges": [_edge("flip", "show")],
+        }
+    )
+
+    resp = engine.execute(graph)
+
+    assert resp["status"] == "error"
+    assert resp["skipped_nodes"] == ["flip", "show"]
+    assert "expects 1 inputs but has 0" in resp["node_errors"]["flip"]
+    assert resp["node_errors"]["show"] == "Input from skipped parent 'flip' (flip)."
+
+
+def test_process_backend_shares_frames_between_workers(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    pd.DataFrame(
+        {"name": ["a", "b", "c", None], "value": [1.0, None, 3.0, 4.0]}
+    ).to_csv(csv_path, index=False)
+
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("csv", "csvInput", filePath=str(csv_path)),
+                _node("fill", "handleMissingVal", strategy="mean"),
+                _node("filter", "filterRows", column="value", operator=">", value="2"),
+                _node("show", "display"),
+            ],
+            "edges": [
+                _edge("csv", "fill"),
+                _edge("fill", "filter"),
+                _edge("filter", "show"),
+            ],
+        }
+    )
+
+    threaded = engine.execute(graph, backend="thread", cache=None, run_id="run")
+    multiproc = engine.execute(graph, backend="process", cache=None, run_id="run")
+
+    assert multiproc == threaded
+    assert multiproc["output"]["show"]["data"] == [
+        {"name": "b", "value": pytest.approx(8 / 3)},
+        {"name": "c", "value": 3.0},
+        {"name": None, "value": 4.0},
+    ]
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+def test_process_backend_unlinks_blocks_exported_for_workers(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    pd.DataFrame({"value": np.arange(100.0)}).to_csv(csv_path, index=False)
+
+    def graph(value: str) -> GraphPayload:
+        return GraphPayload.model_validate(
+            {
+                "nodes": [
+                    _node("csv", "csvInput", filePath=str(csv_path)),
+                    _node("fill", "handleMissingVal", strategy="mean"),
+                    _node("f", "filterRows", column="value", operator=">", value=value),
+                    _node("show", "display"),
+                ],
+                "edges": [_edge("csv", "fill"), _edge("fill", "f"), _edge("f", "show")],
+            }
+        )
+
+    blocks = set(os.listdir("/dev/shm"))
+    cache = LRUCache(64 * 1024 * 1024)
+    engine.execute(graph("10"), backend="thread", cache=cache)
+    # "fill" comes from the cache as a plain DataFrame, exported for "f"
+    resp = engine.execute(graph("20"), backend="process", cache=cache)
+    assert resp["cache"]["fill"] == "hit"
+    del cache
+    gc.collect()
+    assert set(os.listdir("/dev/shm")) - blocks == set()
+
+
+def test_shared_ref_round_trip():
+    df = pd.DataFrame(
+        {"a": np.arange(5), "b": list("vwxyz")}, index=[10, 11, 12, 13, 14]
+    )
+    img = np.random.default_rng(0).integers(0, 255, (8, 6, 3), dtype=np.uint8)
+
+    for value in (df, img, "data:image/png;base64,", None):
+        result = SharedResult(export_value(value))
+        loaded = result.load()
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(loaded, value)
+        elif isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(loaded, value)
+        else:
+            assert loaded == value
+
+
+def test_cache_only_recomputes_changed_nodes(tmp_path, save_dir):
+    img_path = tmp_path / "in.png"
+    cv.imwrite(str(img_path), np.full((16, 16, 3), 200, dtype=np.uint8))
+
+    def graph(threshold1: int) -> GraphPayload:
+        return GraphPayload.model_validate(
+            {
+                "nodes": [
+                    _node("img", "loadImage", filePath=str(img_path)),
+                    _node("blur", "blurImage", blurType="MEDIAN", kernelSize=3),
+                    _node("canny", "cannyEdge", threshold1=threshold1, threshold2=200),
+                    _node("show", "displayImage"),
+                    _node("save", "saveImage"),
+                ],
+                "edges": [
+                    _edge("img", "blur"),
+                    _edge("blur", "canny"),
+                    _edge("canny", "show"),
+                    _edge("canny", "save"),
+                ],
+            }
+        )
+
+    cache = LRUCache(64 * 1024 * 1024)
+    first = engine.execute(graph(100), cache=cache)
+    again = engine.execute(graph(100), cache=cache)
+    tweaked = engine.execute(graph(50), cache=cache)
+
+    assert set(first["cache"].values()) == {"miss", "bypass"}
+    assert again["output"] == first["output"]
+    assert again["cache"] == {
+        "img": "hit",
+        "blur": "hit",
+        "canny": "hit",
+        "show": "hit",
+        "save": "bypass",
+    }
+    assert tweaked["cache"]["blur"] == "hit"
+    assert tweaked["cache"]["canny"] == "miss"
+    assert tweaked["cache"]["show"] == "miss"
+
+
+def test_cache_key_of_a_glob_follows_the_matched_files(tmp_path):
+    def key() -> str:
+        node = Node.model_validate(
+            _node("img", "loadImage", filePath=str(tmp_path / "*.png"))
+        )
+        return node_cache_key(node, [])
+
+    pixels = np.zeros((4, 4, 3), dtype=np.uint8)
+    cv.imwrite(str(tmp_path / "a.png"), pixels)
+    one = key()
+    assert key() == one
+    cv.imwrite(str(tmp_path / "b.png"), pixels)
+    two = key()
+    assert two != one
+    cv.imwrite(str(tmp_path / "b.png"), np.zeros((8, 8, 3), dtype=np.uint8))
+    assert key() != two
+
+
+def test_pull_mode_prunes_branches_without_sinks(tmp_path):
+    img_path = tmp_path / "in.png"
+    cv.imwrite(str(img_path), np.zeros((8, 8, 3), dtype=np.uint8))
+
+    payload = {
+        "nodes": [
+            _node("img", "loadImage", filePath=str(img_path)),
+            _node("flip", "flipImage", vertical=True),
+            _node("show1", "displayImage"),
+            _node("blur", "blurImage", blurType="GAUSSIAN", kernelSize=3),
+            _node("show2", "displayImage"),
+            _node("dangling", "rotateImage", angle=90, rotationDirection="Clockwise"),
+        ],
+        "edges": [
+            _edge("img", "flip"),
+            _edge("flip", "show1"),
+            _edge("img", "blur"),
+            _edge("blur", "show2"),
+            _edge("img", "dangling"),
+        ],
+    }
+
+    full = engine.execute(GraphPayload.model_validate(payload), cache=None)
+    assert full["pruned_nodes"] == []
+
+    pruned = engine.execute(
+        GraphPayload.model_validate({**payload, "prune": True}), cache=None
+    )
+    assert pruned["pruned_nodes"] == ["dangling"]
+    assert "dangling" not in pruned["exec_order"]
+    assert pruned["skipped_nodes"] == []
+
+    one_sink = engine.execute(
+        GraphPayload.model_validate({**payload, "sinks": ["show1"]}), cache=None
+    )
+    assert one_sink["exec_order"] == ("img", "flip", "show1")
+    assert one_sink["pruned_nodes"] == ["blur", "show2", "dangling"]
+    assert one_sink["output"]["show1"] == full["output"]["show1"]
+
+
+def test_intermediate_results_are_freed_after_last_consumer(tmp_path):
+    img_path = tmp_path / "in.png"
+    cv.imwrite(str(img_path), np.zeros((8, 8, 3), dtype=np.uint8))
+
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("img", "loadImage", filePath=str(img_path)),
+                _node("flip", "flipImage", horizontal=True),
+                _node("blur", "blurImage", blurType="GAUSSIAN", kernelSize=3),
+                _node("show", "displayImage"),
+            ],
+            "edges": [
+                _edge("img", "flip"),
+                _edge("flip", "blur"),
+                _edge("blur", "show"),
+            ],
+        }
+    )
+    nmap, dep_list = engine.build_dependency_list(graph.nodes, graph.edges)
+
+    freeing = engine.GraphExecution(nmap, dep_list, {})
+    response = freeing.run()
+    assert response["status"] == "success"
+    assert freeing.completed == {"img", "flip", "blur", "show"}
+    assert set(freeing.results) == {"show"}
+
+    retaining = engine.GraphExecution(nmap, dep_list, {}, retain_results=True)
+    assert retaining.run()["output"] == response["output"]
+    assert set(retaining.results) == {"img", "flip", "blur", "show"}
+
+
+def test_plugins_own_inputs_only_when_nobody_else_reads_them(tmp_path, monkeypatch):
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame({"value": [1.0, 2.0, 4.0]}).to_csv(csv_path, index=False)
+
+    seen: dict[str, list[bool]] = {}
+    transform = engine.NODE_PROCESSING_FUNCTIONS["transform"]
+
+    def spy(data, inputs, owned=None):
+        seen[data.label] = owned
+        return transform(data, inputs, owned=owned)
+
+    monkeypatch.setitem(engine.NODE_PROCESSING_FUNCTIONS, "transform", spy)
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("csv", "csvInput", filePath=str(csv_path)),
+                _node("raw", "display"),
+                _node("t1", "transform", method="normalize"),
+                _node("t2", "transform", method="standardize"),
+                _node("out", "display"),
+            ],
+            "edges": [
+                _edge("csv", "raw"),
+                _edge("csv", "t1"),
+                _edge("t1", "t2"),
+                _edge("t2", "out"),
+            ],
+        }
+    )
+
+    response = engine.execute(graph, cache=None)
+    assert response["status"] == "success"
+    # csv is also read by "raw", t1 is only read by t2
+    assert seen == {"t1": [False], "t2": [True]}
+    assert response["output"]["raw"]["data"] == [
+        {"value": 1.0},
+        {"value": 2.0},
+        {"value": 4.0},
+    ]
+
+    # A cached result may be served again later, so it is never handed out
+    engine.execute(graph, cache=LRUCache(64 * 1024 * 1024))
+    assert seen == {"t1": [False], "t2": [False]}
+
+
+@pytest.fixture
+def save_dir(tmp_path, monkeypatch):
+    """saveImage writes below a temporary directory instead of temp_uploads."""
+    save = engine.NODE_PROCESSING_FUNCTIONS["saveImage"]
+    monkeypatch.setattr(sys.modules[save.__module__], "TEMP_DIR", tmp_path / "temp")
+    return tmp_path / "temp"
+
+
+def test_batch_maps_the_vision_graph_over_every_image(tmp_path, save_dir):
+    rng = np.random.default_rng(0)
+    images = tmp_path / "images"
+    images.mkdir()
+    for name in ("a", "b", "c"):
+        cv.imwrite(
+            str(images / f"{name}.png"),
+            rng.integers(0, 255, (24, 32, 3), dtype=np.uint8),
+        )
+    (images / "notes.txt").write_text("not an image")
+    out_dir = save_dir / "out"
+
+    def graph(file_path: str) -> GraphPayload:
+        return GraphPayload.model_validate(
+            {
+                "nodes": [
+                    _node("img", "loadImage", filePath=file_path),
+                    _node("blur", "blurImage", blurType="MEDIAN", kernelSize=3),
+                    _node("flip", "flipImage", horizontal=True),
+                    _node("save", "saveImage", outputDir="out"),
+                    _node("show", "displayImage"),
+                ],
+                "edges": [
+                    _edge("img", "blur"),
+                    _edge("blur", "flip"),
+                    _edge("flip", "save"),
+                    _edge("flip", "show"),
+                ],
+            }
+        )
+
+    for source in (str(images), str(images / "*.png")):
+        response = engine.execute(graph(source), cache=None)
+        assert response["status"] == "success"
+        report = response["batch"]["save"]
+        assert report["images"] == 3
+        assert report["failed"] == {}
+        assert report["imagesPerSec"] > 0
+        assert sorted(report["outputs"]) == [f"out/{name}.png" for name in "abc"]
+
+    # Every output is what the same graph gives for that image on its own
+    single = engine.execute(graph(str(images / "b.png")), cache=None)
+    assert single["batch"] == {}
+    expected = cv.flip(cv.medianBlur(cv.imread(str(images / "b.png")), 3), 1)
+    assert np.array_equal(cv.imread(str(out_dir / "b.png")), expected)
+    assert response["output"]["show"]["width"] == 32
+
+
+def test_batch_outputs_stay_in_temp_dir_and_never_collide(tmp_path, save_dir):
+    images = tmp_path / "images"
+    (images / "sub").mkdir(parents=True)
+    pixels = np.full((8, 8, 3), 50, dtype=np.uint8)
+    for name in ("a.jpg", "a.png", "sub/a.png"):
+        cv.imwrite(str(images / name), pixels)
+
+    def graph(output_dir: str) -> GraphPayload:
+        return GraphPayload.model_validate(
+            {
+                "nodes": [
+                    _node("img", "loadImage", filePath=str(images / "**" / "*")),
+                    _node("save", "saveImage", outputDir=output_dir),
+                ],
+                "edges": [_edge("img", "save")],
+            }
+        )
+
+    report = engine.execute(graph(""), cache=None)["batch"]["save"]
+    assert sorted(report["outputs"]) == [
+        "batch/a-1.png",
+        "batch/a.png",
+        "batch/sub/a.png",
+    ]
+    assert report["renamed"] == {str(images / "a.png"): "a-1.png"}
+    assert (save_dir / "batch" / "sub" / "a.png").is_file()
+
+    for escape in ("../elsewhere", str(tmp_path / "elsewhere")):
+        response = engine.execute(graph(escape), cache=None)
+        assert "inside" in response["node_errors"]["save"]
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def test_preview_runs_on_downscaled_images_and_sampled_rows(tmp_path, save_dir):
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame({"a": range(5000), "b": 1.5}).to_csv(csv_path, index=False)
+    img_path = tmp_path / "in.png"
+    cv.imwrite(str(img_path), np.full((300, 400, 3), 80, dtype=np.uint8))
+
+    def graph(**options: Any) -> GraphPayload:
+        return GraphPayload.model_validate(
+            {
+                "nodes": [
+                    _node("csv", "csvInput", filePath=str(csv_path)),
+                    _node("f", "filterRows", column="a", operator=">=", value="10"),
+                    _node("table", "display"),
+                    _node("img", "loadImage", filePath=str(img_path)),
+                    _node("save", "saveImage"),
+                    _node("show", "displayImage"),
+                ],
+                "edges": [
+                    _edge("csv", "f"),
+                    _edge("f", "table"),
+                    _edge("img", "save"),
+                    _edge("img", "show"),
+                ],
+                **options,
+            }
+        )
+
+    options = {"maxDim": 100, "rows": 50}
+    head = engine.execute(
+        graph(preview=True, previewOptions=options, optimize=False), cache=None
+    )
+    assert head["preview"] is True
+    assert head["output"]["table"]["rows"] == 50
+    # Filters below the source apply before the rows are taken
+    assert head["output"]["table"]["data"][0]["a"] == 10
+    assert head["output"]["show"]["width"] == 100
+    assert head["output"]["show"]["height"] == 75
+    # The sink writing files is left out of the preview
+    assert head["pruned_nodes"] == ["save"]
+
+    sample = engine.execute(
+        graph(preview=True, previewOptions={**options, "sample": "uniform"}),
+        cache=None,
+    )
+    values = [row["a"] for row in sample["output"]["table"]["data"]]
+    assert len(values) == 50 and values == sorted(values)
+    assert values[0] < 1000 and values[-1] > 4000
+
+    full = engine.execute(graph(), cache=None)
+    assert full["preview"] is False
+    assert full["output"]["table"]["rows"] == 4990
+    assert full["output"]["show"]["width"] == 400
+    assert full["pruned_nodes"] == []
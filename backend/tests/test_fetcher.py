@@ -0,0 +1,48 @@
+import httpx
+
+from app.fetcher import PluginFetcher
+
+
+def test_fetches_revalidate_cached_sources(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("missing.py"):
+            return httpx.Response(404)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="node_info = {}\n", headers={"ETag": '"v1"'})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    fetcher = PluginFetcher("https://cdn.test/repo", tmp_path / "cache", client=client)
+    plugins = tmp_path / "plugins"
+
+    failed = fetcher.fetch_many(
+        {
+            "backend/plugins/DATA_a.py": plugins / "DATA_a.py",
+            "backend/plugins/missing.py": plugins / "missing.py",
+        }
+    )
+    assert failed == ["backend/plugins/missing.py"]
+    assert (plugins / "DATA_a.py").read_text() == "node_info = {}\n"
+
+    # Fetched again: a conditional request, the body comes from the cache
+    (plugins / "DATA_a.py").unlink()
+    assert fetcher.fetch("backend/plugins/DATA_a.py", plugins / "DATA_a.py")
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+    assert (plugins / "DATA_a.py").read_text() == "node_info = {}\n"
+
+
+def test_local_mirror_is_copied_from(tmp_path):
+    mirror = tmp_path / "mirror" / "backend" / "plugins"
+    mirror.mkdir(parents=True)
+    (mirror / "DATA_b.py").write_text("x = 1\n")
+    fetcher = PluginFetcher((tmp_path / "mirror").as_uri(), tmp_path / "cache")
+
+    save_path = tmp_path / "plugins" / "DATA_b.py"
+    assert fetcher.fetch("backend/plugins/DATA_b.py", save_path)
+    assert save_path.read_text() == "x = 1\n"
+    # Written through a temporary file, like downloads, nothing else is left
+    assert [path.name for path in save_path.parent.iterdir()] == ["DATA_b.py"]
+    assert not fetcher.fetch("backend/plugins/nope.py", tmp_path / "nope.py")
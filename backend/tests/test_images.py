@@ -0,0 +1,46 @@
+import os
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from app.images import DecodeCache
+
+
+def test_decoded_images_are_cached_per_file_version(tmp_path):
+    path = str(tmp_path / "in.png")
+    cv.imwrite(path, np.full((40, 60, 3), 7, dtype=np.uint8))
+    cache = DecodeCache(64 * 1024 * 1024)
+
+    first = cache.read(path)
+    assert cache.read(path) is first
+    assert not first.flags.writeable
+    assert len(cache.entries) == 1
+
+    cv.imwrite(path, np.full((40, 60, 3), 9, dtype=np.uint8))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.read(path)[0, 0, 0] == 9
+    assert cache.read(path, cv.IMREAD_GRAYSCALE).shape == (40, 60)
+
+    with pytest.raises(IOError):
+        cache.read(str(tmp_path / "missing.png"))
+
+
+def test_previews_decode_jpegs_at_reduced_resolution(tmp_path):
+    y, x = np.mgrid[0:800, 0:1200]
+    img = np.dstack([x % 256, y % 256, (x + y) % 256]).astype(np.uint8)
+    path = str(tmp_path / "in.jpg")
+    cv.imwrite(path, img)
+    cache = DecodeCache(64 * 1024 * 1024)
+
+    preview = cache.read(path, max_dim=300)
+    assert preview.shape == (200, 300, 3)
+    # The header gives 1200 px, decoded once at 1/4 (1/8 would be too small)
+    assert len(cache.entries) == 1
+    assert cache.entries.current_bytes == 200 * 300 * 3
+
+    # Once the full image is cached, previews are scaled down from it
+    cache.read(path)
+    assert cache.read(path, max_dim=120).shape == (80, 120, 3)
+    assert len(cache.entries) == 2
@@ -0,0 +1,55 @@
+import threading
+
+from app import installs
+from app.installs import InstallQueue
+
+
+def _wait(job):
+    for _ in range(500):
+        if job.done:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("install job did not finish")
+
+
+def test_installs_are_batched_deduplicated_and_skip_installed(monkeypatch):
+    deps = {"a": ["pandas", "Scikit_Learn"], "b": ["scikit-learn", "torch"]}
+    installed = {"pandas"}
+    pip_runs = []
+    release = threading.Event()
+
+    def pip_install(packages):
+        release.wait(5)
+        pip_runs.append(packages)
+        installed.update(packages)
+
+    monkeypatch.setattr(installs, "pip_install", pip_install)
+    queue = InstallQueue(
+        dependencies=deps.__getitem__,
+        installed=lambda: set(installed),
+        finish=lambda job, node_types: {"nodeTypes": node_types},
+    )
+
+    first = queue.submit(["a", "b"])
+    assert first["a"] is first["b"]
+    # Already queued: the same job is handed out
+    again = queue.submit(["b"])
+    assert again["b"] is first["b"]
+    release.set()
+
+    job = _wait(first["a"])
+    assert job.status == "finished"
+    assert job.result == {
+        "packages": ["Scikit_Learn", "torch"],
+        "nodeTypes": ["a", "b"],
+    }
+    # Everything is installed by now: no second pip run
+    assert _wait(queue.submit(["b"])["b"]).result["packages"] == []
+    assert pip_runs == [["Scikit_Learn", "torch"]]
+
+
+def test_offline_installs_use_the_local_wheels(monkeypatch):
+    monkeypatch.setattr(installs, "WHEEL_DIR", "/wheels")
+    monkeypatch.setattr(installs, "PACKAGE_INDEX", "")
+    cmd = installs.pip_command(["pandas"])
+    assert cmd[-4:] == ["--find-links", "/wheels", "--no-index", "pandas"]
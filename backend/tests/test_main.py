@@ -1,6 +1,15 @@
+import json
+import os
 from typing import Any
+
+import numpy as np
+import pytest
 from fastapi.testclient import TestClient
+
+from app import main, sessions
 from app.main import app
+from app.results import ResultStore
+from app.schemas import SCHEMA_MEMO
 
 client = TestClient(app)
 
@@ -35,3 +44,395 @@ def test_exec_graph_success():
     assert resp_json["status"] == "success"
     assert "exec_order" in resp_json
     assert resp_json["exec_order"] == ["1", "2"]
+
+
+def test_session_patch_reruns_only_downstream(tmp_path):
+    """
+    Patching one node re-executes it and its descendants, nothing else.
+    """
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("name,value\na,1\nb,2\nc,3\n")
+
+    def node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+        return {
+            "id": node_id,
+            "type": node_type,
+            "position": {"x": 0, "y": 0},
+            "data": {"label": node_id, **data},
+        }
+
+    graph = {
+        "nodes": [
+            node("csv", "csvInput", filePath=str(csv_path)),
+            node("filter", "filterRows", column="value", operator=">", value="1"),
+            node("show", "display"),
+            node("showAll", "display"),
+        ],
+        "edges": [
+            {"id": "e1", "source": "csv", "target": "filter"},
+            {"id": "e2", "source": "filter", "target": "show"},
+            {"id": "e3", "source": "csv", "target": "showAll"},
+        ],
+    }
+
+    created = client.post("/sessions", json=graph).json()
+    session_id = created["sessionId"]
+    assert created["status"] == "success"
+    assert len(created["output"]["show"]["data"]) == 2
+
+    patch = {
+        "updateNodes": [
+            node("filter", "filterRows", column="value", operator=">", value="2")
+        ]
+    }
+    patched = client.post(f"/sessions/{session_id}/patch", json=patch).json()
+
+    assert patched["exec_order"] == ["filter", "show"]
+    assert len(patched["output"]["show"]["data"]) == 1
+    assert patched["output"]["showAll"] == created["output"]["showAll"]
+
+    moved = node("filter", "filterRows", column="value", operator=">", value="2")
+    moved["position"] = {"x": 10, "y": 10}
+    noop = client.post(f"/sessions/{session_id}/patch", json={"updateNodes": [moved]})
+    assert noop.json()["exec_order"] == []
+
+    assert client.delete(f"/sessions/{session_id}").status_code == 200
+    assert client.post(f"/sessions/{session_id}/patch", json={}).status_code == 404
+
+
+def test_session_runs_are_planned_like_execute(tmp_path):
+    """
+    Sessions prune to the requested sinks and push filters into the source,
+    a patched filter re-reads the source with its new read plan.
+    """
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("name,value\na,1\nb,2\nc,3\n")
+
+    def node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+        return {
+            "id": node_id,
+            "type": node_type,
+            "position": {"x": 0, "y": 0},
+            "data": {"label": node_id, **data},
+        }
+
+    graph = {
+        "nodes": [
+            node("csv", "csvInput", filePath=str(csv_path)),
+            node("filter", "filterRows", column="value", operator=">", value="1"),
+            node("show", "display"),
+            node("other", "display"),
+        ],
+        "edges": [
+            {"id": "e1", "source": "csv", "target": "filter"},
+            {"id": "e2", "source": "filter", "target": "show"},
+            {"id": "e3", "source": "csv", "target": "other"},
+        ],
+        "sinks": ["show"],
+    }
+
+    created = client.post("/sessions", json=graph).json()
+    assert created["pruned_nodes"] == ["other"]
+    assert created["output"]["show"]["rows"] == 2
+
+    patch = {
+        "updateNodes": [
+            node("filter", "filterRows", column="value", operator=">", value="2")
+        ]
+    }
+    patched = client.post(f"/sessions/{created['sessionId']}/patch", json=patch)
+    assert patched.json()["exec_order"] == ["csv", "filter", "show"]
+    assert patched.json()["output"]["show"]["rows"] == 1
+    client.delete(f"/sessions/{created['sessionId']}")
+
+
+def test_session_patch_plans_only_the_changed_branch(tmp_path, monkeypatch):
+    """
+    A patch re-validates and re-infers the patched node, what is below it
+    and the source whose pushed-down filter it changes, nothing else.
+    """
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("name,value\na,1\nb,2\nc,3\n")
+
+    def node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+        return {
+            "id": node_id,
+            "type": node_type,
+            "position": {"x": 0, "y": 0},
+            "data": {"label": node_id, **data},
+        }
+
+    graph: dict[str, Any] = {"nodes": [], "edges": []}
+    for branch in ("a", "b"):
+        graph["nodes"] += [
+            node(f"csv_{branch}", "csvInput", filePath=str(csv_path)),
+            node(f"f_{branch}", "filterRows", column="value", operator=">", value="1"),
+            node(f"show_{branch}", "display"),
+        ]
+        graph["edges"] += [
+            {"id": f"e1{branch}", "source": f"csv_{branch}", "target": f"f_{branch}"},
+            {"id": f"e2{branch}", "source": f"f_{branch}", "target": f"show_{branch}"},
+        ]
+    created = client.post("/sessions", json=graph).json()
+
+    validated, inferred = set(), set()
+    validate, infer = sessions.validate_indegrees, sessions.infer_schemas
+
+    def recording_validate(nmap, dep_list):
+        validated.update(dep_list)
+        return validate(nmap, dep_list)
+
+    def recording_infer(nmap, dep_list, node_ids=None, known=None):
+        schemas, errors = infer(nmap, dep_list, node_ids, known)
+        inferred.update(node_id for node_id in schemas if node_id not in known)
+        return schemas, errors
+
+    def no_signatures(plan, node_id):
+        raise AssertionError(f"{node_id} was signatured")
+
+    monkeypatch.setattr(sessions, "validate_indegrees", recording_validate)
+    monkeypatch.setattr(sessions, "infer_schemas", recording_infer)
+    monkeypatch.setattr(sessions, "_signature", no_signatures)
+
+    patch = {
+        "updateNodes": [
+            node("f_b", "filterRows", column="value", operator=">", value="2")
+        ]
+    }
+    patched = client.post(f"/sessions/{created['sessionId']}/patch", json=patch)
+    assert patched.json()["exec_order"] == ["csv_b", "f_b", "show_b"]
+    assert validated == inferred == {"csv_b", "f_b", "show_b"}
+    assert patched.json()["output"]["show_b"]["rows"] == 1
+    assert patched.json()["output"]["show_a"]["rows"] == 2
+    client.delete(f"/sessions/{created['sessionId']}")
+
+
+def test_session_results_are_not_evicted_by_other_runs():
+    store = ResultStore(max_runs=2)
+    store.pin("session")
+    store.put("session", "show", "table")
+    for run_id in ("a", "b", "c"):
+        store.put(run_id, "show", run_id)
+
+    assert store.get("session", "show") == "table"
+    assert store.get("a", "show") is None
+    assert store.get("c", "show") == "c"
+
+    store.discard("session")  # Deleted session: unpinned, gone
+    store.put("session", "show", "again")
+    store.put("d", "show", "d")
+    store.put("e", "show", "e")
+    assert store.get("session", "show") is None
+
+
+def test_job_streams_node_events(tmp_path):
+    """
+    /jobs returns at once, progress and display outputs arrive as SSE events.
+    """
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("name,value\na,1\nb,2\n")
+    graph = {
+        "nodes": [
+            {
+                "id": "csv",
+                "type": "csvInput",
+                "position": {"x": 0, "y": 0},
+                "data": {"label": "Load", "filePath": str(csv_path)},
+            },
+            {
+                "id": "show",
+                "type": "display",
+                "position": {"x": 0, "y": 0},
+                "data": {"label": "Show"},
+            },
+        ],
+        "edges": [{"id": "e1", "source": "csv", "target": "show"}],
+    }
+
+    job_id = client.post("/jobs", json=graph).json()["jobId"]
+    stream = client.get(f"/jobs/{job_id}/events")
+    assert stream.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in stream.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    kinds = [(e["event"], e.get("nodeId")) for e in events]
+    assert kinds[0] == ("job_queued", None)
+    assert kinds.index(("node_finished", "csv")) < kinds.index(("node_started", "show"))
+    assert kinds[-1] == ("job_finished", None)
+
+    show = next(
+        e for e in events if e["event"] == "node_finished" and e["nodeId"] == "show"
+    )
+    assert show["output"]["data"] == [
+        {"name": "a", "value": 1},
+        {"name": "b", "value": 2},
+    ]
+
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["status"] == "finished"
+    assert status["result"]["output"] == {"show": show["output"]}
+
+    replay = client.get(
+        f"/jobs/{job_id}/events", headers={"Last-Event-ID": str(events[-2]["id"])}
+    )
+    assert replay.text.count("data: ") == 1
+
+
+def test_display_results_are_paged(tmp_path):
+    """
+    /execute only carries the first page of a display node, the rest is
+    fetched from /results, for in-memory and streamed outputs alike.
+    """
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text("n\n" + "\n".join(str(i) for i in range(250)) + "\n")
+
+    for chunk_size in (0, 30):
+        graph = {
+            "nodes": [
+                {
+                    "id": "csv",
+                    "type": "csvInput",
+                    "position": {"x": 0, "y": 0},
+                    "data": {
+                        "label": "Load",
+                        "filePath": str(csv_path),
+                        "chunkSize": chunk_size,
+                    },
+                },
+                {
+                    "id": "show",
+                    "type": "display",
+                    "position": {"x": 0, "y": 0},
+                    "data": {"label": "Show"},
+                },
+            ],
+            "edges": [{"id": "e1", "source": "csv", "target": "show"}],
+        }
+        executed = client.post("/execute", json=graph).json()
+        first = executed["output"]["show"]
+        assert first["rows"] == 250
+        assert first["schema"] == [{"name": "n", "dtype": "int64"}]
+        assert [row["n"] for row in first["data"]] == list(range(100))
+
+        url = f"/results/{executed['runId']}/show"
+        page = client.get(url, params={"offset": 95, "limit": 10}).json()
+        assert [row["n"] for row in page["data"]] == list(range(95, 105))
+        last = client.get(url, params={"offset": 200, "limit": 100}).json()
+        assert [row["n"] for row in last["data"]] == list(range(200, 250))
+
+    assert client.get("/results/unknown/show").status_code == 404
+
+
+def test_display_images_are_served_as_thumbnails(tmp_path):
+    cv = pytest.importorskip("cv2")
+    img_path = tmp_path / "in.png"
+    image = np.random.default_rng(0).integers(0, 255, (16, 32, 3), dtype=np.uint8)
+    cv.imwrite(str(img_path), image)
+    graph = {
+        "nodes": [
+            {
+                "id": "img",
+                "type": "loadImage",
+                "position": {"x": 0, "y": 0},
+                "data": {"label": "Load", "filePath": str(img_path)},
+            },
+            {
+                "id": "show",
+                "type": "displayImage",
+                "position": {"x": 0, "y": 0},
+                "data": {"label": "Show"},
+            },
+        ],
+        "edges": [{"id": "e1", "source": "img", "target": "show"}],
+    }
+
+    executed = client.post("/execute", json=graph).json()
+    assert executed["output"]["show"]["width"] == 32
+    url = f"/results/{executed['runId']}/show/image"
+
+    png = client.get(url, params={"format": "png"})
+    assert png.headers["content-type"] == "image/png"
+    decoded = cv.imdecode(np.frombuffer(png.content, np.uint8), cv.IMREAD_COLOR)
+    assert np.array_equal(decoded, image)
+
+    thumb = client.get(url, params={"format": "webp", "maxDim": 8})
+    decoded = cv.imdecode(np.frombuffer(thumb.content, np.uint8), cv.IMREAD_COLOR)
+    assert decoded.shape == (4, 8, 3)
+
+    cached = client.get(
+        url,
+        params={"format": "webp", "maxDim": 8},
+        headers={"If-None-Match": thumb.headers["etag"]},
+    )
+    assert cached.status_code == 304
+    assert client.get(url, params={"format": "gif"}).status_code == 400
+
+
+def test_inspect_only_propagates_the_targets_ancestors(tmp_path):
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text("a,b,c\n1,2,3\n")
+
+    def node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+        data = {"label": node_id, **data}
+        return {
+            "id": node_id,
+            "type": node_type,
+            "position": {"x": 0, "y": 0},
+            "data": data,
+        }
+
+    def request(columns: str) -> dict[str, Any]:
+        return {
+            "nodes": [
+                node("csv", "csvInput", filePath=str(csv_path)),
+                node("sel", "selectColumn", columns=columns),
+                node("target", "filterRows", column="a", operator=">", value="0"),
+                node("other", "csvInput", filePath=str(tmp_path / "other.csv")),
+                node("other_sel", "selectColumn", columns="x"),
+            ],
+            "edges": [
+                {"id": "e1", "source": "csv", "target": "sel"},
+                {"id": "e2", "source": "sel", "target": "target"},
+                {"id": "e3", "source": "other", "target": "other_sel"},
+            ],
+            "targetNodeId": "target",
+        }
+
+    before = len(SCHEMA_MEMO)
+    resp = client.post("/inspect", json=request("c,a")).json()
+    assert resp["columns"] == ["a", "c"]
+    assert resp["schema"]["rows"] == 1
+    assert resp["error"] is None
+    assert len(SCHEMA_MEMO) == before + 2  # csv and sel, not the other branch
+
+    # Nothing changed upstream: served from the memo
+    assert client.post("/inspect", json=request("c,a")).json()["columns"] == ["a", "c"]
+    assert len(SCHEMA_MEMO) == before + 2
+    # Only the edited node is inspected again, on the memoised header
+    assert client.post("/inspect", json=request("b")).json()["columns"] == ["b"]
+    assert len(SCHEMA_MEMO) == before + 3
+
+    # A new version of the file invalidates its header and everything below
+    csv_path.write_text("a,b,c,d\n1,2,3,4\n")
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    resp = client.post("/inspect", json=request("d,a"))
+    assert resp.json()["columns"] == ["a", "d"]
+
+
+def test_download_serves_files_below_the_temp_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "TEMP_UPLOAD_DIR", tmp_path)
+    (tmp_path / "batch").mkdir()
+    (tmp_path / "batch" / "a.png").write_bytes(b"png")
+    (tmp_path.parent / "secret.txt").write_text("no")
+
+    resp = client.get("/files/download", params={"filepath": "batch/a.png"})
+    assert resp.status_code == 200
+    assert resp.content == b"png"
+    assert not (tmp_path / "batch" / "a.png").exists()  # Removed once sent
+
+    resp = client.get("/files/download", params={"filepath": "../secret.txt"})
+    assert resp.status_code != 200
@@ -0,0 +1,122 @@
+import importlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.processors import node_map
+
+
+def test_startup_imports_no_plugin():
+    script = (
+        "import sys, app.main\n"
+        "print(sorted(m for m in sys.modules"
+        " if m.startswith('plugins.') or m in ('cv2', 'pandas', 'sklearn')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_plugins_are_imported_on_first_lookup():
+    node_map.discover_plugins()
+    registry = node_map.NODE_PROCESSING_FUNCTIONS
+
+    # Metadata comes from the plugin source, functions only once looked up
+    assert node_map.NODE_INFO["flipImage"]["affine_function"] == "flip_affine"
+    assert node_map.NODE_INDEGREE["flipImage"] == 1
+    assert not dict.__contains__(registry, "flipImage")
+
+    assert "flipImage" in node_map.NODE_AFFINE_FUNCTIONS
+    flip = dict.__getitem__(registry, "flipImage")
+    assert registry["flipImage"] is flip
+    assert flip.__module__ == "plugins.VISION_flipImage"
+    assert "note" not in registry
+    assert registry.get("note") is None
+
+
+_PROBE = """
+node_info = {{"nodeType": "{node_type}", "function": "run", "inDegree": "1"}}
+
+
+def run(data, inputs):
+    return {value}
+"""
+
+
+@pytest.fixture
+def plugins_dir(tmp_path, monkeypatch):
+    """
+    An empty plugins directory in tmp_path, registered instead of the real
+    one. The registry starts out empty and is restored afterwards.
+    """
+    package = importlib.import_module("plugins")
+    monkeypatch.setattr(node_map, "PLUGINS_DIR", tmp_path)
+    monkeypatch.setattr(package, "__path__", [str(tmp_path)])
+
+    state = [
+        *node_map.FUNCTION_REGISTRIES,
+        node_map.NODE_INDEGREE,
+        node_map.NODE_INFO,
+        node_map.FAILED_NODE_TYPES,
+        node_map.PLUGIN_VERSIONS,
+        node_map._PLUGIN_FILES,
+        node_map._PENDING_MODULES,
+        node_map._IMPORTED_MODULES,
+    ]
+    saved = [container.copy() for container in state]
+    for container in state:
+        container.clear()
+    try:
+        yield tmp_path
+    finally:
+        for container, contents in zip(state, saved):
+            container.clear()
+            if isinstance(container, dict):
+                dict.update(container, contents)
+            else:
+                container.update(contents)
+
+
+def test_refresh_reimports_only_changed_plugins(plugins_dir):
+    path = plugins_dir / "TEST_refreshProbe.py"
+    module_name = "plugins.TEST_refreshProbe"
+    registry = node_map.NODE_PROCESSING_FUNCTIONS
+    try:
+        path.write_text(_PROBE.format(node_type="refreshProbe", value=1))
+        (plugins_dir / "TEST_otherProbe.py").write_text(
+            _PROBE.format(node_type="otherProbe", value=0)
+        )
+        added = node_map.refresh_plugins()["added"]
+        assert added == ["plugins.TEST_otherProbe", module_name]
+        assert registry["refreshProbe"](None, []) == 1
+        version = node_map.PLUGIN_VERSIONS["refreshProbe"]
+
+        # Same content under a new mtime: hashed, but nothing is re-imported
+        other = registry["otherProbe"]
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert not any(node_map.refresh_plugins().values())
+
+        # An imported plugin is re-imported in place, the others stay as is
+        path.write_text(_PROBE.format(node_type="refreshProbe", value=2))
+        assert node_map.refresh_plugins()["changed"] == [module_name]
+        assert dict.__getitem__(registry, "refreshProbe")(None, []) == 2
+        assert node_map.PLUGIN_VERSIONS["refreshProbe"] != version
+        assert registry["otherProbe"] is other
+
+        path.unlink()
+        assert node_map.refresh_plugins()["removed"] == [module_name]
+        assert "refreshProbe" not in node_map.NODE_INFO
+        assert "refreshProbe" not in registry
+        assert module_name not in sys.modules
+    finally:
+        for name in ("plugins.TEST_refreshProbe", "plugins.TEST_otherProbe"):
+            sys.modules.pop(name, None)
@@ -0,0 +1,204 @@
+from itertools import pairwise
+from typing import Any
+
+import cv2 as cv
+import numpy as np
+import pandas as pd
+
+from app import engine, optimizer
+from app.classes import GraphPayload
+from app.results import RESULT_STORE
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 0, "y": 0},
+        "data": {"label": node_id, **data},
+    }
+
+
+def _edge(source: str, target: str) -> dict[str, str]:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def _payload(csv_path: str) -> dict[str, Any]:
+    return {
+        "nodes": [
+            _node("csv", "csvInput", filePath=csv_path),
+            _node("sel1", "selectColumn", columns="a,b,c"),
+            _node("f1", "filterRows", column="a", operator=">", value="2"),
+            _node("sel2", "selectColumn", columns="c,b,x"),
+            _node("f2", "filterRows", column="b", operator="<", value="8"),
+            _node("f3", "filterRows", column="c", operator="!=", value="4"),
+            _node("out", "display"),
+        ],
+        "edges": [
+            _edge("csv", "sel1"),
+            _edge("sel1", "f1"),
+            _edge("f1", "sel2"),
+            _edge("sel2", "f2"),
+            _edge("f2", "f3"),
+            _edge("f3", "out"),
+        ],
+        "optimize": True,
+    }
+
+
+def test_optimized_plan_gives_the_same_output(tmp_path):
+    rng = np.random.default_rng(0)
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame(rng.integers(0, 10, (300, 5)), columns=list("abcde")).to_csv(
+        csv_path, index=False
+    )
+    payload = _payload(str(csv_path))
+
+    plan = engine.explain(GraphPayload.model_validate(payload))
+    assert [r["rule"] for r in plan["rewrites"]] == [
+        *["push_filter"] * 5,
+        "fold_select",
+        "fuse_filters",
+        "fuse_filters",
+    ]
+    # Three filters fused into one node right below the source, one selection.
+    # Rewritten nodes keep the ids of the positions they took over.
+    assert plan["exec_order"] == ["csv", "sel2", "f3", "out"]
+    fused = plan["nodes"][1]
+    assert fused["type"] == "filterRows"
+    assert [c["column"] for c in fused["data"]["conditions"]] == ["a", "b", "c"]
+    assert plan["nodes"][2]["data"]["columns"] == "c,b"
+    assert plan["read_plans"]["csv"]["usecols"] == ["a", "b", "c"]
+    assert len(plan["read_plans"]["csv"]["filters"]) == 1
+
+    optimized = engine.execute(GraphPayload.model_validate(payload), cache=None)
+    plain = engine.execute(
+        GraphPayload.model_validate({**payload, "optimize": False}), cache=None
+    )
+    assert plain["rewrites"] == []
+    # Off by default: the ids of a rewritten plan are not the graph's nodes
+    default = engine.explain(
+        GraphPayload.model_validate(
+            {k: v for k, v in payload.items() if k != "optimize"}
+        )
+    )
+    assert default["rewrites"] == []
+    assert optimized["exec_order"] == ("csv", "sel2", "f3", "out")
+    assert optimized["output"] == plain["output"]
+
+
+def test_shared_and_sink_results_are_not_rewritten(tmp_path):
+    payload = {
+        "nodes": [
+            _node("csv", "csvInput", filePath=str(tmp_path / "missing.csv")),
+            _node("f1", "filterRows", column="a", operator=">", value="2"),
+            _node("peek", "display"),
+            _node("f2", "filterRows", column="b", operator="<", value="8"),
+            _node("out", "display"),
+        ],
+        "edges": [
+            _edge("csv", "f1"),
+            _edge("f1", "peek"),
+            _edge("f1", "f2"),
+            _edge("f2", "out"),
+        ],
+        "optimize": True,
+    }
+
+    plan = engine.explain(GraphPayload.model_validate(payload))
+    assert plan["rewrites"] == []
+    assert set(plan["exec_order"]) == {"csv", "f1", "peek", "f2", "out"}
+
+
+def test_long_filter_chains_fuse_in_one_pass():
+    filters = [
+        _node(f"f{i}", "filterRows", column="a", operator=">", value=str(i))
+        for i in range(400)
+    ]
+    nodes = [_node("csv", "csvInput", filePath="in.csv"), *filters]
+    nodes.append(_node("out", "display"))
+    graph = GraphPayload.model_validate(
+        {"nodes": nodes, "edges": [_edge(a["id"], b["id"]) for a, b in pairwise(nodes)]}
+    )
+    nmap, dep_list = engine.build_dependency_list(graph.nodes, graph.edges)
+
+    plan = optimizer._Plan(nmap, dep_list)
+    plan.apply(plan.fuse_filters)
+    assert len(plan.rewrites) == 399
+    assert plan.dep_list == {"csv": [], "f399": ["csv"], "out": ["f399"]}
+    # The children index followed every merge
+    assert {nid: plan.children(nid) for nid in plan.dep_list} == {
+        "csv": ["f399"],
+        "f399": ["out"],
+        "out": [],
+    }
+    assert len(plan.nmap["f399"].data.conditions) == 400
+
+
+def _image_chain(img_path: str, *steps: dict[str, Any]) -> dict[str, Any]:
+    nodes = [_node("img", "loadImage", filePath=img_path), *steps]
+    nodes.append(_node("show", "displayImage"))
+    return {
+        "nodes": nodes,
+        "edges": [_edge(a["id"], b["id"]) for a, b in pairwise(nodes)],
+    }
+
+
+def _shown(payload: dict[str, Any]) -> np.ndarray:
+    response = engine.execute(GraphPayload.model_validate(payload), cache=None)
+    return RESULT_STORE.get(response["runId"], "show").image
+
+
+def test_geometric_image_nodes_fuse_into_one_warp(tmp_path):
+    # Smooth, so one interpolation instead of several stays within rounding
+    y, x = np.mgrid[0:120, 0:160]
+    img = np.dstack([x * 255 // 160, y * 255 // 120, (x + y) % 256]).astype(np.uint8)
+    img_path = str(tmp_path / "in.png")
+    cv.imwrite(img_path, img)
+
+    def fused_and_separate(payload):
+        fused = _shown({**payload, "optimize": True})
+        separate = _shown({**payload, "optimize": False})
+        assert fused.shape == separate.shape
+        diff = np.abs(fused.astype(int) - separate.astype(int))
+        assert diff.mean() < 1.5
+        return fused
+
+    # rotate -> resize -> flip becomes a single warp
+    payload = _image_chain(
+        img_path,
+        _node("rot", "rotateImage", angle=30, rotationDirection="Clockwise"),
+        _node("small", "resizeImage", width=80, height=60),
+        _node("flip", "flipImage", horizontal=True),
+    )
+    plan = engine.explain(GraphPayload.model_validate({**payload, "optimize": True}))
+    assert [r["rule"] for r in plan["rewrites"]] == ["fuse_affine"] * 2
+    assert plan["exec_order"] == ["img", "flip", "show"]
+    steps = plan["nodes"][1]["data"]["steps"]
+    assert [step["type"] for step in steps] == [
+        "rotateImage",
+        "resizeImage",
+        "flipImage",
+    ]
+    assert fused_and_separate(payload).shape == (60, 80, 3)
+
+    # A rotation crops to its frame: a second one would show the cut corners
+    payload = _image_chain(
+        img_path,
+        _node("cw", "rotateImage", angle=45, rotationDirection="Clockwise"),
+        _node("acw", "rotateImage", angle=45, rotationDirection="Anticlockwise"),
+        _node("small", "resizeImage", width=80, height=60),
+    )
+    plan = engine.explain(GraphPayload.model_validate({**payload, "optimize": True}))
+    assert [r["nodes"] for r in plan["rewrites"]] == [["acw", "small"]]
+    corners = fused_and_separate(payload)
+    assert (corners[0, 0] == 0).all()
+
+    # Mirrors only: exact, flipping twice gives the input back
+    flips = _image_chain(
+        img_path,
+        _node("h", "flipImage", horizontal=True),
+        _node("v", "flipImage", vertical=True),
+        _node("h2", "flipImage", horizontal=True),
+    )
+    assert np.array_equal(_shown({**flips, "optimize": True}), cv.flip(img, 0))
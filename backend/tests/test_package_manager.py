@@ -0,0 +1,42 @@
+import json
+
+from app import package_manager
+
+
+def _write(path, node_type, dependencies):
+    path.write_text(
+        json.dumps(
+            {"nodeType": node_type, "category": "DATA", "dependencies": dependencies}
+        )
+    )
+
+
+def test_node_status_is_served_from_the_index_until_manifests_change(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(package_manager, "MANIFESTS_DIR", tmp_path)
+    monkeypatch.setattr(package_manager, "BACKEND_PLUGINS_DIR", tmp_path / "plugins")
+    calls = []
+    real = package_manager.get_installed_packages
+
+    def installed():
+        calls.append(1)
+        return real()
+
+    monkeypatch.setattr(package_manager, "get_installed_packages", installed)
+    _write(tmp_path / "a.json", "alpha", ["pandas", "no-such-distribution"])
+    manifest_map: dict[str, str] = {}
+    index = package_manager.ManifestIndex(manifest_map)
+
+    first = index.node_status()
+    assert [s["missingDependencies"] for s in first] == [["no-such-distribution"]]
+    assert manifest_map == {"alpha": "DATA"}
+    assert index.node_status()[0] is first[0]
+    assert len(calls) == 1  # site-packages did not change
+
+    _write(tmp_path / "b.json", "beta", [])
+    (tmp_path / "a.json").unlink()
+    statuses = index.node_status()
+    assert [(s["nodeType"], s["status"]) for s in statuses] == [("beta", "Available")]
+    assert manifest_map == {"beta": "DATA"}
+    assert len(calls) == 1
@@ -0,0 +1,95 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app import engine
+from app.classes import GraphPayload
+from app.planner import plan_reads, required_columns
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 0, "y": 0},
+        "data": {"label": node_id, **data},
+    }
+
+
+def _edge(source: str, target: str) -> dict[str, str]:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def _wide_csv(tmp_path) -> str:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(0, 10, (200, 8)), columns=list("abcdefgh"))
+    df["value"] = rng.random(200)
+    csv_path = tmp_path / "wide.csv"
+    df.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_plan_projects_columns_and_pushes_filters(tmp_path):
+    csv_path = _wide_csv(tmp_path)
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("csv", "csvInput", filePath=csv_path),
+                _node("f1", "filterRows", column="a", operator=">", value="2"),
+                _node("f2", "filterRows", column="c", operator="!=", value="5"),
+                _node("scale", "transform", method="normalize"),
+                _node("cols", "selectColumn", columns="b,value"),
+                _node("out", "display"),
+            ],
+            "edges": [
+                _edge("csv", "f1"),
+                _edge("f1", "f2"),
+                _edge("f2", "scale"),
+                _edge("scale", "cols"),
+                _edge("cols", "out"),
+            ],
+        }
+    )
+    nmap, dep_list = engine.build_dependency_list(graph.nodes, graph.edges)
+
+    needed = required_columns(nmap, dep_list)
+    assert needed["out"] is None
+    assert needed["cols"] is None
+    assert needed["scale"] == {"b", "value"}
+    assert needed["csv"] == {"a", "b", "c", "value"}
+
+    plans = plan_reads(nmap, dep_list, {})
+    assert list(plans) == ["csv"]
+    assert plans["csv"].usecols == ["a", "b", "c", "value"]
+    assert [node.id for node in plans["csv"].filters] == ["f1", "f2"]
+
+    planned = engine.execute(graph, cache=None)
+    unplanned = engine.GraphExecution(nmap, dep_list, {}).run()
+    assert planned["status"] == "success"
+    assert planned["output"] == unplanned["output"]
+
+
+def test_sinks_and_shared_sources_keep_full_reads(tmp_path):
+    csv_path = _wide_csv(tmp_path)
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("csv", "csvInput", filePath=csv_path),
+                _node("raw", "display"),
+                _node("f1", "filterRows", column="a", operator=">", value="2"),
+                _node("cols", "selectColumn", columns="b"),
+                _node("out", "display"),
+            ],
+            "edges": [
+                _edge("csv", "raw"),
+                _edge("csv", "f1"),
+                _edge("f1", "cols"),
+                _edge("cols", "out"),
+            ],
+        }
+    )
+    nmap, dep_list = engine.build_dependency_list(graph.nodes, graph.edges)
+
+    # "raw" shows every column and also sees the unfiltered rows
+    assert plan_reads(nmap, dep_list, {}) == {}
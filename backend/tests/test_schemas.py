@@ -0,0 +1,111 @@
+from itertools import pairwise
+from typing import Any
+
+import cv2 as cv
+import numpy as np
+import pandas as pd
+
+from app import engine
+from app.classes import GraphPayload
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 0, "y": 0},
+        "data": {"label": node_id, **data},
+    }
+
+
+def _chain(*nodes: dict[str, Any]) -> GraphPayload:
+    edges = [
+        {"id": f"{a['id']}-{b['id']}", "source": a["id"], "target": b["id"]}
+        for a, b in pairwise(nodes)
+    ]
+    return GraphPayload.model_validate({"nodes": list(nodes), "edges": edges})
+
+
+def test_table_schemas_carry_dtypes_and_row_estimates(tmp_path):
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame(
+        {"a": range(500), "value": [1, None] * 250, "name": ["x"] * 500}
+    ).to_csv(csv_path, index=False)
+
+    plan = engine.explain(
+        _chain(
+            _node("csv", "csvInput", filePath=str(csv_path)),
+            _node("fill", "handleMissingVal", strategy="mean"),
+            _node("cols", "selectColumn", columns="a,value"),
+            _node("scale", "transform", method="normalize"),
+            _node("out", "display"),
+        )
+    )
+    schemas = plan["schemas"]
+    assert schemas["csv"]["rows"] == 500
+    assert [c["dtype"] for c in schemas["csv"]["columns"]] == [
+        "int64",
+        "float64",
+        "str",
+    ]
+    # Imputed numeric columns become floats, the selection keeps two of them
+    assert schemas["out"]["columns"] == [
+        {"name": "a", "dtype": "float64"},
+        {"name": "value", "dtype": "float64"},
+    ]
+    assert schemas["out"]["nbytes"] == 500 * 16
+    assert plan["estimated_bytes"] >= 4 * 500 * 16
+
+    # A transform without a "value" column is rejected before running
+    mismatch = _chain(
+        _node("csv", "csvInput", filePath=str(csv_path)),
+        _node("cols", "selectColumn", columns="a"),
+        _node("scale", "transform", method="standardize"),
+    )
+    assert "value" in engine.explain(mismatch)["node_errors"]["scale"]
+
+
+def test_image_schemas_are_known_without_decoding(tmp_path):
+    img_path = str(tmp_path / "in.png")
+    cv.imwrite(img_path, np.zeros((30, 40, 3), dtype=np.uint8))
+
+    plan = engine.explain(
+        _chain(
+            _node("img", "loadImage", filePath=img_path),
+            _node("small", "resizeImage", width=20, height=10),
+            _node("gray", "cvtColorImage", in_colorspace="BGR", out_colorspace="GRAY"),
+            _node("edges", "cannyEdge", threshold1=50, threshold2=150),
+            _node("show", "displayImage"),
+        )
+    )
+    schemas = plan["schemas"]
+    assert (schemas["img"]["width"], schemas["img"]["height"]) == (40, 30)
+    assert schemas["small"]["nbytes"] == 20 * 10 * 3
+    assert schemas["show"] == {
+        "kind": "image",
+        "width": 20,
+        "height": 10,
+        "channels": 1,
+        "dtype": "uint8",
+        "images": 1,
+        "nbytes": 200,
+    }
+
+    # A colour conversion expecting one channel on a BGR image
+    mismatch = _chain(
+        _node("img", "loadImage", filePath=img_path),
+        _node("gray", "cvtColorImage", in_colorspace="GRAY", out_colorspace="BGR"),
+        _node("show", "displayImage"),
+    )
+    response = engine.execute(mismatch, cache=None)
+    assert "1 channel(s)" in response["node_errors"]["gray"]
+    assert "show" in response["skipped_nodes"]
+
+    # A table into an image node
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text("a\n1\n")
+    wrong_kind = _chain(
+        _node("csv", "csvInput", filePath=str(csv_path)),
+        _node("blur", "blurImage"),
+    )
+    assert "receives a table" in engine.explain(wrong_kind)["node_errors"]["blur"]
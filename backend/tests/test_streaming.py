@@ -0,0 +1,152 @@
+import pickle
+import threading
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import engine, streaming
+from app.classes import GraphPayload
+from app.results import RESULT_STORE, TableResult
+from app.streaming import ChunkedFrame, exact_medians, running_moments
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 0, "y": 0},
+        "data": {"label": node_id, **data},
+    }
+
+
+def _edge(source: str, target: str) -> dict[str, str]:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+@pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+def test_streamed_pipeline_matches_in_memory(tmp_path, strategy):
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame(
+        {
+            "value": [5.0, np.nan, 3.0, 8.0, 1.0, np.nan, 9.0, 3.0, 4.0, 7.0],
+            "group": ["a", "b", "a", "b", "a", "b", "a", "b", "a", "b"],
+        }
+    ).to_csv(csv_path, index=False)
+
+    def run(chunk_size: int) -> dict[str, Any]:
+        graph = GraphPayload.model_validate(
+            {
+                "nodes": [
+                    _node(
+                        "csv", "csvInput", filePath=str(csv_path), chunkSize=chunk_size
+                    ),
+                    _node("fill", "handleMissingVal", strategy=strategy),
+                    _node(
+                        "keep", "filterRows", column="group", operator="==", value="a"
+                    ),
+                    _node("scale", "transform", method="standardize"),
+                    _node("out", "display"),
+                ],
+                "edges": [
+                    _edge("csv", "fill"),
+                    _edge("fill", "keep"),
+                    _edge("keep", "scale"),
+                    _edge("scale", "out"),
+                ],
+            }
+        )
+        return engine.execute(graph, cache=None)
+
+    in_memory, streamed = run(0), run(3)
+    assert streamed["status"] == "success"
+    assert pd.DataFrame(streamed["output"]["out"]["data"]).equals(
+        pd.DataFrame(in_memory["output"]["out"]["data"])
+    )
+
+
+def test_exact_median_narrows_with_histograms(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming, "MEDIAN_MAX_VALUES", 50)
+    monkeypatch.setattr(streaming, "MEDIAN_BINS", 8)
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "even": rng.normal(size=1000),
+            "odd": np.append(rng.exponential(size=999), np.nan),
+            "flat": np.ones(1000),
+        }
+    )
+    csv_path = tmp_path / "in.csv"
+    df.to_csv(csv_path, index=False)
+
+    frames = ChunkedFrame(str(csv_path), 128)
+    medians = exact_medians(frames, running_moments(frames))
+    expected = pd.read_csv(csv_path).median()
+    assert medians.to_dict() == pytest.approx(expected.to_dict())
+
+
+def test_chunked_frame_is_a_picklable_recipe(tmp_path):
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame({"value": range(10)}).to_csv(csv_path, index=False)
+
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("csv", "csvInput", filePath=str(csv_path), chunkSize=4),
+                _node("cols", "selectColumn", columns="value"),
+            ],
+            "edges": [_edge("csv", "cols")],
+        }
+    )
+    nmap, dep_list = engine.build_dependency_list(graph.nodes, graph.edges)
+    execution = engine.GraphExecution(nmap, dep_list, {}, retain_results=True)
+    execution.run()
+
+    recipe = execution.results["cols"]
+    assert isinstance(recipe, ChunkedFrame)
+    assert [len(chunk) for chunk in pickle.loads(pickle.dumps(recipe))] == [4, 4, 2]
+
+
+def test_streamed_display_is_counted_in_the_pool_and_paged_by_chunk(
+    tmp_path, monkeypatch
+):
+    csv_path = tmp_path / "in.csv"
+    pd.DataFrame({"n": range(1000), "tag": ['x,"y"', "z"] * 500}).to_csv(
+        csv_path, index=False
+    )
+    counted_on, starts = [], []
+    count, chunks_from = TableResult._count, ChunkedFrame.chunks_from
+
+    def recording_count(self):
+        counted_on.append(threading.current_thread())
+        return count(self)
+
+    def recording_chunks_from(self, start):
+        starts.append(start)
+        return chunks_from(self, start)
+
+    monkeypatch.setattr(TableResult, "_count", recording_count)
+    monkeypatch.setattr(ChunkedFrame, "chunks_from", recording_chunks_from)
+
+    graph = GraphPayload.model_validate(
+        {
+            "nodes": [
+                _node("csv", "csvInput", filePath=str(csv_path), chunkSize=64),
+                _node("odd", "filterRows", column="tag", operator="==", value="z"),
+                _node("out", "display"),
+            ],
+            "edges": [_edge("csv", "odd"), _edge("odd", "out")],
+        }
+    )
+    response = engine.execute(graph, cache=None)
+    assert response["output"]["out"]["rows"] == 500
+    assert counted_on and threading.main_thread() not in counted_on
+
+    table = RESULT_STORE.get(response["runId"], "out")
+    starts.clear()
+    page = table.page(400, 20)
+    assert page["n"].tolist() == list(range(801, 841, 2))
+    assert page.index.tolist() == page["n"].tolist()
+    assert starts == [12]  # Output row 400 is input row 801, in chunk 801 // 64
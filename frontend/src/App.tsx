@@ -15,7 +15,12 @@ import { v4 as uuidv4 } from "uuid";
 import { nodeRegistry } from "./components/nodes/nodeRegistry";
 import ContextMenu from "./components/ui/ContextMenu";
 import PackageManager from "./components/ui/PackageManager";
-import type { AppNode, AppNodeData } from "./nodeTypes";
+import type {
+  AppNode,
+  AppNodeData,
+  ImageResult,
+  TableResult,
+} from "./nodeTypes";
 import type { NodeStatus, SearchSettings } from "./types";
 import "./App.css";
 import { ThemeToggle } from "./components/ui/ThemeToggle";
@@ -61,7 +66,9 @@ function App() {
   const [isTutorialOpen, setTutorialOpen] = useState(false);
   const [isSettingsOpen, setSettingsOpen] = useState(false); // Settings modal state
   const [availableNodes, setAvailableNodes] = useState<NodeStatus[]>([]);
-  const [displayData, setDisplayData] = useState<Record<string, string>>({});
+  const [displayData, setDisplayData] = useState<Record<string, unknown>>({});
+  // Display tables are paged from /results/{runId}/{nodeId}
+  const [runId, setRunId] = useState<string | null>(null);
   const [isPanning, setIsPanning] = useState(false);
   const flow = useReactFlow();
 
@@ -396,7 +403,9 @@ function App() {
     setMenu(null);
   }, [setMenu]);
 
-  const handleRunClick = useCallback(async () => {
+  // preview: approximate run on downscaled images / sampled rows, sinks
+  // writing files are left out by the backend
+  const handleRunClick = useCallback(async (preview = false) => {
     setError(null); // Clear previous errors on a new run
 
     // extract just the data needed for backend
@@ -409,6 +418,7 @@ function App() {
           return { id, type, position, data: restData };
         }),
       edges: edges,
+      preview,
     };
 
     try {
@@ -430,6 +440,7 @@ function App() {
       }
       if (res.output) {
         setDisplayData(res.output);
+        setRunId(res.runId ?? null);
       }
 
       if (res.download_files && Array.isArray(res.download_files)) {
@@ -462,12 +473,20 @@ function App() {
 
       // 1. Check for *table* display data (displayNode)
       if (node.type === "display" && displayData[node.id]) {
-        mergedData = { ...baseData, result: displayData[node.id] };
+        mergedData = {
+          ...baseData,
+          result: displayData[node.id] as TableResult,
+          runId,
+        };
       }
       // 2. Check for *image* display data (displayImageNode)
       else if (node.type === "displayImage" && displayData[node.id]) {
-        // The backend puts the base64 string into displayData[node.id]
-        mergedData = { ...baseData, imageBase64: displayData[node.id] };
+        // Size and ETag only, the node loads the image from the backend
+        mergedData = {
+          ...baseData,
+          image: displayData[node.id] as ImageResult,
+          runId,
+        };
       }
 
       const nodeError =
@@ -482,7 +501,7 @@ function App() {
         },
       };
     });
-  }, [nodes, onNodeDataChange, nodeSchemas, displayData, error]);
+  }, [nodes, onNodeDataChange, nodeSchemas, displayData, runId, error]);
 
   const handleSaveWorkflow = useCallback(() => {
     if (!flow) return;
@@ -651,7 +670,15 @@ function App() {
             </button>
 
             <button
-              onClick={handleRunClick}
+              onClick={() => handleRunClick(true)}
+              className="bg-[var(--color-surface-3)] hover:bg-[var(--color-border-1)] text-[var(--color-text-2)] font-medium py-2 px-4 rounded-md focus:outline-none focus-visible:ring-2 focus-visible:ring-[var(--color-accent)]"
+              title="Quick run on downscaled images and a sample of rows"
+            >
+              Preview
+            </button>
+
+            <button
+              onClick={() => handleRunClick()}
               className="bg-green-600 hover:bg-green-700 text-white font-medium py-2 px-4 rounded-md focus:outline-none focus-visible:ring-2 focus-visible:ring-green-500"
             >
               Run Pipeline
@@ -69,6 +69,19 @@ function bytesToSize(bytes = 0) {
   return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + " " + sizes[i];
 }
 
+const DEFAULT_ACCEPT = ".csv,text/csv,application/vnd.ms-excel";
+
+// Matches a file against an `accept` list of extensions and MIME types
+function isAccepted(file: File, accept: string) {
+  const name = file.name.toLowerCase();
+  return accept
+    .split(",")
+    .map((entry) => entry.trim().toLowerCase())
+    .some((entry) =>
+      entry.startsWith(".") ? name.endsWith(entry) : entry === file.type,
+    );
+}
+
 function InputNode({ id, data }: InputNodeProps) {
   const fileInputRef = useRef<HTMLInputElement | null>(null);
   const [localFile, setLocalFile] = useState<File | null>(null);
@@ -99,9 +112,10 @@ function InputNode({ id, data }: InputNodeProps) {
   const handleFileSelect = async (file: File | null) => {
     if (!file) return;
 
-    // Allow only CSV files (check MIME and extension as fallback)
-    if (file.type !== "text/csv") {
-      setUploadError("Only CSV files are allowed.");
+    // Allow only the node's file types (MIME or extension)
+    const accept = data.accept ?? DEFAULT_ACCEPT;
+    if (!isAccepted(file, accept)) {
+      setUploadError(`Only ${accept} files are allowed.`);
       setLocalFile(null);
       setPreviewUrl(null);
       if (fileInputRef.current) fileInputRef.current.value = "";
@@ -113,7 +127,7 @@ function InputNode({ id, data }: InputNodeProps) {
     setUploadError(null);
     setLocalFile(file);
     if (previewUrl) URL.revokeObjectURL(previewUrl); // Clean up previous preview
-    setPreviewUrl(null); // no image preview for CSV
+    setPreviewUrl(null); // no image preview for tabular files
 
     // 2. Start the upload process
     setIsUploading(true);
@@ -214,7 +228,7 @@ function InputNode({ id, data }: InputNodeProps) {
             type="file"
             onChange={handleInputChange}
             className="hidden"
-            accept=".csv,text/csv,application/vnd.ms-excel"
+            accept={data.accept ?? DEFAULT_ACCEPT}
             disabled={isUploading}
           />
 
@@ -233,7 +247,7 @@ function InputNode({ id, data }: InputNodeProps) {
                   ? "Upload Failed"
                   : displayName
                     ? "Replace File"
-                    : "Click or drag CSV file here"}
+                    : "Click or drag a file here"}
             </div>
             {uploadError && (
               <p className="text-xs text-center text-[var(--color-danger-text)] max-w-full px-2">
@@ -266,6 +280,21 @@ function InputNode({ id, data }: InputNodeProps) {
             </div>
           )}
         </div>
+        <div className="flex items-center">
+          <input
+            id={`arrow-${id}`}
+            type="checkbox"
+            checked={data.arrow ?? false}
+            onChange={(e) => data.onChange(id, { arrow: e.target.checked })}
+            className="nodrag mr-2 h-4 w-4 rounded border-gray-300 text-[var(--color-accent)] focus:ring-[var(--color-accent)]"
+          />
+          <label
+            htmlFor={`arrow-${id}`}
+            className="select-none text-sm font-medium text-[var(--color-text-2)]"
+          >
+            Arrow-backed columns (pyarrow)
+          </label>
+        </div>
       </div>
       <TypedHandle
         type="source"
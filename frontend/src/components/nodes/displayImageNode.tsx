@@ -1,4 +1,5 @@
 import { Position } from "@xyflow/react";
+import { useEffect, useState } from "react";
 import type { DisplayImageNodeProps } from "../../nodeTypes";
 import { TypedHandle } from "../ui/TypedHandle";
 
@@ -39,7 +40,23 @@ const InfoIcon = () => (
 );
 // ---
 
+// Longest side of the preview requested from the backend
+const THUMBNAIL_DIM = 512;
+
 function DisplayImageNode({ id, data }: DisplayImageNodeProps) {
+  const etag = data.image?.etag;
+  const [src, setSrc] = useState<string | null>(null);
+
+  useEffect(() => {
+    // A run producing the same pixels keeps the already loaded image
+    setSrc(
+      etag && data.runId
+        ? `http://127.0.0.1:8000/results/${data.runId}/${id}/image?format=webp&quality=85&maxDim=${THUMBNAIL_DIM}`
+        : null,
+    );
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [etag, id]);
+
   // Determine border style based on error state
   const isError = data.isError;
   const borderClass = isError
@@ -73,12 +90,22 @@ function DisplayImageNode({ id, data }: DisplayImageNodeProps) {
 
       {/* Body */}
       <div className="p-2 flex-grow flex items-center justify-center min-h-[100px]">
-        {data.imageBase64 ? (
-          <img
-            src={data.imageBase64}
-            alt={`Output for node ${id}`}
-            className="max-w-full max-h-64 object-contain rounded"
-          />
+        {src ? (
+          <div className="flex flex-col items-center gap-1">
+            <img
+              src={src}
+              alt={`Output for node ${id}`}
+              className="max-w-full max-h-64 object-contain rounded"
+            />
+            <a
+              href={src.replace(/\?.*$/, "?format=png")}
+              target="_blank"
+              rel="noreferrer"
+              className="nodrag text-xs text-[var(--color-text-2)] underline"
+            >
+              {data.image?.width}x{data.image?.height} (full size)
+            </a>
+          </div>
         ) : (
           <p className="text-xs text-center text-[var(--color-text-3)] italic p-4">
             Connect input and run pipeline to display image.
@@ -1,5 +1,6 @@
 import { Position } from "@xyflow/react";
-import type { DisplayNodeProps } from "../../nodeTypes";
+import { useEffect, useState } from "react";
+import type { DisplayNodeProps, TableResult } from "../../nodeTypes";
 import { TypedHandle } from "../ui/TypedHandle";
 
 // --- Icons ---
@@ -40,15 +41,39 @@ const InfoIcon = () => (
 );
 // ---
 
-function DisplayNode({ data }: DisplayNodeProps) {
-  let tableData: Record<string, unknown>[] = [];
-  if (data.result) {
+function DisplayNode({ id, data }: DisplayNodeProps) {
+  // The run's first page comes with the node, others are fetched on demand
+  const [page, setPage] = useState<TableResult | undefined>(data.result);
+  const [isLoading, setIsLoading] = useState(false);
+  const [pageError, setPageError] = useState<string | null>(null);
+
+  useEffect(() => {
+    setPage(data.result);
+    setPageError(null);
+  }, [data.result]);
+
+  const loadPage = async (offset: number) => {
+    if (!page || !data.runId) return;
+    setIsLoading(true);
     try {
-      tableData = JSON.parse(data.result) as Record<string, unknown>[];
-    } catch {
-      tableData = [];
+      const resp = await fetch(
+        `http://127.0.0.1:8000/results/${data.runId}/${id}?offset=${offset}&limit=${page.limit}`,
+      );
+      if (!resp.ok) {
+        throw new Error(`Could not load rows (status ${resp.status}).`);
+      }
+      setPage((await resp.json()) as TableResult);
+      setPageError(null);
+    } catch (err) {
+      setPageError(err instanceof Error ? err.message : "Could not load rows.");
+    } finally {
+      setIsLoading(false);
     }
-  }
+  };
+
+  const tableData = page?.data ?? [];
+  const columns = page?.schema.map((field) => field.name) ?? [];
+  const lastRow = page ? Math.min(page.offset + page.limit, page.rows) : 0;
 
   const isError = data.isError;
   const borderClass = isError
@@ -86,7 +111,7 @@ function DisplayNode({ data }: DisplayNodeProps) {
           <table className="table-auto w-full text-xs text-left">
             <thead className="sticky top-0 bg-[var(--color-surface-3)]">
               <tr>
-                {Object.keys(tableData[0]).map((key) => (
+                {columns.map((key) => (
                   <th scope="col" className="p-2 font-semibold" key={key}>
                     {key}
                   </th>
@@ -96,9 +121,9 @@ function DisplayNode({ data }: DisplayNodeProps) {
             <tbody className="divide-y divide-[var(--color-border-1)]">
               {tableData.map((row: Record<string, unknown>, index: number) => (
                 <tr key={index}>
-                  {Object.values(row).map((val: unknown, i: number) => (
-                    <td className="p-2" key={i}>
-                      {String(val)}
+                  {columns.map((key) => (
+                    <td className="p-2" key={key}>
+                      {String(row[key])}
                     </td>
                   ))}
                 </tr>
@@ -111,6 +136,30 @@ function DisplayNode({ data }: DisplayNodeProps) {
           </div>
         )}
       </div>
+      {page && page.rows > page.limit && (
+        <div className="nodrag p-2 border-t border-[var(--color-border-1)] flex items-center justify-between text-xs text-[var(--color-text-2)]">
+          <button
+            type="button"
+            disabled={isLoading || page.offset === 0}
+            onClick={() => loadPage(Math.max(page.offset - page.limit, 0))}
+            className="px-2 py-1 rounded bg-[var(--color-surface-3)] disabled:opacity-50"
+          >
+            Prev
+          </button>
+          <span>
+            {pageError ??
+              `Rows ${page.offset + 1}-${lastRow} of ${page.rows}`}
+          </span>
+          <button
+            type="button"
+            disabled={isLoading || lastRow >= page.rows}
+            onClick={() => loadPage(page.offset + page.limit)}
+            className="px-2 py-1 rounded bg-[var(--color-surface-3)] disabled:opacity-50"
+          >
+            Next
+          </button>
+        </div>
+      )}
       <TypedHandle
         type="target"
         position={Position.Left}
@@ -264,6 +264,25 @@ function LoadImageNode({ id, data }: LoadImageNodeProps) {
             </div>
           )}
         </div>
+        {/* Batch mode: every image in a server folder or glob */}
+        <div>
+          <label
+            htmlFor={`batch-${id}`}
+            className="block text-sm font-medium text-[var(--color-text-2)] mb-1"
+          >
+            Or a folder / glob on the server
+          </label>
+          <input
+            id={`batch-${id}`}
+            type="text"
+            placeholder="photos/*.jpg"
+            value={localFile ? "" : (data.filePath ?? "")}
+            onChange={(e) =>
+              data.onChange(id, { filePath: e.target.value, file: null })
+            }
+            className="nodrag w-full p-2 border rounded-md bg-[var(--color-surface-3)] border-[var(--color-border-2)] text-[var(--color-text-1)] focus:outline-none focus-visible:ring-2 focus-visible:ring-[var(--color-accent)]"
+          />
+        </div>
       </div>
       <TypedHandle
         type="source"
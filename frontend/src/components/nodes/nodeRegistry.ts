@@ -28,6 +28,7 @@ export const nodeRegistry = {
   handleMissingVal: HandleMissingNode,
   loadImage: LoadImageNode,
   note: NoteNode,
+  parquetInput: InputNode,
   resizeImage: ResizeImageNode,
   saveImage: SaveImageNode,
   selectColumn: SelectColumnNode,
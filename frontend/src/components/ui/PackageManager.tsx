@@ -45,37 +45,58 @@ export default function PackageManager({ onClose }: PackageManagerProps) {
     return () => window.removeEventListener("keydown", handleKey);
   }, [fetchNodeStatus, onClose]);
 
-  const handleInstall = async (installationNode: NodeStatus) => {
-    const nodeType = installationNode.nodeType;
-    const deps = installationNode.dependencies || [];
+  // Installs run as background jobs on the backend, poll until done
+  const waitForJob = useCallback(
+    async (jobId: string) => {
+      for (;;) {
+        const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+        if (!response.ok) throw new Error("Lost track of the install job");
+        const job = await response.json();
+        if (job.status === "finished") return job.result;
+        if (job.status === "failed") throw new Error(job.error);
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+      }
+    },
+    [API_BASE_URL],
+  );
 
-    setInstalling(nodeType);
+  // Several nodes are installed in one job (a single pip run)
+  const handleInstall = async (installationNodes: NodeStatus[]) => {
+    const nodeTypes = installationNodes.map((node) => node.nodeType);
+    const label = nodeTypes.length === 1 ? nodeTypes[0] : "*";
+
+    setInstalling(label);
     setError(null);
     setSuccess(null);
-    // setNeedsRestart(false);
     try {
       const response = await fetch(`${API_BASE_URL}/packages/install`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ nodeType, deps }),
+        body: JSON.stringify({ nodeTypes }),
       });
       const result = await response.json();
       if (result.status !== "success") {
         throw new Error(result.message || "Failed to install node");
-        // alert(`Failed to install ${installationNode}: ${result.message}`);
       }
-      setSuccess(result.message);
-      // Re-fetch status regardless of success/failure to update the list
-      await fetchNodeStatus();
+      // A node already being installed comes back with its running job
+      const jobIds: string[] = Array.from(
+        new Set(Object.values(result.jobs as Record<string, string>)),
+      );
+      const results = await Promise.all(jobIds.map(waitForJob));
+      setSuccess(results.map((jobResult) => jobResult.message).join(" "));
     } catch (err) {
       if (err instanceof Error) {
-        console.error(`Failed to install ${nodeType}:`, err);
-        setError(err.message || `Network error installing ${nodeType}`);
+        console.error(`Failed to install ${nodeTypes.join(", ")}:`, err);
+        setError(
+          err.message || `Network error installing ${nodeTypes.join(", ")}`,
+        );
       } else {
-        console.error(`Failed to install ${nodeType}:`, err);
+        console.error(`Failed to install ${nodeTypes.join(", ")}:`, err);
       }
     } finally {
       setInstalling(null);
+      // Re-fetch status regardless of success/failure to update the list
+      await fetchNodeStatus();
     }
   };
 
@@ -169,7 +190,7 @@ export default function PackageManager({ onClose }: PackageManagerProps) {
   //                       {dep}
   //                     </span>
   //                     <button
-  //                       onClick={() => handleInstall(node)}
+  //                       onClick={() => handleInstall([node])}
   //                       disabled={!!installing}
   //                       className="bg-[var(--color-accent)] hover:bg-[var(--color-accent-hover)] text-[var(--color-accent-text)] text-xs font-bold py-1 px-3 rounded disabled:opacity-50 disabled:cursor-not-allowed focus:outline-none focus-visible:ring-2 focus-visible:ring-[var(--color-accent)]"
   //                       aria-label={`Install ${dep}`}
@@ -187,7 +208,7 @@ export default function PackageManager({ onClose }: PackageManagerProps) {
   // );
 
   const renderNodeCard = (node: NodeStatus) => {
-    const isBusy = installing === node.nodeType;
+    const isBusy = installing === node.nodeType || installing === "*";
 
     return (
       <li
@@ -209,7 +230,7 @@ export default function PackageManager({ onClose }: PackageManagerProps) {
           <div>
             {node.status === "Missing Dependencies" && (
               <button
-                onClick={() => handleInstall(node)}
+                onClick={() => handleInstall([node])}
                 disabled={isBusy}
                 className="bg-blue-600 hover:bg-blue-700 text-white text-sm font-bold py-2 px-4 rounded-md disabled:opacity-50 disabled:cursor-not-allowed focus:outline-none focus-visible:ring-2 focus-visible:ring-blue-500"
               >
@@ -218,7 +239,7 @@ export default function PackageManager({ onClose }: PackageManagerProps) {
             )}
             {node.status === "Available" && (
               <button
-                onClick={() => handleInstall(node)}
+                onClick={() => handleInstall([node])}
                 disabled={isBusy}
                 className="bg-green-600 hover:bg-green-700 text-white text-sm font-bold py-2 px-4 rounded-md disabled:opacity-50 disabled:cursor-not-allowed focus:outline-none focus-visible:ring-2 focus-visible:ring-green-500"
               >
@@ -355,9 +376,20 @@ export default function PackageManager({ onClose }: PackageManagerProps) {
               {/* -- Section 2: Available to Install -- */}
               {availableNodes.length > 0 && (
                 <section>
-                  <h3 className="text-lg font-semibold mb-3 text-green-600 dark:text-green-400">
-                    Available to Install ({availableNodes.length})
-                  </h3>
+                  <div className="flex justify-between items-center mb-3">
+                    <h3 className="text-lg font-semibold text-green-600 dark:text-green-400">
+                      Available to Install ({availableNodes.length})
+                    </h3>
+                    {availableNodes.length > 1 && (
+                      <button
+                        onClick={() => handleInstall(availableNodes)}
+                        disabled={!!installing}
+                        className="bg-green-600 hover:bg-green-700 text-white text-sm font-bold py-2 px-4 rounded-md disabled:opacity-50 disabled:cursor-not-allowed focus:outline-none focus-visible:ring-2 focus-visible:ring-green-500"
+                      >
+                        {installing === "*" ? "Installing..." : "Install all"}
+                      </button>
+                    )}
+                  </div>
                   <ul className="space-y-4">
                     {availableNodes.map(renderNodeCard)}
                   </ul>
@@ -17,6 +17,8 @@ export type InputNodeData = {
   filePath: string;
   file?: File | null;
   accept?: string;
+  chunkSize?: number;
+  arrow?: boolean;
 } & CommonNodeData;
 
 export type InputNodeProps = {
@@ -47,9 +49,19 @@ export type NoteNodeProps = {
 };
 
 // DISPLAY NODE
+// One page of a display node's output, the rest is on the server
+export type TableResult = {
+  rows: number;
+  schema: { name: string; dtype: string }[];
+  offset: number;
+  limit: number;
+  data: Record<string, unknown>[];
+};
+
 export type DisplayNodeData = {
   label: string;
-  result?: string; // JSON String
+  result?: TableResult;
+  runId?: string | null;
   isError?: boolean;
   description?: string;
 };
@@ -178,9 +190,18 @@ export type FlipImageNodeProps = {
 };
 
 // DISPLAY_IMAGE NODE
+// A displayImage output, the pixels are fetched from /results/.../image
+export type ImageResult = {
+  etag: string;
+  width: number;
+  height: number;
+  channels: number;
+};
+
 export type DisplayImageNodeData = {
   label: string;
-  imageBase64?: string;
+  image?: ImageResult;
+  runId?: string | null;
 } & CommonNodeData;
 
 export type DisplayImageNodeProps = {